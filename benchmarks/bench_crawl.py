@@ -0,0 +1,213 @@
+"""
+End-to-end crawler benchmark against a local synthetic site farm.
+
+Runs `crawl_main_site` and `crawl_selected_external` against SiteFarm
+sites and reports pages/sec, p50/p95 fetch latency, parse time per page,
+peak RSS and browser launches. Results are written as JSON so runs can be
+diffed between commits. `--workers 0 2 4` repeats the main-site crawl with
+that many distributed worker processes and reports the speedup per count.
+Each worker brings its own `--concurrency` fetch slots, so compare a
+worker count against an in-process run at the same total concurrency.
+
+Run from the repo root:
+    python -m benchmarks.bench_crawl --preset static --out bench.json
+    python -m benchmarks.bench_crawl --preset hostile --pages 1000 --concurrency 16
+    python -m benchmarks.bench_crawl --render-mode http --workers 0 1 2 4 --skip-external
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import src.crawler.test as crawler
+from src.crawler.browser_pool import BrowserPool
+from src.crawler.html_analysis import shutdown_parse_executor
+from src.crawler.session import CrawlSession
+
+from benchmarks.site_farm import PRESETS, SiteFarm, SiteSpec
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Probe:
+    """Times every fetch and parse the crawler makes while installed."""
+
+    def __init__(self):
+        self.fetch_ms: list[float] = []
+        self.parse_ms: list[float] = []
+
+    @contextlib.contextmanager
+    def installed(self):
+        fetch, analyze = crawler.fetch_single_page, crawler.analyze_html_async
+
+        async def timed_fetch(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fetch(*args, **kwargs)
+            finally:
+                self.fetch_ms.append((time.perf_counter() - start) * 1000)
+
+        async def timed_analyze(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await analyze(*args, **kwargs)
+            finally:
+                self.parse_ms.append((time.perf_counter() - start) * 1000)
+
+        crawler.fetch_single_page, crawler.analyze_html_async = timed_fetch, timed_analyze
+        try:
+            yield self
+        finally:
+            crawler.fetch_single_page, crawler.analyze_html_async = fetch, analyze
+
+
+def peak_rss_mb() -> dict:
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1 / 1024 if sys.platform != "darwin" else 1 / 2**20
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale, 1),
+    }
+
+
+def summarize(name: str, pages: int, elapsed: float, probe: Probe, pool: BrowserPool, extra: dict) -> dict:
+    return {
+        "scenario": name,
+        "pages": pages,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "fetches": len(probe.fetch_ms),
+        "fetch_ms_p50": round(percentile(probe.fetch_ms, 50), 2),
+        "fetch_ms_p95": round(percentile(probe.fetch_ms, 95), 2),
+        "parse_ms_per_page": round(sum(probe.parse_ms) / len(probe.parse_ms), 3) if probe.parse_ms else 0.0,
+        "parse_ms_p95": round(percentile(probe.parse_ms, 95), 3),
+        "browser_launches": pool.browser_launches,
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+async def bench_main_site(farm: SiteFarm, args, workers: int = 0) -> dict:
+    pool = BrowserPool.for_concurrency(args.concurrency)
+    probe = Probe()
+    with tempfile.TemporaryDirectory() as root, probe.installed(), quiet(args.verbose):
+        session = CrawlSession(root=root)
+        start = time.perf_counter()
+        try:
+            page_counts, stats, _ = await crawler.crawl_main_site(
+                farm.url, max_depth=args.max_depth, concurrency=args.concurrency,
+                timeout=args.timeout, pool=pool, render_mode=args.render_mode, session=session,
+                workers=workers)
+        finally:
+            elapsed = time.perf_counter() - start
+            await pool.close()
+        external_links = len(session.seen_external_links)
+    # With workers, fetches and parses happen in the worker processes, out of the probe's sight.
+    return summarize("crawl_main_site", sum(page_counts.values()), elapsed, probe, pool,
+                     {"workers": workers, "concurrency": args.concurrency * max(workers, 1),
+                      "stats": stats, "external_links": external_links})
+
+
+async def bench_external(farm: SiteFarm, args) -> dict:
+    pool = BrowserPool(browsers=1, contexts_per_browser=1)
+    probe = Probe()
+    with probe.installed(), quiet(args.verbose):
+        start = time.perf_counter()
+        try:
+            result = await crawler.crawl_selected_external(
+                farm.url, max_depth=args.external_depth, timeout=args.timeout,
+                pool=pool, render_mode=args.render_mode)
+        finally:
+            elapsed = time.perf_counter() - start
+            await pool.close()
+    return summarize("crawl_selected_external", sum(result["page_counts"].values()), elapsed, probe, pool,
+                     {"stats": result["site_stats"]})
+
+
+def scaling(results: list[dict]) -> dict:
+    """Pages/sec per worker count, and speedup over the first count measured."""
+    runs = [r for r in results if r["scenario"] == "crawl_main_site"]
+    if not runs:
+        return {}
+    base = runs[0]["pages_per_sec"] or 1.0
+    return {str(r["workers"]): {"pages_per_sec": r["pages_per_sec"], "speedup": round(r["pages_per_sec"] / base, 2),
+                                "concurrency": r["concurrency"]}
+            for r in runs}
+
+
+def quiet(verbose: bool):
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--preset", choices=sorted(PRESETS), default="static")
+    for field, default in SiteSpec._field_defaults.items():
+        if isinstance(default, (int, float)) and not isinstance(default, bool):
+            ap.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=None,
+                            help=f"override the preset's {field}")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--workers", type=int, nargs="+", default=[0],
+                    help="crawl worker processes (0 = in-process); several values compare scaling")
+    ap.add_argument("--max-depth", type=int, default=10)
+    ap.add_argument("--external-depth", type=int, default=2)
+    ap.add_argument("--timeout", type=int, default=30000)
+    ap.add_argument("--render-mode", choices=["auto", "http", "browser"], default="auto")
+    ap.add_argument("--skip-external", action="store_true")
+    ap.add_argument("--out", help="write results JSON here (default: stdout only)")
+    ap.add_argument("--verbose", action="store_true", help="keep the crawler's per-page output")
+    args = ap.parse_args()
+
+    overrides = {f: getattr(args, f) for f in SiteSpec._fields if getattr(args, f, None) is not None}
+    spec = PRESETS[args.preset]._replace(**overrides)
+
+    results = []
+    with SiteFarm(spec) as farm:
+        for workers in args.workers:
+            results.append(asyncio.run(bench_main_site(farm, args, workers)))
+        if not args.skip_external:
+            results.append(asyncio.run(bench_external(farm, args)))
+    shutdown_parse_executor()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "preset": args.preset,
+        "site": spec._asdict(),
+        "crawl": {"concurrency": args.concurrency, "max_depth": args.max_depth,
+                  "render_mode": args.render_mode},
+        "results": results,
+        "scaling": scaling(results),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
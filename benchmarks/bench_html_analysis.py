@@ -0,0 +1,118 @@
+"""
+Micro-benchmark: single-pass `analyze_html` vs. the BeautifulSoup path the
+crawler used before (one parse for stats, a second parse in `extract_links`).
+
+Run from the repo root:  python -m benchmarks.bench_html_analysis
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from urllib.parse import urljoin
+
+from src.crawler.html_analysis import analyze_html, etree, is_descriptive_alt
+
+
+def synthetic_page(links: int, images: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    alts = ["", "logo", "Team photo at the 2024 offsite", "icon", "Chart of quarterly revenue", None]
+    parts = ["<html><head><title>t</title><script>var x = 1;</script></head><body><nav>"]
+    for i in range(links):
+        ext = rng.choice(["", "", "", ".pdf", ".docx"])
+        parts.append(f'<a href="/section/{i % 40}/page-{i}{ext}?utm_source=x">Link {i}</a>')
+        if i % 10 == 0:
+            parts.append("<div><p>Some paragraph text for the page body.</p></div>")
+    parts.append("</nav><main>")
+    for i in range(images):
+        alt = rng.choice(alts)
+        alt_attr = "" if alt is None else f' alt="{alt}"'
+        img = f'<img src="/img/{i}.png"{alt_attr}>'
+        parts.append(f'<a href="/gallery/{i}">{img}</a>' if i % 3 == 0 else f"<figure>{img}</figure>")
+    parts.append("</main></body></html>")
+    return "".join(parts)
+
+
+# The BeautifulSoup helpers the crawler used before analyze_html, kept here as the baseline.
+def extract_links(html: str, base_url: str) -> set[str]:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return {urljoin(base_url, a["href"]) for a in soup.find_all("a", href=True)}
+
+
+def is_valid_decorative(img) -> bool:
+    return img.get("alt", "").strip() == "" and (
+        img.get("role") == "presentation" or img.get("aria-hidden") == "true"
+    )
+
+
+def is_linked_image(img) -> bool:
+    return img.find_parent(["a", "button"]) is not None
+
+
+def is_wcag_compliant(img, seen_alts: Counter) -> bool:
+    alt = img.get("alt")
+    if alt is None:
+        return False
+    if is_valid_decorative(img):
+        return True
+    if is_linked_image(img):
+        return is_descriptive_alt(alt)
+    if not is_descriptive_alt(alt):
+        return False
+    if seen_alts[alt.strip().lower()] > 1:
+        return False
+    return True
+
+
+def legacy_analyze(html: str, base_url: str):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    attachments = sum(
+        1 for a in soup.find_all("a", href=True)
+        if a["href"].lower().endswith((".pdf", ".docx", ".pptx", ".xlsx", ".zip"))
+    )
+    imgs = soup.find_all("img")
+    seen_alts = Counter(img.get("alt", "").strip().lower() for img in imgs if img.has_attr("alt"))
+    accessible = sum(is_wcag_compliant(img, seen_alts) for img in imgs)
+    return extract_links(html, base_url), attachments, len(imgs), accessible
+
+
+def timed(fn, *args, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--links", type=int, default=400)
+    ap.add_argument("--images", type=int, default=120)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    html = synthetic_page(args.links, args.images)
+    base = "https://example.com/start"
+    print(f"Page size: {len(html) / 1024:.1f} KiB, parser: {'lxml' if etree is not None else 'html.parser'}")
+
+    new_ms, new = timed(analyze_html, html, base, repeat=args.repeat)
+    print(f"analyze_html      {new_ms:8.2f} ms/page")
+
+    try:
+        old_ms, old = timed(legacy_analyze, html, base, repeat=args.repeat)
+    except ImportError as e:
+        print(f"legacy path skipped ({e})")
+        return
+    print(f"legacy bs4 path   {old_ms:8.2f} ms/page  ({old_ms / new_ms:.1f}x slower)")
+
+    links, attachments, images, accessible = old
+    assert links == set(new.links), "link sets differ"
+    assert (attachments, images, accessible) == (new.attachments, len(new.images), new.accessible_images), \
+        "stats differ"
+    print("✅ results match")
+
+
+if __name__ == "__main__":
+    main()
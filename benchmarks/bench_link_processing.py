@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: per-page link processing with LinkClassifier.partition vs.
+the per-link loop the crawler used before (clean_url, a urlparse for the
+scheme and a substring `is_external` check for every link).
+
+Run from the repo root:  python -m benchmarks.bench_link_processing
+"""
+
+import argparse
+import random
+import time
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from src.crawler.links import LinkClassifier, normalize_link
+
+MAIN_URL = "https://www.example.com/"
+
+
+def synthetic_site(pages: int, links_per_page: int, nav_links: int, seed: int = 0) -> list[list[str]]:
+    """Each page repeats the same nav/footer links and adds its own content links."""
+    rng = random.Random(seed)
+    nav = [f"https://www.example.com/section/{i}?utm_source=nav" for i in range(nav_links)]
+    nav += ["https://twitter.com/example", "https://notexample.com/partner", "mailto:hello@example.com"]
+    site = []
+    for p in range(pages):
+        own = []
+        for i in range(links_per_page - len(nav)):
+            kind = rng.random()
+            if kind < 0.7:
+                own.append(f"https://www.example.com/articles/{p}-{i}?page={i % 5}&gclid=abc#top")
+            elif kind < 0.8:
+                own.append(f"https://blog.example.com/post/{rng.randrange(pages * 5)}")
+            else:
+                own.append(f"https://ext{rng.randrange(50)}.org/ref/{i}")
+        site.append(nav + own)
+    return site
+
+
+def legacy_clean_url(url: str) -> str:
+    parsed = urlparse(url)
+    query = {k: v for k, v in parse_qs(parsed.query).items() if not k.lower().startswith(("utm_", "gclid", "fbclid"))}
+    parsed = parsed._replace(query=urlencode(query, doseq=True), fragment="")
+    return urlunparse(parsed)
+
+
+def legacy_partition(links, main_domain: str):
+    internal, external = [], []
+    for link in links:
+        cleaned = legacy_clean_url(link)
+        if urlparse(cleaned).scheme not in ("http", "https"):
+            continue
+        netloc = urlparse(cleaned).netloc
+        if netloc and main_domain not in netloc:
+            external.append(cleaned)
+        else:
+            internal.append(cleaned)
+    return internal, external
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=2000)
+    ap.add_argument("--links", type=int, default=150)
+    ap.add_argument("--nav", type=int, default=60)
+    args = ap.parse_args()
+
+    site = synthetic_site(args.pages, args.links, args.nav)
+    main_domain = urlparse(MAIN_URL).netloc
+
+    start = time.perf_counter()
+    old = [legacy_partition(links, main_domain) for links in site]
+    old_us = (time.perf_counter() - start) / len(site) * 1e6
+
+    normalize_link.cache_clear()
+    classifier = LinkClassifier(MAIN_URL)
+    start = time.perf_counter()
+    new = [classifier.partition(links) for links in site]
+    new_us = (time.perf_counter() - start) / len(site) * 1e6
+
+    print(f"{args.pages} pages x {args.links} links ({args.nav} repeated nav links)")
+    print(f"legacy per-link loop   {old_us:9.1f} µs/page")
+    print(f"LinkClassifier         {new_us:9.1f} µs/page  ({old_us / new_us:.1f}x faster)")
+    print(f"memo: {normalize_link.cache_info()}")
+
+    # Same URLs; only the internal/external split differs where the substring
+    # check was wrong (blog.example.com is not "in" www.example.com).
+    for (old_in, old_ex), (new_in, new_ex) in zip(old, new):
+        assert set(old_in) | set(old_ex) == set(new_in) | set(new_ex), "cleaned URL sets differ"
+        assert not any("blog.example.com" in u for u in new_ex)
+        assert not any("notexample.com" in u for u in new_in)
+    print("✅ results match (modulo the fixed domain matching)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cold-start benchmark for the API process.
+
+Measures `import src.main` (median wall time over several fresh
+interpreters, minus bare interpreter start-up, with the slowest modules
+from `-X importtime`), then launches `run.py --prod` and times how long
+until /health/live answers, until /health/ready reports warm pools, and
+until a first small crawl of a SiteFarm site completes.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup --out startup.json
+    python -m benchmarks.bench_startup --workers 1 --skip-browser
+"""
+
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.site_farm import SiteFarm, SiteSpec
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(.+)")
+
+
+def _run_seconds(code: str) -> float:
+    began = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+    return time.perf_counter() - began
+
+
+def measure_import(runs: int, top: int) -> dict:
+    baseline = statistics.median(_run_seconds("pass") for _ in range(runs))
+    total = statistics.median(_run_seconds("import src.main") for _ in range(runs))
+    trace = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.main"],
+                           capture_output=True, text=True).stderr
+    modules = [(int(self_us), name.strip()) for self_us, _, name in _IMPORTTIME_RE.findall(trace)]
+    modules.sort(reverse=True)
+    return {
+        "interpreter_s": round(baseline, 3),
+        "import_s": round(total - baseline, 3),
+        "slowest_modules": [{"module": name, "self_ms": round(us / 1000, 1)} for us, name in modules[:top]],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(url: str, payload: dict | None = None, timeout: float = 2.0) -> int:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def _wait_for(url: str, began: float, deadline: float) -> float | None:
+    while time.perf_counter() < deadline:
+        if _request(url) == 200:
+            return round(time.perf_counter() - began, 3)
+        time.sleep(0.05)
+    return None
+
+
+def measure_server(workers: int, pages: int, skip_browser: bool, timeout: float) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, LINK_CATEGORIZER="fake", PREWARM_BROWSER_POOL="0" if skip_browser else "1")
+    began = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "run.py", "--prod", "--host", "127.0.0.1",
+                               "--port", str(port), "--workers", str(workers)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = began + timeout
+        live = _wait_for(f"{base}/health/live", began, deadline)
+        ready = _wait_for(f"{base}/health/ready", began, deadline)
+        with SiteFarm(SiteSpec(pages=pages, fanout=4)) as farm:
+            payload = {"url": farm.url, "max_depth": 1, "render_mode": "http",
+                       "outline_mode": "rules", "cache_mode": "off"}
+            status = _request(f"{base}/crawl/", payload, timeout=timeout)
+        first_crawl = round(time.perf_counter() - began, 3) if status == 200 else None
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"workers": workers, "live_s": live, "ready_s": ready,
+            "first_crawl_s": first_crawl, "first_crawl_status": status}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per import measurement")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pages", type=int, default=20, help="pages on the site crawled first")
+    parser.add_argument("--skip-browser", action="store_true", help="do not pre-warm Chromium")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--no-server", action="store_true", help="only measure import time")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"import": measure_import(args.runs, args.top)}
+    if not args.no_server:
+        results["server"] = measure_server(args.workers, args.pages, args.skip_browser, args.timeout)
+
+    text = json.dumps(results, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Memory benchmark: the crawler's old frontier bookkeeping (a visited set, a
+parent_map dict and a queue of url strings) vs. UrlStore and DiskUrlStore.
+
+Each structure is built in a fresh interpreter and charged the growth of
+that process's peak RSS, so SQLite's C allocations (page cache, WAL
+index) count too. Time is reported next to memory because the stores
+trade one for the other: interning URLs into compact columns is several
+times slower per URL than a set and dict, and DiskUrlStore adds SQLite
+writes on top.
+
+Run from the repo root:  python -m benchmarks.bench_url_store --urls 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+from src.crawler.url_store import ROOT, DiskUrlStore, UrlStore
+
+
+def synthetic_url(i: int, hosts: int = 20) -> str:
+    return f"https://site{i % hosts}.example.com/section/{i % 97}/article-{i}?page={i % 7}"
+
+
+def synthetic_urls(n: int):
+    return (synthetic_url(i) for i in range(n))
+
+
+def baseline(urls):
+    visited, parent_map, queue = set(), {}, deque()
+    parent = None
+    for url in urls:
+        if url in parent_map:
+            continue
+        parent_map[url] = parent
+        queue.append(url)
+        visited.add(url)
+        parent = url
+    return visited, parent_map, queue
+
+
+def fill_store(store, urls):
+    parent = ROOT
+    for url in urls:
+        uid, created = store.add(url, parent, 1)
+        if created:
+            store.mark_visited(uid)
+            parent = uid
+    return store
+
+
+def _peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, KiB elsewhere
+
+
+def build(name: str, n: int) -> dict:
+    """Build one structure over `n` URLs in this process; returns its time and peak RSS growth."""
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _peak_rss()
+        start = time.perf_counter()
+        if name == "set+dict+deque":
+            baseline(synthetic_urls(n))
+        elif name == "UrlStore":
+            store = fill_store(UrlStore(), synthetic_urls(n))
+            assert len(store) == n and store.visited_count == n
+            assert store.url(n - 1) == synthetic_url(n - 1)
+            assert store.path(2) == [synthetic_url(0), synthetic_url(1), synthetic_url(2)]
+        else:
+            store = fill_store(DiskUrlStore(os.path.join(tmp, "urls.sqlite"), expected_urls=n), synthetic_urls(n))
+            assert len(store) == n
+            store.close()
+        return {"seconds": time.perf_counter() - start, "rss": _peak_rss() - before}
+
+
+def measure(name: str, n: int) -> dict:
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_url_store", "--child", name, str(n)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--urls", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--child", nargs=2, metavar=("STRUCTURE", "URLS"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        print(json.dumps(build(args.child[0], int(args.child[1]))))
+        return
+
+    for n in args.urls:
+        print(f"{n:,} URLs")
+        base = None
+        for name in ("set+dict+deque", "UrlStore", "DiskUrlStore"):
+            result = measure(name, n)
+            base = base or result
+            print(f"  {name:<16} {result['rss'] / 2**20:9.1f} MiB peak RSS ({result['rss'] / n:6.1f} B/url)"
+                  f"  {result['seconds']:6.2f} s ({result['seconds'] / base['seconds']:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
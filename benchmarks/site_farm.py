@@ -0,0 +1,143 @@
+"""
+Local synthetic website farm for crawler benchmarks.
+
+`SiteFarm(spec)` serves a deterministic site from a background thread on
+127.0.0.1. Page i links to its children i*fanout+1 .. i*fanout+fanout, so
+`pages` and `fanout` fix the site's depth; everything else (duplicate
+links, image/alt mix, attachments, slow, failing and JS-rendered pages)
+is drawn from a per-page seeded RNG, so two runs see the same site.
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+ALT_TEXTS = {
+    "descriptive": ["Team photo at the 2024 offsite", "Chart of quarterly revenue", "Map of the campus"],
+    "bad": ["image", "logo", "photo", "icon"],
+    "empty": [""],
+    "missing": [None],
+}
+
+
+class SiteSpec(NamedTuple):
+    pages: int = 500
+    fanout: int = 8
+    dup_links: int = 4  # extra links per page to already-known pages
+    images: int = 10
+    alt_mix: tuple = (("descriptive", 0.5), ("bad", 0.2), ("empty", 0.1), ("missing", 0.2))
+    attachments: int = 1
+    external_links: int = 2
+    slow_rate: float = 0.0
+    slow_ms: int = 500
+    fail_rate: float = 0.0
+    js_rate: float = 0.0  # pages whose links are only injected by JavaScript
+    latency_ms: int = 0
+    seed: int = 0
+
+    @classmethod
+    def preset(cls, name: str) -> "SiteSpec":
+        return PRESETS[name]
+
+
+PRESETS = {
+    "static": SiteSpec(),
+    "wide": SiteSpec(pages=2000, fanout=25, dup_links=20, images=30),
+    "hostile": SiteSpec(pages=400, slow_rate=0.05, fail_rate=0.05, latency_ms=20),
+    "spa": SiteSpec(pages=150, js_rate=0.5),
+}
+
+
+def _rng(spec: SiteSpec, page_id: int) -> random.Random:
+    return random.Random(spec.seed * 1_000_003 + page_id)
+
+
+def render_page(spec: SiteSpec, page_id: int) -> tuple[int, str, float]:
+    """Returns (status, html, delay_seconds) for /p<page_id>."""
+    rng = _rng(spec, page_id)
+    delay = spec.latency_ms / 1000
+    if rng.random() < spec.slow_rate:
+        delay += spec.slow_ms / 1000
+    if page_id and rng.random() < spec.fail_rate:
+        return 500, "<html><body>Internal error</body></html>", delay
+
+    children = [c for c in range(page_id * spec.fanout + 1, page_id * spec.fanout + spec.fanout + 1)
+                if c < spec.pages]
+    dups = [rng.randrange(spec.pages) for _ in range(spec.dup_links)] if spec.pages else []
+    hrefs = [f"/p{c}" for c in children + dups]
+    if children:
+        hrefs.append(f"/p{children[0]}#section")  # same page again after cleaning
+    hrefs += [f"/files/doc-{page_id}-{i}.pdf" for i in range(spec.attachments)]
+    hrefs += [f"https://external{(page_id + i) % 7}.example.org/ref/{page_id}" for i in range(spec.external_links)]
+
+    kinds, weights = zip(*spec.alt_mix)
+    images = []
+    for i in range(spec.images):
+        alt = rng.choice(ALT_TEXTS[rng.choices(kinds, weights)[0]])
+        alt_attr = "" if alt is None else f' alt="{alt}"'
+        img = f'<img src="/img/{page_id}-{i}.png"{alt_attr}>'
+        images.append(f'<a href="/p{page_id}">{img}</a>' if i % 4 == 0 else f"<figure>{img}</figure>")
+
+    if rng.random() < spec.js_rate:
+        script = ";".join(
+            f"a=document.createElement('a');a.href='{h}';a.textContent='link';root.appendChild(a)" for h in hrefs)
+        body = (f'<div id="root"></div><script>var a,root=document.getElementById("root");{script};'
+                f'root.insertAdjacentHTML("beforeend", {"".join(images)!r})</script>')
+    else:
+        links = "".join(f'<li><a href="{h}">Link {i}</a></li>' for i, h in enumerate(hrefs))
+        body = f"<nav><ul>{links}</ul></nav><main><h1>Page {page_id}</h1><p>Synthetic page body.</p>{''.join(images)}</main>"
+    return 200, f"<!doctype html><html><head><title>Page {page_id}</title></head><body>{body}</body></html>", delay
+
+
+class _Handler(BaseHTTPRequestHandler):
+    spec: SiteSpec
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].split("#", 1)[0]
+        if path.endswith(".pdf"):
+            self._send(200, b"%PDF-1.4\n", "application/pdf")
+            return
+        if path == "/":
+            page_id = 0
+        elif path.startswith("/p") and path[2:].isdigit() and int(path[2:]) < self.spec.pages:
+            page_id = int(path[2:])
+        else:
+            self._send(404, b"not found", "text/plain")
+            return
+        status, html, delay = render_page(self.spec, page_id)
+        if delay:
+            time.sleep(delay)
+        self._send(status, html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SiteFarm:
+    def __init__(self, spec: SiteSpec):
+        handler = type("SiteHandler", (_Handler,), {"spec": spec})
+        self.spec = spec
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def __enter__(self) -> "SiteFarm":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -1,3 +1,5 @@
+import argparse
+import os
 import sys
 import asyncio
 import uvicorn
@@ -6,6 +8,30 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 print("✅ run.py using:", asyncio.get_event_loop_policy())
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the Website Analyzer API.")
+    parser.add_argument("--prod", action="store_true", default=os.getenv("APP_ENV") == "production",
+                        help="no reload, bind all interfaces (default when APP_ENV=production)")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="ignored above 1: crawl jobs live in process memory, so one API worker runs")
+    args = parser.parse_args()
+    if args.workers > 1:
+        print(f"⚠️ Ignoring --workers/WEB_CONCURRENCY={args.workers}: crawl jobs and their progress live in the "
+              "memory of the worker that started them, so running 1 API worker", file=sys.stderr)
+        args.workers = 1
+    return args
+
+
 if __name__ == "__main__":
+    args = parse_args()
     # point to the FastAPI instance inside src/main.py
-    uvicorn.run("src.main:app", host="127.0.0.1", port=8000, reload=True)
+    if args.prod:
+        uvicorn.run("src.main:app", host=args.host or "0.0.0.0", port=args.port,
+                    workers=args.workers, reload=False)
+    else:
+        host = args.host or "127.0.0.1"
+        print(f"📖 API docs at http://{host}:{args.port}/docs")
+        uvicorn.run("src.main:app", host=host, port=args.port, reload=True)
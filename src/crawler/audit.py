@@ -0,0 +1,458 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import NamedTuple
+
+from src.crawler.html_analysis import (PageAnalysis, PageCollector, alt_counts, alt_problem, get_parse_executor,
+                                       image_info, marked_decorative, parse_with_target)
+
+GENERIC_LINK_TEXT = {"click here", "here", "read more", "more", "learn more", "link", "this", "click", "details"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+MIN_CONTRAST = 4.5
+SNIPPET_CHARS = 120
+
+
+class Finding(NamedTuple):
+    rule: str
+    severity: str  # "error" or "warning"
+    message: str
+    element: str = ""
+
+
+class PageAudit(NamedTuple):
+    content_hash: str
+    findings: tuple[Finding, ...]
+    checked: dict[str, int]  # rule -> elements it looked at
+    rule_seconds: dict[str, float]
+    cached: bool = False
+
+
+def _element(tag: str, attrib: dict) -> str:
+    attrs = "".join(f' {k}="{v}"' for k, v in attrib.items() if k in ("id", "class", "href", "src", "alt", "style"))
+    snippet = f"<{tag}{attrs}>"
+    return snippet if len(snippet) <= SNIPPET_CHARS else snippet[:SNIPPET_CHARS - 4] + "...>"
+
+
+class _EventRecorder:
+    """Parser target that records the page once as (kind, tag/text, attrib) events for every rule to replay."""
+
+    def __init__(self):
+        self.events = []
+
+    def start(self, tag, attrib):
+        self.events.append(("start", tag.lower(), dict(attrib)))
+
+    def end(self, tag):
+        self.events.append(("end", tag.lower(), None))
+
+    def data(self, data):
+        self.events.append(("data", data, None))
+
+    def close(self):
+        return self.events
+
+
+class _Tee:
+    """Parser target that feeds one parse to several targets; `close()` returns each target's result."""
+
+    def __init__(self, *targets):
+        self.targets = targets
+
+    def start(self, tag, attrib):
+        for target in self.targets:
+            target.start(tag, attrib)
+
+    def end(self, tag):
+        for target in self.targets:
+            target.end(tag)
+
+    def data(self, data):
+        for target in self.targets:
+            target.data(data)
+
+    def close(self):
+        return tuple(target.close() for target in self.targets)
+
+
+class AuditRule(ABC):
+    """
+    One accessibility check. `run()` gets the page's parse events and
+    returns (elements checked, findings). Bump `version` when a rule's
+    logic changes so cached findings for it are recomputed.
+    """
+
+    name = ""
+    version = 1
+
+    @abstractmethod
+    def run(self, events: list) -> tuple[int, list[Finding]]:
+        ...
+
+    def finding(self, severity: str, message: str, element: str = "") -> Finding:
+        return Finding(self.name, severity, message, element)
+
+
+RULES: dict[str, type[AuditRule]] = {}
+
+
+def register_rule(cls: type[AuditRule]) -> type[AuditRule]:
+    """Class decorator that makes a rule available by its `name`."""
+    RULES[cls.name] = cls
+    return cls
+
+
+def _images(events):
+    """(attrib, ImageInfo) for every <img>, as the page analysis sees it."""
+    open_links = 0
+    for kind, tag, attrib in events:
+        if kind == "start":
+            if tag in ("a", "button"):
+                open_links += 1
+            elif tag == "img":
+                yield attrib, image_info(attrib, open_links > 0)
+        elif kind == "end" and tag in ("a", "button") and open_links:
+            open_links -= 1
+
+
+@register_rule
+class ImageAltRule(AuditRule):
+    """
+    Content images need a descriptive alt that is not repeated on the page.
+    Empty alts are left to decorative-image.
+    """
+
+    name = "image-alt"
+    version = 2
+    MESSAGES = {"missing": ("error", "Image has no alt attribute"),
+                "generic": ("error", "Alt text is generic"),
+                "repeated": ("warning", "Alt text repeats another image on the page")}
+
+    def run(self, events):
+        images = list(_images(events))
+        seen_alts = alt_counts(img for _, img in images)
+        content = [(attrib, img) for attrib, img in images if not img.linked and not img.decorative]
+        findings = []
+        for attrib, img in content:
+            problem = alt_problem(img, seen_alts)
+            if problem is not None and (problem != "generic" or img.alt.strip()):
+                findings.append(self.finding(*self.MESSAGES[problem], _element("img", attrib)))
+        return len(content), findings
+
+
+@register_rule
+class LinkedImageAltRule(AuditRule):
+    """An image inside a link or button names it, so its alt must describe the target."""
+
+    name = "linked-image-alt"
+    version = 2
+
+    def run(self, events):
+        images = [(attrib, img) for attrib, img in _images(events) if img.linked]
+        findings = [self.finding("error", "Linked image has no descriptive alt text", _element("img", attrib))
+                    for attrib, img in images if alt_problem(img, Counter()) is not None]
+        return len(images), findings
+
+
+@register_rule
+class DecorativeImageRule(AuditRule):
+    """Decorative images should be marked consistently: empty alt plus role="presentation"."""
+
+    name = "decorative-image"
+
+    def run(self, events):
+        checked, findings = 0, []
+        for attrib, img in _images(events):
+            alt = attrib.get("alt")
+            if marked_decorative(attrib):
+                checked += 1
+                if alt and alt.strip():
+                    findings.append(self.finding("warning", "Image is marked decorative but has alt text",
+                                                 _element("img", attrib)))
+            elif alt is not None and not alt.strip() and not img.linked:
+                checked += 1
+                findings.append(self.finding("warning", 'Empty alt without role="presentation" or aria-hidden',
+                                             _element("img", attrib)))
+        return checked, findings
+
+
+@register_rule
+class HeadingOrderRule(AuditRule):
+    """One h1, no skipped heading levels, no empty headings."""
+
+    name = "heading-order"
+
+    def run(self, events):
+        headings, current, text = [], None, []
+        for kind, tag, attrib in events:
+            if kind == "start" and len(tag) == 2 and tag[0] == "h" and tag[1] in "123456":
+                current, text = (int(tag[1]), attrib), []
+            elif kind == "data" and current is not None:
+                text.append(tag)
+            elif kind == "start" and tag == "img" and current is not None:
+                text.append(attrib.get("alt") or "")
+            elif kind == "end" and current is not None and tag == f"h{current[0]}":
+                headings.append((current[0], current[1], "".join(text).strip()))
+                current = None
+
+        findings = []
+        h1s = sum(1 for level, _, _ in headings if level == 1)
+        if h1s == 0:
+            findings.append(self.finding("error", "Page has no h1"))
+        elif h1s > 1:
+            findings.append(self.finding("warning", f"Page has {h1s} h1 headings"))
+        previous = 0
+        for level, attrib, label in headings:
+            if not label:
+                findings.append(self.finding("error", f"Empty h{level}", _element(f"h{level}", attrib)))
+            if previous and level > previous + 1:
+                findings.append(self.finding("warning", f"Heading level skips from h{previous} to h{level}",
+                                             _element(f"h{level}", attrib)))
+            previous = level
+        return len(headings), findings
+
+
+@register_rule
+class LinkTextRule(AuditRule):
+    """Links need text (or a labelled image) that makes sense out of context."""
+
+    name = "link-text"
+
+    def run(self, events):
+        checked, findings = 0, []
+        stack = []  # (attrib, text parts) of open <a href> elements
+        for kind, tag, attrib in events:
+            if kind == "start" and tag == "a":
+                stack.append((attrib, [attrib.get("aria-label") or attrib.get("title") or ""]))
+            elif kind == "start" and tag == "img" and stack:
+                stack[-1][1].append(attrib.get("alt") or "")
+            elif kind == "data" and stack:
+                stack[-1][1].append(tag)
+            elif kind == "end" and tag == "a" and stack:
+                attrib, parts = stack.pop()
+                if attrib.get("href") is None:
+                    continue
+                checked += 1
+                label = " ".join("".join(parts).split()).lower()
+                if not label:
+                    findings.append(self.finding("error", "Link has no accessible text", _element("a", attrib)))
+                elif label in GENERIC_LINK_TEXT:
+                    findings.append(self.finding("warning", f'Link text "{label}" is not descriptive',
+                                                 _element("a", attrib)))
+        return checked, findings
+
+
+_HEX_RE = re.compile(r"^#([0-9a-f]{3}|[0-9a-f]{6})$")
+_RGB_RE = re.compile(r"^rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)")
+_NAMED_COLORS = {"black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0), "green": (0, 128, 0),
+                 "blue": (0, 0, 255), "gray": (128, 128, 128), "grey": (128, 128, 128), "yellow": (255, 255, 0)}
+
+
+def parse_color(value: str) -> tuple[int, int, int] | None:
+    value = value.strip().lower()
+    if m := _HEX_RE.match(value):
+        h = m.group(1)
+        if len(h) == 3:
+            h = "".join(c * 2 for c in h)
+        return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+    if m := _RGB_RE.match(value):
+        return tuple(min(255, int(c)) for c in m.groups())
+    return _NAMED_COLORS.get(value)
+
+
+def contrast_ratio(fg: tuple[int, int, int], bg: tuple[int, int, int]) -> float:
+    def luminance(rgb):
+        channels = [c / 255 for c in rgb]
+        r, g, b = (c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4 for c in channels)
+        return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+    lighter, darker = sorted((luminance(fg), luminance(bg)), reverse=True)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def _inline_colors(style: str) -> tuple[tuple | None, tuple | None]:
+    fg = bg = None
+    for declaration in style.split(";"):
+        prop, _, value = declaration.partition(":")
+        prop = prop.strip().lower()
+        if prop == "color":
+            fg = parse_color(value)
+        elif prop in ("background-color", "background"):
+            bg = parse_color(value.split()[0]) if value.split() else None
+    return fg, bg
+
+
+@register_rule
+class ColorContrastRule(AuditRule):
+    """
+    Text colors set in inline styles against the nearest inline background
+    must reach a 4.5:1 contrast ratio. Stylesheets are not evaluated.
+    """
+
+    name = "color-contrast"
+
+    def run(self, events):
+        checked, findings = 0, []
+        stack = []  # (tag, fg, bg, attrib) of open elements, inherited down the tree
+        for kind, tag, attrib in events:
+            if kind == "start":
+                parent_fg, parent_bg = (stack[-1][1], stack[-1][2]) if stack else (None, None)
+                fg, bg = _inline_colors(attrib.get("style", "")) if "style" in attrib else (None, None)
+                entry = (tag, fg or parent_fg, bg or parent_bg, attrib if (fg or bg) else None)
+                if tag not in VOID_TAGS:
+                    stack.append(entry)
+            elif kind == "end" and tag not in VOID_TAGS:
+                for i in range(len(stack) - 1, -1, -1):
+                    if stack[i][0] == tag:
+                        del stack[i:]
+                        break
+            elif kind == "data" and stack and tag.strip():
+                _, fg, bg, styled = stack[-1]
+                if styled is None or fg is None or bg is None:
+                    continue
+                checked += 1
+                ratio = contrast_ratio(fg, bg)
+                if ratio < MIN_CONTRAST:
+                    findings.append(self.finding("error", f"Text contrast {ratio:.2f}:1 is below {MIN_CONTRAST}:1",
+                                                 _element(stack[-1][0], styled)))
+                stack[-1] = stack[-1][:3] + (None,)  # one finding per element
+        return checked, findings
+
+
+@register_rule
+class DocumentRule(AuditRule):
+    """The page declares its language and has a title."""
+
+    name = "document"
+
+    def run(self, events):
+        findings, lang, title, in_title = [], None, [], False
+        for kind, tag, attrib in events:
+            if kind == "start" and tag == "html":
+                lang = attrib.get("lang")
+            elif kind == "start" and tag == "title":
+                in_title = True
+            elif kind == "end" and tag == "title":
+                in_title = False
+            elif kind == "data" and in_title:
+                title.append(tag)
+        if not (lang or "").strip():
+            findings.append(self.finding("error", "<html> has no lang attribute"))
+        if not "".join(title).strip():
+            findings.append(self.finding("error", "Page has no title"))
+        return 1, findings
+
+
+# Comma-separated rule names; empty means every registered rule.
+AUDIT_RULES = tuple(r.strip() for r in os.getenv("AUDIT_RULES", "").split(",") if r.strip())
+
+
+def default_rules() -> tuple[str, ...]:
+    return AUDIT_RULES or tuple(RULES)
+
+
+def rule_set_signature(rule_names) -> str:
+    """Names and versions of a rule set; part of the findings cache key."""
+    return ",".join(f"{name}@{RULES[name].version}" for name in sorted(rule_names))
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def _run_rules(events: list, rule_names, digest: str) -> PageAudit:
+    findings, checked, seconds = [], {}, {}
+    for name in rule_names:
+        start = time.perf_counter()
+        count, rule_findings = RULES[name]().run(events)
+        seconds[name] = time.perf_counter() - start
+        checked[name] = count
+        findings.extend(rule_findings)
+    return PageAudit(digest, tuple(findings), checked, seconds)
+
+
+def audit_html(html: str, rule_names=None, digest: str = "") -> PageAudit:
+    """Parse `html` once and run every rule over the same events, timing each rule."""
+    events = parse_with_target(html, _EventRecorder)
+    return _run_rules(events, rule_names or default_rules(), digest or content_hash(html))
+
+
+def analyze_and_audit(html: str, base_url: str, rule_names=None, digest: str = "") -> PageAnalysis:
+    """`analyze_html` and `audit_html` from a single parse; the audit rides on the analysis."""
+    analysis, events = parse_with_target(html, lambda: _Tee(PageCollector(base_url), _EventRecorder()))
+    audit = _run_rules(events, rule_names or default_rules(), digest or content_hash(html))
+    return analysis._replace(audit=audit)
+
+
+async def analyze_and_audit_async(html: str, base_url: str, rule_names=None, digest: str = "") -> PageAnalysis:
+    """Run `analyze_and_audit` in the parse process pool (inline when PARSE_WORKERS=0)."""
+    rule_names = tuple(rule_names or default_rules())
+    executor = get_parse_executor()
+    if executor is None:
+        return analyze_and_audit(html, base_url, rule_names, digest)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, analyze_and_audit, html, base_url, rule_names, digest)
+
+
+async def audit_html_async(html: str, rule_names=None, digest: str = "") -> PageAudit:
+    """Run `audit_html` in the parse process pool (inline when PARSE_WORKERS=0)."""
+    rule_names = tuple(rule_names or default_rules())
+    executor = get_parse_executor()
+    if executor is None:
+        return audit_html(html, rule_names, digest)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, audit_html, html, rule_names, digest)
+
+
+class AuditSummary:
+    """
+    Site-wide totals, updated one page at a time. The state is a plain dict
+    (kept in the crawl stats, so checkpoints carry it across a resume).
+    """
+
+    def __init__(self, state: dict | None = None):
+        self.state = state if state is not None else {}
+        self.state.setdefault("pages", 0)
+        self.state.setdefault("cached_pages", 0)
+        self.state.setdefault("pages_with_findings", 0)
+        self.state.setdefault("rules", {})
+
+    def add(self, audit: PageAudit) -> None:
+        state = self.state
+        state["pages"] += 1
+        state["cached_pages"] += audit.cached
+        state["pages_with_findings"] += bool(audit.findings)
+        per_rule = Counter((f.rule, f.severity) for f in audit.findings)
+        for name, count in audit.checked.items():
+            rule = state["rules"].setdefault(name, {"checked": 0, "errors": 0, "warnings": 0, "pages_failing": 0,
+                                                    "runs": 0, "seconds": 0.0})
+            errors, warnings = per_rule[(name, "error")], per_rule[(name, "warning")]
+            rule["checked"] += count
+            rule["errors"] += errors
+            rule["warnings"] += warnings
+            rule["pages_failing"] += bool(errors or warnings)
+            if not audit.cached:
+                rule["runs"] += 1
+                rule["seconds"] += audit.rule_seconds.get(name, 0.0)
+
+    def timings(self) -> dict:
+        """Per-rule run time over the pages actually audited (not served from the findings store), slowest first."""
+        rules = sorted(self.state["rules"].items(), key=lambda kv: -kv[1]["seconds"])
+        return {
+            name: {"runs": r["runs"], "total_s": round(r["seconds"], 3),
+                   "mean_ms": round(r["seconds"] / r["runs"] * 1000, 3) if r["runs"] else 0.0}
+            for name, r in rules
+        }
+
+    def report(self) -> dict:
+        return {
+            "pages": self.state["pages"],
+            "cached_pages": self.state["cached_pages"],
+            "pages_with_findings": self.state["pages_with_findings"],
+            "rules": {name: {k: v for k, v in r.items() if k not in ("runs", "seconds")}
+                      for name, r in sorted(self.state["rules"].items())},
+            "timings": self.timings(),
+        }
@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.crawler.audit import (RULES, Finding, PageAudit, analyze_and_audit_async, audit_html_async, content_hash,
+                               default_rules, rule_set_signature)
+from src.crawler.html_analysis import PageAnalysis, analyze_html_async
+from src.crawler.metrics import AUDIT_RULE_SECONDS
+
+AUDIT_STORE_PATH = os.getenv("AUDIT_STORE_PATH", os.path.join("tmp", "cache", "audits.sqlite"))
+AUDIT_STORE_MAX_ENTRIES = int(os.getenv("AUDIT_STORE_MAX_ENTRIES", "200000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    key TEXT PRIMARY KEY,
+    audit TEXT NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS audits_accessed_at ON audits (accessed_at);
+"""
+
+
+def dump_audit(audit: PageAudit) -> str:
+    return json.dumps({
+        "findings": [list(f) for f in audit.findings],
+        "checked": audit.checked,
+        "rule_seconds": audit.rule_seconds,
+    }, separators=(",", ":"))
+
+
+def load_audit(digest: str, data: str) -> PageAudit:
+    raw = json.loads(data)
+    return PageAudit(digest, tuple(Finding(*f) for f in raw["findings"]), raw["checked"],
+                     raw["rule_seconds"], cached=True)
+
+
+class AuditStore:
+    """
+    On-disk SQLite store of per-page findings keyed by content hash and rule
+    set, so a page whose HTML has not changed is never audited twice. Once
+    it holds more than `max_entries` pages the least recently used go.
+    """
+
+    def __init__(self, path: str = AUDIT_STORE_PATH, max_entries: int = AUDIT_STORE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._count = self._db.execute("SELECT COUNT(*) FROM audits").fetchone()[0]
+
+    def get(self, digest: str, signature: str) -> PageAudit | None:
+        key = f"{digest}:{signature}"
+        with self._lock:
+            row = self._db.execute("SELECT audit FROM audits WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE audits SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return load_audit(digest, row[0])
+
+    def put(self, signature: str, audit: PageAudit) -> None:
+        key = f"{audit.content_hash}:{signature}"
+        with self._lock:
+            cursor = self._db.execute("INSERT OR IGNORE INTO audits VALUES (?, ?, ?)",
+                                      (key, dump_audit(audit), time.time()))
+            self._count += cursor.rowcount
+            if self._count > self.max_entries:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        doomed = self._count - int(self.max_entries * 0.9)
+        self._db.execute("DELETE FROM audits WHERE key IN "
+                         "(SELECT key FROM audits ORDER BY accessed_at LIMIT ?)", (doomed,))
+        self._count -= doomed
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared_store: AuditStore | None = None
+
+
+def get_audit_store() -> AuditStore:
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = AuditStore()
+    return _shared_store
+
+
+class PageAuditor:
+    """
+    Runs a rule set over pages, reusing stored findings for HTML it has
+    seen before and running the rules in the parse pool otherwise.
+    """
+
+    def __init__(self, rule_names=None, store: AuditStore | None = None):
+        self.rule_names = tuple(rule_names or default_rules())
+        unknown = [name for name in self.rule_names if name not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown audit rules: {', '.join(unknown)}")
+        self.signature = rule_set_signature(self.rule_names)
+        self.store = store
+
+    async def audit(self, html: str) -> PageAudit:
+        digest = content_hash(html)
+        if self.store is not None:
+            cached = self.store.get(digest, self.signature)
+            if cached is not None:
+                return cached
+        return self._record(await audit_html_async(html, self.rule_names, digest))
+
+    async def analyze(self, html: str, base_url: str) -> PageAnalysis:
+        """`analyze_html_async` with the page's audit attached, parsing `html` only once."""
+        digest = content_hash(html)
+        if self.store is not None:
+            cached = self.store.get(digest, self.signature)
+            if cached is not None:
+                return (await analyze_html_async(html, base_url))._replace(audit=cached)
+        analysis = await analyze_and_audit_async(html, base_url, self.rule_names, digest)
+        self._record(analysis.audit)
+        return analysis
+
+    def _record(self, audit: PageAudit) -> PageAudit:
+        for name, seconds in audit.rule_seconds.items():
+            AUDIT_RULE_SECONDS.observe(seconds, name)
+        if self.store is not None:
+            self.store.put(self.signature, audit)
+        return audit
@@ -0,0 +1,196 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from src.crawler.metrics import span
+
+BLOCKED_RESOURCES = {"image", "stylesheet", "font", "media"}
+
+
+async def _block_heavy_resources(route, request):
+    try:
+        if request.resource_type in BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+    except Exception:
+        # The context was closed while the request was still in flight.
+        pass
+
+
+class _ContextSlot:
+    __slots__ = ("browser_index", "browser", "context", "pages_served", "closed")
+
+    def __init__(self, browser_index: int):
+        self.browser_index = browser_index
+        self.browser = None
+        self.context = None
+        self.pages_served = 0
+        self.closed = True
+
+
+class BrowserPool:
+    """
+    Long-lived pool of Chromium browsers with reusable contexts.
+
+    Pages are leased with `async with pool.page() as page:`. Each context is
+    recycled after `recycle_after` pages and a disconnected browser is
+    relaunched on the next lease. `wait_strategies` remembers, per domain,
+    the readiness strategy its rendered pages needed.
+    """
+
+    def __init__(self, browsers: int = 2, contexts_per_browser: int = 4,
+                 recycle_after: int = 50, headless: bool = True):
+        self.browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.headless = headless
+        self.browser_launches = 0
+        self.wait_strategies: dict[str, str] = {}
+        self._pw = None
+        self._browsers = []
+        self._browser_locks = []
+        self._slots: asyncio.Queue | None = None
+        self._all_slots: list[_ContextSlot] = []
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    @classmethod
+    def for_concurrency(cls, concurrency: int, contexts_per_browser: int = 4, **kwargs) -> "BrowserPool":
+        concurrency = max(1, concurrency or 1)
+        browsers = -(-concurrency // contexts_per_browser)
+        return cls(browsers=browsers, contexts_per_browser=min(concurrency, contexts_per_browser), **kwargs)
+
+    @property
+    def size(self) -> int:
+        return self.browsers * self.contexts_per_browser
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    async def start(self) -> "BrowserPool":
+        async with self._lock:
+            if self._started:
+                return self
+            # Imported on first start so HTTP-only processes never load Playwright.
+            from playwright.async_api import async_playwright
+            self._pw = await async_playwright().start()
+            self._browsers = [await self._launch() for _ in range(self.browsers)]
+            self._browser_locks = [asyncio.Lock() for _ in range(self.browsers)]
+            self._slots = asyncio.Queue()
+            self._all_slots = []
+            for i in range(self.browsers):
+                for _ in range(self.contexts_per_browser):
+                    slot = _ContextSlot(i)
+                    await self._open_context(slot)
+                    self._all_slots.append(slot)
+                    self._slots.put_nowait(slot)
+            self._started = True
+        return self
+
+    async def close(self) -> None:
+        async with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            for slot in self._all_slots:
+                await self._close_context(slot)
+            for browser in self._browsers:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            await self._pw.stop()
+            self._pw = None
+            self._browsers = []
+            self._all_slots = []
+
+    async def _launch(self):
+        self.browser_launches += 1
+        return await self._pw.chromium.launch(headless=self.headless)
+
+    async def _healthy_browser(self, index: int):
+        async with self._browser_locks[index]:
+            browser = self._browsers[index]
+            if not browser.is_connected():
+                print(f"⚠️ Browser {index} disconnected, relaunching")
+                browser = self._browsers[index] = await self._launch()
+            return browser
+
+    async def _open_context(self, slot: _ContextSlot) -> None:
+        browser = await self._healthy_browser(slot.browser_index)
+        context = await browser.new_context()
+        await context.route("**/*", _block_heavy_resources)
+
+        def _on_close(_):
+            slot.closed = True
+        context.on("close", _on_close)
+
+        slot.browser = browser
+        slot.context = context
+        slot.pages_served = 0
+        slot.closed = False
+
+    async def _close_context(self, slot: _ContextSlot) -> None:
+        if slot.context is not None and not slot.closed:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        slot.context = None
+        slot.closed = True
+
+    async def _ensure_healthy(self, slot: _ContextSlot) -> None:
+        stale = (
+            slot.closed
+            or slot.pages_served >= self.recycle_after
+            or slot.browser is not self._browsers[slot.browser_index]
+            or not slot.browser.is_connected()
+        )
+        if stale:
+            await self._close_context(slot)
+            await self._open_context(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        with span("browser_acquire", "slot"):
+            if not self._started:
+                await self.start()
+            slot = await self._slots.get()
+        page = None
+        try:
+            with span("browser_acquire", "new_page"):
+                await self._ensure_healthy(slot)
+                page = await slot.context.new_page()
+            yield page
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    slot.closed = True
+            slot.pages_served += 1
+            self._slots.put_nowait(slot)
+
+
+_shared_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide pool used by the API; sized from the environment."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = BrowserPool(
+            browsers=int(os.getenv("BROWSER_POOL_BROWSERS", "2")),
+            contexts_per_browser=int(os.getenv("BROWSER_POOL_CONTEXTS", "4")),
+            recycle_after=int(os.getenv("BROWSER_POOL_RECYCLE_AFTER", "50")),
+        )
+    return _shared_pool
+
+
+async def close_browser_pool() -> None:
+    global _shared_pool
+    if _shared_pool is not None:
+        await _shared_pool.close()
+        _shared_pool = None
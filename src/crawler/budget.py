@@ -0,0 +1,130 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+class CrawlBudget:
+    """
+    Limits that keep a crawl from running away (calendars, faceted search).
+
+    `admit()` is asked once per newly discovered URL and enforces the
+    per-path-prefix caps (e.g. {"/events/": 200}). max_pages counts pages
+    actually crawled: `page_done()` is called for each completed HTML page,
+    so failed fetches, redirects off-site and attachments don't use it up.
+    `exhausted()` is checked after each page for the page, time and byte
+    budgets.
+    """
+
+    def __init__(self, max_pages: int | None = None, max_seconds: float | None = None,
+                 max_bytes: int | None = None, prefix_caps: dict[str, int] | None = None):
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        # Longest prefix first, so "/shop/sale/" wins over "/shop/".
+        self.prefix_caps = sorted((prefix_caps or {}).items(), key=lambda kv: -len(kv[0]))
+        self.pages = 0
+        self.rejected = 0
+        self.bytes = 0
+        self._prefix_counts = Counter()
+        self._started = time.monotonic()
+
+    def _prefix(self, url: str) -> str | None:
+        path = urlsplit(url).path or "/"
+        for prefix, _ in self.prefix_caps:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+    def note(self, url: str, done: bool = False) -> None:
+        """Count a URL without checking it (e.g. restored from a checkpoint), and as a page if `done`."""
+        self.pages += done
+        prefix = self._prefix(url)
+        if prefix is not None:
+            self._prefix_counts[prefix] += 1
+
+    def admit(self, url: str) -> bool:
+        prefix = self._prefix(url)
+        if prefix is not None and self._prefix_counts[prefix] >= dict(self.prefix_caps)[prefix]:
+            self.rejected += 1
+            return False
+        self.note(url)
+        return True
+
+    def page_done(self) -> bool:
+        """Count a crawled page; False if max_pages was already reached (pages in flight then are dropped)."""
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return False
+        self.pages += 1
+        return True
+
+    def add_bytes(self, n: int) -> None:
+        self.bytes += n
+
+    def exhausted(self) -> str | None:
+        """Name of the budget that ran out, or None."""
+        if self.max_pages is not None and self.pages >= self.max_pages:
+            return "max_pages"
+        if self.max_seconds is not None and time.monotonic() - self._started >= self.max_seconds:
+            return "max_seconds"
+        if self.max_bytes is not None and self.bytes >= self.max_bytes:
+            return "max_bytes"
+        return None
+
+
+class SharedFetchBudget:
+    """
+    Fetch slots shared by several sites crawled at once. At most
+    `concurrency` fetches run together and `max_pages` in total; a free slot
+    goes to the waiting site that has fetched the fewest pages so far, so a
+    large site cannot starve small ones.
+
+    `acquire()` returns False once the page budget is spent.
+    """
+
+    def __init__(self, concurrency: int, max_pages: int | None = None):
+        self.concurrency = max(1, concurrency)
+        self.max_pages = max_pages
+        self.fetched = Counter()
+        self.total = 0
+        self.active = 0
+        self._waiters: list = []  # heap of (pages fetched by site, seq, site, future)
+        self._seq = itertools.count()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_pages is not None and self.total >= self.max_pages
+
+    async def acquire(self, site: str) -> bool:
+        if self.exhausted:
+            return False
+        if self.active < self.concurrency and not self._waiters:
+            self._grant(site)
+            return True
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (self.fetched[site], next(self._seq), site, fut))
+        try:
+            return await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.result():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        while self._waiters and (self.active < self.concurrency or self.exhausted):
+            _, _, site, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            if self.exhausted:
+                fut.set_result(False)
+            else:
+                self._grant(site)
+                fut.set_result(True)
+
+    def _grant(self, site: str) -> None:
+        self.active += 1
+        self.total += 1
+        self.fetched[site] += 1
@@ -0,0 +1,93 @@
+import json
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+
+CHECKPOINT_EVERY_PAGES = int(os.getenv("CHECKPOINT_EVERY_PAGES", "50"))
+CHECKPOINT_EVERY_SECONDS = float(os.getenv("CHECKPOINT_EVERY_SECONDS", "30"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    parent TEXT,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class CheckpointState(NamedTuple):
+    rows: list[tuple[str, int, str | None, bool]]  # (url, depth, parent, done) in discovery order
+    meta: dict
+
+    @property
+    def done_count(self) -> int:
+        return sum(1 for row in self.rows if row[3])
+
+
+class CrawlCheckpoint:
+    """
+    SQLite checkpoint of a crawl's frontier, visited set and parent map.
+
+    Changes are buffered and written every `every_pages` completed pages or
+    `every_seconds` seconds, whichever comes first, together with a
+    snapshot of the crawl's counters so a resumed crawl picks up exactly
+    where the last checkpoint left off.
+    """
+
+    def __init__(self, path: str, every_pages: int = CHECKPOINT_EVERY_PAGES,
+                 every_seconds: float = CHECKPOINT_EVERY_SECONDS):
+        self.path = path
+        self.every_pages = max(1, every_pages)
+        self.every_seconds = every_seconds
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._enqueued: list[tuple[str, int, str | None]] = []
+        self._done: list[tuple[str]] = []
+        self._last_flush = time.monotonic()
+
+    def enqueued(self, url: str, depth: int, parent: str | None) -> None:
+        self._enqueued.append((url, depth, parent))
+
+    def done(self, url: str) -> None:
+        self._done.append((url,))
+
+    def maybe_flush(self, snapshot) -> bool:
+        """Flush if the page or time interval has elapsed; `snapshot()` returns the meta dict."""
+        if len(self._done) < self.every_pages and time.monotonic() - self._last_flush < self.every_seconds:
+            return False
+        self.flush(snapshot())
+        return True
+
+    def flush(self, meta: dict) -> None:
+        with self._db:
+            self._db.executemany("INSERT OR IGNORE INTO frontier (url, depth, parent) VALUES (?, ?, ?)",
+                                 self._enqueued)
+            self._db.executemany("UPDATE frontier SET done = 1 WHERE url = ?", self._done)
+            self._db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                 [(k, json.dumps(v)) for k, v in meta.items()])
+        self._enqueued.clear()
+        self._done.clear()
+        self._last_flush = time.monotonic()
+
+    def main_url(self) -> str | None:
+        """URL the checkpointed crawl started from, without loading its frontier."""
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'main_url'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def load(self) -> CheckpointState | None:
+        meta = {k: json.loads(v) for k, v in self._db.execute("SELECT key, value FROM meta")}
+        if not meta:
+            return None
+        rows = [(url, depth, parent, bool(done)) for url, depth, parent, done in self._db.execute(
+            "SELECT url, depth, parent, done FROM frontier ORDER BY rowid")]
+        return CheckpointState(rows, meta)
+
+    def close(self) -> None:
+        self._db.close()
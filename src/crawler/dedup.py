@@ -0,0 +1,126 @@
+import os
+import re
+from collections import Counter, defaultdict
+from hashlib import blake2b
+from urllib.parse import urlsplit
+
+NEAR_DUPLICATE_DISTANCE = int(os.getenv("NEAR_DUPLICATE_DISTANCE", "3"))
+DEDUP_MIN_WORDS = int(os.getenv("DEDUP_MIN_WORDS", "50"))
+TRAP_MAX_PATH_SEGMENTS = int(os.getenv("TRAP_MAX_PATH_SEGMENTS", "12"))
+TRAP_MAX_SEGMENT_REPEATS = int(os.getenv("TRAP_MAX_SEGMENT_REPEATS", "3"))
+TRAP_MAX_QUERY_VARIANTS = int(os.getenv("TRAP_MAX_QUERY_VARIANTS", "100"))
+TRAP_MIN_SAMPLES = int(os.getenv("TRAP_MIN_SAMPLES", "8"))
+TRAP_DUPLICATE_RATIO = float(os.getenv("TRAP_DUPLICATE_RATIO", "0.8"))
+
+SHINGLE_WORDS = 3
+_BANDS = 4  # 64-bit fingerprints in 16-bit bands: distance <= 3 shares at least one band
+_BAND_BITS = 64 // _BANDS
+_WORD_RE = re.compile(r"\w+")
+_VARIABLE_SEGMENT_RE = re.compile(r"\d")
+
+
+def simhash(text: str, min_words: int = DEDUP_MIN_WORDS) -> int:
+    """
+    64-bit SimHash of the word 3-shingles in `text`; 0 when there are fewer
+    than `min_words` words, which callers treat as "too little text to judge".
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < max(min_words, SHINGLE_WORDS):
+        return 0
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    rows = [format(int.from_bytes(blake2b(s.encode(), digest_size=8).digest(), "big"), "064b")
+            for s in shingles]
+    half = len(rows) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*rows)), 2)
+
+
+class NearDuplicateIndex:
+    """
+    Fingerprints of the pages crawled so far, keyed by URL store id (resolve
+    with `store.url()` when reporting). `add()` returns the id of an earlier
+    page within `max_distance` bits, or None and remembers the page.
+    Lookups only compare against pages sharing a 16-bit band.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        self._bands: list[dict[int, list[tuple[int, int]]]] = [defaultdict(list) for _ in range(_BANDS)]
+
+    def add(self, page_id: int, fingerprint: int) -> int | None:
+        if not fingerprint:
+            return None
+        mask = (1 << _BAND_BITS) - 1
+        keys = [(fingerprint >> (i * _BAND_BITS)) & mask for i in range(_BANDS)]
+        for band, key in zip(self._bands, keys):
+            for other, other_id in band.get(key, ()):
+                if (fingerprint ^ other).bit_count() <= self.max_distance:
+                    return other_id
+        for band, key in zip(self._bands, keys):
+            band[key].append((fingerprint, page_id))
+        return None
+
+
+def url_pattern(url: str) -> str:
+    """'https://x.com/cal/2024/10?day=3&view=w' -> 'x.com/cal/#/#?day&view'."""
+    parts = urlsplit(url)
+    path = "/".join("#" if _VARIABLE_SEGMENT_RE.search(s) else s for s in parts.path.split("/"))
+    params = sorted({p.partition("=")[0] for p in parts.query.split("&") if p})
+    return f"{parts.netloc}{path}" + ("?" + "&".join(params) if params else "")
+
+
+class UrlTrapDetector:
+    """
+    Spots URL spaces that never end: paths nested or looping too deep,
+    one path with ever more query-string permutations (sort/filter/session
+    parameters), and URL patterns whose pages keep turning out to be
+    near-duplicates of pages already crawled.
+
+    `check()` is asked once per newly discovered URL; `record()` feeds back
+    whether a crawled page was a duplicate so patterns are learned.
+    """
+
+    def __init__(self, max_path_segments: int = TRAP_MAX_PATH_SEGMENTS,
+                 max_segment_repeats: int = TRAP_MAX_SEGMENT_REPEATS,
+                 max_query_variants: int = TRAP_MAX_QUERY_VARIANTS,
+                 min_samples: int = TRAP_MIN_SAMPLES, duplicate_ratio: float = TRAP_DUPLICATE_RATIO):
+        self.max_path_segments = max_path_segments
+        self.max_segment_repeats = max_segment_repeats
+        self.max_query_variants = max_query_variants
+        self.min_samples = min_samples
+        self.duplicate_ratio = duplicate_ratio
+        self.trapped: dict[str, str] = {}  # pattern -> reason
+        self._query_variants = Counter()
+        self._samples: dict[str, list[int]] = defaultdict(lambda: [0, 0])  # pattern -> [pages, duplicates]
+
+    def check(self, url: str) -> str | None:
+        """Reason `url` looks like a trap, or None."""
+        parts = urlsplit(url)
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) > self.max_path_segments:
+            return "path_depth"
+        if segments and max(Counter(segments).values()) >= self.max_segment_repeats:
+            return "path_loop"
+        pattern = url_pattern(url)
+        if pattern in self.trapped:
+            return self.trapped[pattern]
+        if parts.query:
+            key = (parts.netloc, parts.path)
+            if self._query_variants[key] >= self.max_query_variants:
+                return "query_explosion"
+            self._query_variants[key] += 1
+        return None
+
+    def is_trapped(self, url: str) -> bool:
+        """True if `url` matches a pattern learned to be a trap (for URLs queued before it was)."""
+        return bool(self.trapped) and url_pattern(url) in self.trapped
+
+    def record(self, url: str, duplicate: bool) -> None:
+        pattern = url_pattern(url)
+        if pattern in self.trapped:
+            return
+        sample = self._samples[pattern]
+        sample[0] += 1
+        sample[1] += duplicate
+        if sample[0] >= self.min_samples and sample[1] >= self.duplicate_ratio * sample[0]:
+            self.trapped[pattern] = "duplicate_pattern"
+            print(f"🪤 Not expanding {pattern}: {sample[1]} of {sample[0]} pages were duplicates")
@@ -0,0 +1,323 @@
+"""
+Coordinator/worker crawl mode.
+
+The coordinator keeps the frontier (CrawlScheduler + URL store), politeness
+and all report writing; worker processes only fetch and parse. Pages are
+sharded over workers by a hash of the URL and travel through a
+multiprocessing manager (the "broker"), so workers can run as local
+processes or on other machines. Tasks and results travel in batches: a
+dedicated thread on each side sends everything that piled up while its
+previous round trip was in flight, so one broker call carries many pages.
+
+This is not the way to speed up a crawl on one machine. Every page still
+crosses the broker twice, and on a single host the workers compete with
+the coordinator for the same cores. Raise `concurrency` and
+PARSE_WORKERS instead (see benchmarks/bench_crawl.py). Workers pay off
+when fetching, rendering and parsing have to be spread across machines.
+
+    CRAWL_BROKER_ADDRESS=0.0.0.0:50000 CRAWL_BROKER_AUTHKEY=secret  (coordinator)
+    CRAWL_BROKER_AUTHKEY=secret python -m src.crawler.distributed coordinator-host:50000 --shard 3
+"""
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import queue
+import secrets
+import threading
+import zlib
+from multiprocessing.managers import BaseManager
+
+BROKER_ADDRESS = os.getenv("CRAWL_BROKER_ADDRESS", "127.0.0.1:0")
+BROKER_AUTHKEY = os.getenv("CRAWL_BROKER_AUTHKEY", "")
+# Set when workers are started by hand (e.g. on other machines) instead of spawned locally.
+EXTERNAL_WORKERS = os.getenv("CRAWL_EXTERNAL_WORKERS", "") == "1"
+
+_QUEUES: dict[str, queue.Queue] = {}
+
+
+def _get_queue(name: str) -> queue.Queue:
+    # Runs inside the broker process.
+    if name not in _QUEUES:
+        _QUEUES[name] = queue.Queue()
+    return _QUEUES[name]
+
+
+class Broker(BaseManager):
+    pass
+
+
+Broker.register("queue", callable=_get_queue)
+
+
+def _parse_address(address: str) -> tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def shard_of(url: str, shards: int) -> int:
+    """Stable across processes and machines, unlike hash()."""
+    return zlib.crc32(url.encode("utf-8")) % shards
+
+
+class RemoteLoader:
+    """
+    Drop-in for `load_page` that hands the page to its shard's worker and
+    waits for the result. Returns (html, analysis, from_cache) like
+    `load_page`, except html is only sent back for the homepage.
+    """
+
+    def __init__(self, workers: int, concurrency: int, timeout: int,
+                 render_mode: str = "auto", cache_mode: str = "off", audit_rules=None):
+        self.workers = workers
+        self.settings = {"concurrency": concurrency, "timeout": timeout,
+                         "render_mode": render_mode, "cache_mode": cache_mode,
+                         "audit_rules": list(audit_rules) if audit_rules else None}
+        self.page_timeout = timeout / 1000 * 3 + 30
+        self.pages_per_shard = [0] * workers
+        self.bytes_received = 0
+        self.failure: Exception | None = None  # set once a worker process dies
+        self._authkey = (BROKER_AUTHKEY or secrets.token_hex(16)).encode()
+        self._broker = Broker(address=_parse_address(BROKER_ADDRESS), authkey=self._authkey)
+        self._seq = itertools.count()
+        self._pending: dict[int, tuple[int, asyncio.Future]] = {}
+        self._processes: list[multiprocessing.Process] = []
+        self._stop = threading.Event()
+        self._tasks = []
+        self._outbox: list[list] = [[] for _ in range(workers)]
+        self._flush_scheduled = False
+        self._sends: queue.SimpleQueue = queue.SimpleQueue()
+        self._sender = None
+        self._reader = None
+        self._monitor = None
+        self._on_failure = None
+
+    async def start(self, on_failure=None) -> None:
+        """Start the broker and workers; `on_failure(error)` is called if a worker process dies."""
+        loop = asyncio.get_running_loop()
+        await asyncio.to_thread(self._broker.start)
+        self._tasks = [self._broker.queue(f"tasks-{i}") for i in range(self.workers)]
+        for q in self._tasks:
+            q.put(self.settings)
+
+        host, port = self._broker.address
+        if EXTERNAL_WORKERS:
+            print(f"🛰️ Broker listening on {host}:{port}, waiting for {self.workers} external workers")
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            for shard in range(self.workers):
+                p = ctx.Process(target=run_worker, args=(f"{host}:{port}", self._authkey, shard), daemon=True)
+                p.start()
+                self._processes.append(p)
+        self._sender = threading.Thread(target=self._send_tasks, daemon=True)
+        self._sender.start()
+        self._reader = threading.Thread(target=self._read_results, args=(loop,), daemon=True)
+        self._reader.start()
+        self._on_failure = on_failure
+        self._monitor = asyncio.create_task(self._watch_workers())
+
+    def _flush(self) -> None:
+        # Runs once per event-loop pass: every page queued during the pass goes out together.
+        self._flush_scheduled = False
+        for shard, batch in enumerate(self._outbox):
+            if batch:
+                self._sends.put((shard, batch))
+                self._outbox[shard] = []
+
+    def _send_tasks(self) -> None:
+        while True:
+            item = self._sends.get()
+            batches: dict[int, list] = {}
+            while item is not None:
+                shard, batch = item
+                batches.setdefault(shard, []).extend(batch)
+                try:
+                    item = self._sends.get_nowait()
+                except queue.Empty:
+                    break
+            for shard, batch in batches.items():
+                try:
+                    self._tasks[shard].put(batch)
+                except (EOFError, OSError):
+                    return
+            if item is None:
+                return
+
+    def _read_results(self, loop) -> None:
+        results = self._broker.queue("results")
+        while not self._stop.is_set():
+            try:
+                batch = results.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            loop.call_soon_threadsafe(self._resolve, batch)
+
+    def _resolve(self, batch) -> None:
+        for seq, result, error, size in batch:
+            shard, fut = self._pending.pop(seq, (None, None))
+            if fut is None or fut.done():
+                continue
+            if error:
+                fut.set_exception(RuntimeError(error))
+            else:
+                self.pages_per_shard[shard] += 1
+                self.bytes_received += size
+                fut.set_result(result)
+
+    def _worker_died(self, shard: int) -> Exception:
+        # A dead worker is fatal: its shard's pages can't be fetched, so rather than
+        # letting each of them fail in turn, fail what it had in flight and stop the crawl.
+        if self.failure is None:
+            self.failure = RuntimeError(f"crawl worker {shard} exited with code {self._processes[shard].exitcode}")
+            for seq, (s, fut) in list(self._pending.items()):
+                if s == shard and not fut.done():
+                    fut.set_exception(self.failure)
+                    del self._pending[seq]
+            if self._on_failure is not None:
+                self._on_failure(self.failure)
+        return self.failure
+
+    async def _watch_workers(self) -> None:
+        while True:
+            await asyncio.sleep(1)
+            for shard, p in enumerate(self._processes):
+                if not p.is_alive():
+                    raise self._worker_died(shard)
+
+    async def __call__(self, url: str, depth: int):
+        if self.failure is not None:
+            raise self.failure
+        seq = next(self._seq)
+        shard = shard_of(url, self.workers)
+        if self._processes and not self._processes[shard].is_alive():
+            raise self._worker_died(shard)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending[seq] = (shard, fut)
+        self._outbox[shard].append((seq, url, depth))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        try:
+            return await asyncio.wait_for(fut, self.page_timeout)
+        finally:
+            self._pending.pop(seq, None)
+
+    async def close(self) -> None:
+        if self._monitor:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+        if self._sender:
+            self._sends.put(None)
+            await asyncio.to_thread(self._sender.join)
+        for q in self._tasks:
+            await asyncio.to_thread(q.put, None)
+        for p in self._processes:
+            await asyncio.to_thread(p.join, 30)
+            if p.is_alive():
+                p.terminate()
+        self._stop.set()
+        if self._reader:
+            await asyncio.to_thread(self._reader.join)
+        if self._tasks:
+            self._broker.shutdown()
+
+
+def run_worker(address: str, authkey: bytes, shard: int) -> None:
+    asyncio.run(_serve_shard(address, authkey, shard))
+
+
+async def _serve_shard(address: str, authkey: bytes, shard: int) -> None:
+    # Each worker is its own process, so parse inline instead of via another pool.
+    from src.crawler import html_analysis
+    html_analysis.PARSE_WORKERS = 0
+    from src.crawler.browser_pool import BrowserPool
+    from src.crawler.http_fetcher import HttpFetcher
+    from src.crawler.audit_store import PageAuditor, get_audit_store
+    from src.crawler.page_cache import get_page_cache
+    from src.crawler.test import load_page
+
+    broker = Broker(address=_parse_address(address), authkey=authkey)
+    broker.connect()
+    tasks = broker.queue(f"tasks-{shard}")
+    results = broker.queue("results")
+    settings = await asyncio.to_thread(tasks.get)
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: queue.SimpleQueue = queue.SimpleQueue()
+
+    def receive():
+        while True:
+            batch = tasks.get()
+            loop.call_soon_threadsafe(inbox.put_nowait, batch)
+            if batch is None:
+                return
+
+    def send():
+        # Everything that finished during the previous put goes out in the next one.
+        while True:
+            item = outbox.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                try:
+                    item = outbox.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                results.put(batch)
+            if item is None:
+                return
+
+    concurrency = settings["concurrency"]
+    pool = BrowserPool.for_concurrency(concurrency)
+    http = HttpFetcher(max_connections=max(concurrency, 10))
+    cache = get_page_cache() if settings["cache_mode"] != "off" else None
+    auditor = PageAuditor(settings["audit_rules"], get_audit_store()) if settings.get("audit_rules") else None
+    slots = asyncio.Semaphore(concurrency)
+
+    async def handle(seq, url, depth):
+        await slots.acquire()
+        try:
+            html, analysis, from_cache = await load_page(url, depth, settings["timeout"], pool,
+                                                         settings["render_mode"], http, cache,
+                                                         settings["cache_mode"], auditor)
+            size = 0 if from_cache else len(html or "")
+            item = (seq, (html if depth == 0 else "", analysis, from_cache), None, size)
+        except Exception as e:
+            item = (seq, None, f"{type(e).__name__}: {e}", 0)
+        finally:
+            slots.release()
+        outbox.put(item)
+
+    receiver = threading.Thread(target=receive, daemon=True)
+    sender = threading.Thread(target=send, daemon=True)
+    receiver.start()
+    sender.start()
+    running = set()
+    try:
+        while (batch := await inbox.get()) is not None:
+            for task in batch:
+                t = asyncio.create_task(handle(*task))
+                running.add(t)
+                t.add_done_callback(running.discard)
+        await asyncio.gather(*running)
+    finally:
+        outbox.put(None)
+        await asyncio.to_thread(sender.join)
+        await http.close()
+        await pool.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run one crawl worker shard against a coordinator's broker.")
+    ap.add_argument("address", help="broker host:port printed by the coordinator")
+    ap.add_argument("--shard", type=int, required=True)
+    args = ap.parse_args()
+    if not BROKER_AUTHKEY:
+        raise SystemExit("CRAWL_BROKER_AUTHKEY must match the coordinator's")
+    run_worker(args.address, BROKER_AUTHKEY.encode(), args.shard)
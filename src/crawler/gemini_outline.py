@@ -1,23 +1,62 @@
 import os
-from google.generativeai import configure, GenerativeModel
+from collections import OrderedDict
 from dotenv import load_dotenv
 
+from src.crawler.metrics import span
+from src.crawler.nav_reducer import reduce_homepage
+
 load_dotenv()
 
-def generate_sitemap_outline_from_homepage(html_content):
+MODEL_NAME = "models/gemini-1.5-pro-latest"
+OUTLINE_TOKEN_BUDGET = int(os.getenv("OUTLINE_TOKEN_BUDGET", "2000"))
+OUTLINE_MEMO_SIZE = 256
+_model = None
+_outline_memo: OrderedDict = OrderedDict()
+
+def get_gemini_model():
+    """Configure the Gemini client once per process and reuse the model."""
+    global _model
+    if _model is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise EnvironmentError("GEMINI_API_KEY is not set in the .env file")
+        # Imported here: the SDK is slow to import and only LLM stages need it.
+        from google.generativeai import configure, GenerativeModel
+        configure(api_key=api_key)
+        _model = GenerativeModel(MODEL_NAME)
+    return _model
+
+def generate_sitemap_outline_from_homepage(html_content, mode: str = "llm",
+                                           token_budget: int = OUTLINE_TOKEN_BUDGET):
     """
     Generate a clean sitemap outline using only the visible top navbar and dropdown content.
     No technical paths or URLs. Start with website name.
+
+    The homepage is first reduced to its navigation labels. mode="rules"
+    returns that reduction as the outline without calling the LLM, which is
+    also the fallback when the LLM call fails. LLM outlines are memoized by
+    a hash of the reduced navigation.
     """
+    nav = reduce_homepage(html_content)
+    if mode == "rules" or not nav.items:
+        return nav.to_outline()
+
+    key = (nav.content_hash, token_budget)
+    if key in _outline_memo:
+        _outline_memo.move_to_end(key)
+        return _outline_memo[key]
+
     prompt = f"""
 You are a web UX expert.
 
-Below is the homepage HTML of a website.
+Below is the navigation content extracted from a website's homepage: the
+site name, then the top navigation bar and its dropdown menus as an
+indented list.
 
 Your task:
-- Read only the **visible top navigation bar** and **its dropdown menus**
 - Extract **clear, human-readable section names**
 - Ignore all URLs, file paths, or technical references
+- Drop utility entries such as login, search, language or cart links
 - Output the sitemap as a **markdown bullet list**
 - Start with the **website name** as the first item
 - Keep it simple and clean — no code, no explanations
@@ -31,46 +70,20 @@ Example:
   - Blog
   - Contact
 
-HTML Content:
-{html_content}
-"""
-
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not set in .env file")
-
-    configure(api_key=api_key)
-    model = GenerativeModel("models/gemini-1.5-pro-latest")
-    response = model.generate_content(prompt)
-    return response.text.strip()
-
-def categorize_external_link(url):
-    """
-    Categorize an external link based on its content or intent.
-    Example categories: Social Media, Blog, Government Site, Documentation, etc.
-    """
-    prompt = f"""
-You are an expert in classifying web links.
-
-Given this external URL, return a short and specific category that describes its type or purpose.
-
-Examples: Blog, Social Media, Government, Documentation, Support, Product, News, Education, Forum, E-commerce, Sports, Navigation, Form Submission, etc.
-
-Do not return the full URL or extra explanation. Just output the **category** as a single line.
-
-URL: {url}
+Navigation:
+{nav.to_prompt_text(token_budget)}
 """
 
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        raise EnvironmentError("GEMINI_API_KEY is not set in the .env file")
-
-    configure(api_key=api_key)
-    model = GenerativeModel("models/gemini-1.5-pro-latest")
-
     try:
-        response = model.generate_content(prompt)
-        return response.text.strip().splitlines()[0]
+        model = get_gemini_model()
+        with span("llm", "outline"):
+            response = model.generate_content(prompt)
+        outline = response.text.strip()
     except Exception as e:
-        print(f"Error categorizing URL: {e}")
-        return "Unknown"
+        print(f"⚠️ LLM outline failed, using rule-based outline: {e}")
+        return nav.to_outline()
+
+    _outline_memo[key] = outline
+    if len(_outline_memo) > OUTLINE_MEMO_SIZE:
+        _outline_memo.popitem(last=False)
+    return outline
@@ -0,0 +1,216 @@
+import asyncio
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urljoin
+
+from src.crawler.dedup import simhash
+
+if TYPE_CHECKING:
+    from src.crawler.audit import PageAudit
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - optional fast parser
+    etree = None
+
+ATTACHMENT_EXTENSIONS = (".pdf", ".docx", ".pptx", ".xlsx", ".zip")
+BAD_ALT_WORDS = {"image", "photo", "picture", "pic", "logo", "icon", "graphic"}
+# Text inside these is left out of the page fingerprint: code, and the
+# boilerplate every page of a site repeats.
+FINGERPRINT_SKIP_TAGS = {"script", "style", "noscript", "template", "nav", "header", "footer"}
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+
+class ImageInfo(NamedTuple):
+    alt: str | None
+    decorative: bool
+    linked: bool
+
+
+class PageAnalysis(NamedTuple):
+    links: tuple[str, ...]  # absolute, deduplicated, in document order
+    attachments: int
+    images: tuple[ImageInfo, ...]
+    accessible_images: int
+    fingerprint: int = 0  # SimHash of the visible text, 0 if too short
+    audit: "PageAudit | None" = None  # attached by load_page when auditing
+
+
+def is_descriptive_alt(alt: str | None) -> bool:
+    if not alt or not alt.strip():
+        return False
+    text = alt.strip().lower()
+    if text in BAD_ALT_WORDS:
+        return False
+    if len(text.split()) <= 1 and any(w in text for w in BAD_ALT_WORDS):
+        return False
+    return True
+
+
+def marked_decorative(attrib) -> bool:
+    return attrib.get("role") == "presentation" or attrib.get("aria-hidden") == "true"
+
+
+def image_info(attrib, linked: bool) -> ImageInfo:
+    alt = attrib.get("alt")
+    return ImageInfo(alt, (alt or "").strip() == "" and marked_decorative(attrib), linked)
+
+
+def alt_counts(images) -> Counter:
+    return Counter(i.alt.strip().lower() for i in images if i.alt is not None)
+
+
+def alt_problem(img: ImageInfo, seen_alts: Counter) -> str | None:
+    """
+    Why an image's alt text fails ("missing", "generic" or "repeated" on
+    the page), or None. Shared by `accessible_images` and the image-alt
+    audit rules, so both judge images the same way.
+    """
+    if img.alt is None:
+        return "missing"
+    if img.decorative:
+        return None
+    if not is_descriptive_alt(img.alt):
+        return "generic"
+    if not img.linked and seen_alts[img.alt.strip().lower()] > 1:
+        return "repeated"
+    return None
+
+
+def is_accessible_image(img: ImageInfo, seen_alts: Counter) -> bool:
+    return alt_problem(img, seen_alts) is None
+
+
+class PageCollector:
+    """Parser target that gathers everything the crawler needs in one pass."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.hrefs = []
+        self.attachments = 0
+        self.images = []
+        self._open_links = 0
+        self._skip_text = 0
+        self._text = []
+
+    def start(self, tag, attrib):
+        tag = tag.lower()
+        if tag in FINGERPRINT_SKIP_TAGS:
+            self._skip_text += 1
+        if tag in ("a", "button"):
+            if tag == "a":
+                href = attrib.get("href")
+                if href is not None:
+                    self.hrefs.append(href)
+                    if href.lower().endswith(ATTACHMENT_EXTENSIONS):
+                        self.attachments += 1
+            self._open_links += 1
+        elif tag == "img":
+            self.images.append(image_info(attrib, self._open_links > 0))
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag in ("a", "button") and self._open_links:
+            self._open_links -= 1
+        elif tag in FINGERPRINT_SKIP_TAGS and self._skip_text:
+            self._skip_text -= 1
+
+    def data(self, data):
+        if not self._skip_text:
+            self._text.append(data)
+
+    def close(self) -> PageAnalysis:
+        links = {}
+        for href in self.hrefs:
+            try:
+                links[urljoin(self.base_url, href)] = None
+            except ValueError:
+                continue
+        seen_alts = alt_counts(self.images)
+        return PageAnalysis(
+            links=tuple(links),
+            attachments=self.attachments,
+            images=tuple(self.images),
+            accessible_images=sum(is_accessible_image(i, seen_alts) for i in self.images),
+            fingerprint=simhash(" ".join(self._text)),
+        )
+
+
+class _StdlibDriver(HTMLParser):
+    # Same tokenizer bs4's "html.parser" builder uses, minus the tree.
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def parse_with_target(html: str, make_target):
+    """
+    Drive a start/end/data/close parser target over `html` with lxml, or
+    html.parser if lxml is missing or fails; returns `target.close()`.
+    """
+    if not html or not html.strip():
+        return make_target().close()
+    if etree is not None:
+        try:
+            parser = etree.HTMLParser(target=make_target())
+            parser.feed(html)
+            return parser.close()
+        except Exception:
+            pass
+    driver = _StdlibDriver(make_target())
+    driver.feed(html)
+    driver.close()
+    return driver.target.close()
+
+
+def analyze_html(html: str, base_url: str) -> PageAnalysis:
+    """Collect links, attachment count, image/alt data and a text fingerprint from `html` in a single parse."""
+    return parse_with_target(html, lambda: PageCollector(base_url))
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if _executor is None and PARSE_WORKERS > 0:
+        # Spawned, not forked: the API process already runs Playwright and worker threads.
+        _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def warm_parse_executor() -> None:
+    """Start the parse worker processes now rather than on the first page."""
+    executor = get_parse_executor()
+    if executor is not None:
+        list(executor.map(analyze_html, [""] * PARSE_WORKERS, [""] * PARSE_WORKERS))
+
+
+async def analyze_html_async(html: str, base_url: str) -> PageAnalysis:
+    """Run `analyze_html` in the parse process pool (inline when PARSE_WORKERS=0)."""
+    executor = get_parse_executor()
+    if executor is None:
+        return analyze_html(html, base_url)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, analyze_html, html, base_url)
+
+
+def shutdown_parse_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
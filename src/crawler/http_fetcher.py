@@ -0,0 +1,127 @@
+import re
+from typing import NamedTuple
+
+import httpx
+
+from src.crawler.metrics import span
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; WebsiteAnalyzer/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate, br",
+}
+
+SPA_ROOT_RE = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|svelte|ember-app)[\"'][^>]*>\s*</div>", re.I)
+NOSCRIPT_WALL_RE = re.compile(
+    r"<noscript[^>]*>(?:(?!</noscript>).){0,500}?(?:enable|requires?|turn on)\s+javascript", re.I | re.S)
+BODY_RE = re.compile(r"<body[^>]*>(.*)</body>", re.I | re.S)
+INVISIBLE_RE = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1>", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]+>")
+ANCHOR_RE = re.compile(r"<a\s", re.I)
+MIN_VISIBLE_TEXT = 40
+# Statuses bot protection answers plain HTTP clients with; a browser may get through.
+BOT_WALL_STATUSES = (401, 403, 429)
+
+
+class HttpPage(NamedTuple):
+    status: int
+    html: str | None
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def bot_wall(self) -> bool:
+        return self.status in BOT_WALL_STATUSES
+
+
+def needs_rendering(html: str) -> bool:
+    """Heuristic: does this server response need a browser to show its links?"""
+    if not html or not html.strip():
+        return True
+    if SPA_ROOT_RE.search(html) or NOSCRIPT_WALL_RE.search(html):
+        return True
+    match = BODY_RE.search(html)
+    body = match.group(1) if match else html
+    has_anchors = ANCHOR_RE.search(body) is not None
+    visible = TAG_RE.sub(" ", INVISIBLE_RE.sub(" ", body)).split()
+    return not has_anchors and len(" ".join(visible)) < MIN_VISIBLE_TEXT
+
+
+class HttpFetcher:
+    """
+    Pooled keep-alive HTTP/2 client for pages that don't need JS rendering.
+
+    `render_decisions` caches, per domain, whether pages were served as
+    static HTML ("http") or needed the browser ("browser").
+    """
+
+    def __init__(self, max_connections: int = 100, headers: dict | None = None):
+        self.max_connections = max_connections
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.render_decisions: dict[str, str] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                headers=self.headers,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def fetch_html(self, url: str, timeout: int, validators: dict | None = None) -> HttpPage:
+        """
+        GET `url` (timeout in ms, like Playwright), optionally as a conditional
+        request. `html` is the page text, "" for non-HTML responses, or None
+        if the request failed or the server answered with an error status
+        (e.g. a bot wall the browser may pass).
+        """
+        try:
+            with span("http_fetch"):
+                response = await self.client.get(url, timeout=timeout / 1000, headers=validators)
+        except httpx.HTTPError as e:
+            print(f"⚠️ HTTP fetch failed for {url}: {e}")
+            return HttpPage(0, None)
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if response.status_code == 304:
+            return HttpPage(304, None, etag, last_modified)
+        if response.status_code >= 400:
+            return HttpPage(response.status_code, None)
+        content_type = response.headers.get("content-type", "").lower()
+        if not content_type.startswith(HTML_CONTENT_TYPES):
+            return HttpPage(response.status_code, "")
+        return HttpPage(response.status_code, response.text, etag, last_modified)
+
+    async def fetch_text(self, url: str, timeout: int) -> HttpPage:
+        """GET a non-HTML text resource such as robots.txt; `html` holds the body text."""
+        try:
+            with span("http_fetch", "text"):
+                response = await self.client.get(url, timeout=timeout / 1000)
+        except httpx.HTTPError as e:
+            print(f"⚠️ HTTP fetch failed for {url}: {e}")
+            return HttpPage(0, None)
+        return HttpPage(response.status_code, response.text if response.status_code < 400 else None)
+
+    async def iter_bytes(self, url: str, timeout: int):
+        """Stream a response body (e.g. a large sitemap); yields nothing on error statuses."""
+        async with self.client.stream("GET", url, timeout=timeout / 1000) as response:
+            if response.status_code >= 400:
+                return
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+MAX_FINISHED_JOBS = int(os.getenv("MAX_FINISHED_JOBS", "200"))
+
+FINISHED_STATES = {"completed", "failed", "cancelled"}
+
+
+class CrawlJob:
+    """One background crawl: status, live progress and the final result."""
+
+    def __init__(self, params: dict | None = None):
+        self.id = uuid.uuid4().hex
+        self.params = params or {}
+        self.status = "queued"
+        self.stage = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.progress = {"pages_done": 0, "queue_depth": 0, "in_flight": 0,
+                         "pages_per_sec": 0.0, "eta_seconds": None}
+        self.result = None
+        self.error = None
+        self._task: asyncio.Task | None = None
+        self._subscribers: list[asyncio.Queue] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def set_stage(self, stage: str) -> None:
+        self.stage = stage
+        self._publish({"event": "stage", "stage": stage})
+
+    def report_page(self, pages_done: int, queue_depth: int, in_flight: int = 0, url: str | None = None) -> None:
+        elapsed = max(time.time() - (self.started_at or time.time()), 1e-6)
+        rate = pages_done / elapsed
+        remaining = queue_depth + in_flight
+        self.progress = {
+            "pages_done": pages_done,
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "pages_per_sec": round(rate, 2),
+            # Lower bound: pages not yet discovered can't be counted.
+            "eta_seconds": round(remaining / rate, 1) if rate else None,
+        }
+        self._publish({"event": "page", "url": url, **self.progress})
+
+    def _publish(self, event: dict) -> None:
+        for q in self._subscribers:
+            q.put_nowait(event)
+
+    async def events(self):
+        """Yield progress events until the job finishes."""
+        q: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(q)
+        try:
+            yield {"event": "status", **self.to_dict()}
+            if self.finished:
+                return
+            while True:
+                event = await q.get()
+                yield event
+                if event["event"] == "status" and event["status"] in FINISHED_STATES:
+                    break
+        finally:
+            self._subscribers.remove(q)
+
+
+class JobManager:
+    """Runs crawl jobs in the background, at most `max_concurrent` at a time."""
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_finished = max_finished
+        self._jobs: OrderedDict[str, CrawlJob] = OrderedDict()
+        self._slots: asyncio.Semaphore | None = None
+
+    def submit(self, run, params: dict | None = None) -> CrawlJob:
+        """Schedule `run(job)` (a coroutine function) and return the job immediately."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        job = CrawlJob(params)
+        self._jobs[job.id] = job
+        job._task = asyncio.create_task(self._run(job, run))
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> CrawlJob | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[CrawlJob]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> CrawlJob | None:
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished and job._task is not None:
+            job._task.cancel()
+        return job
+
+    async def shutdown(self) -> None:
+        tasks = [j._task for j in self._jobs.values() if j._task is not None and not j.finished]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: CrawlJob, run) -> None:
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.started_at = time.time()
+                job._publish({"event": "status", "status": job.status})
+                job.result = await run(job)
+                job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            traceback.print_exc()
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job._publish({"event": "status", "status": job.status, "error": job.error})
+
+    def _prune(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from src.crawler.metrics import span
+
+CATEGORY_CACHE_PATH = os.getenv("CATEGORY_CACHE_PATH", os.path.join("tmp", "cache", "categories.sqlite"))
+BATCH_SIZE = int(os.getenv("CATEGORIZER_BATCH_SIZE", "40"))
+MAX_CONCURRENT_PROMPTS = int(os.getenv("CATEGORIZER_CONCURRENCY", "4"))
+REQUESTS_PER_MINUTE = float(os.getenv("CATEGORIZER_RPM", "60"))
+
+KNOWN_DOMAINS = {
+    "Social Media": ("facebook.com", "fb.com", "twitter.com", "x.com", "instagram.com", "linkedin.com",
+                     "youtube.com", "youtu.be", "tiktok.com", "pinterest.com", "reddit.com", "threads.net",
+                     "snapchat.com", "tumblr.com", "vimeo.com", "whatsapp.com", "t.me", "discord.gg"),
+    "Documentation": ("readthedocs.io", "readthedocs.org", "developer.mozilla.org", "docs.github.com"),
+    "Code Hosting": ("github.com", "gitlab.com", "bitbucket.org"),
+    "E-commerce": ("amazon.com", "ebay.com", "etsy.com", "shopify.com", "aliexpress.com", "walmart.com"),
+    "Reference": ("wikipedia.org", "wikimedia.org"),
+    "News": ("bbc.co.uk", "bbc.com", "cnn.com", "nytimes.com", "reuters.com", "theguardian.com"),
+    "Maps": ("maps.google.com", "maps.apple.com"),
+    "App Store": ("apps.apple.com", "play.google.com"),
+}
+DOMAIN_CATEGORIES = {d: cat for cat, domains in KNOWN_DOMAINS.items() for d in domains}
+GOV_RE = re.compile(r"(^|\.)(gov|mil)(\.[a-z]{2})?$|(^|\.)gov\.[a-z]{2}$|\.gc\.ca$|\.europa\.eu$")
+EDU_RE = re.compile(r"(^|\.)edu(\.[a-z]{2})?$|(^|\.)ac\.[a-z]{2}$")
+
+PROMPT = """
+You are an expert in classifying web links.
+
+For each numbered external URL below, return a short and specific category that describes its type or purpose.
+
+Examples: Blog, Social Media, Government, Documentation, Support, Product, News, Education, Forum, E-commerce, Sports, Navigation, Form Submission, etc.
+
+Respond with a JSON array of strings only, one category per URL, in the same order. No explanations.
+
+URLs:
+{urls}
+"""
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower().split("@")[-1].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def url_pattern(url: str) -> str:
+    """Cache key: host plus the first path segment with ids/numbers generalised."""
+    parsed = urlparse(url)
+    segment = parsed.path.strip("/").split("/", 1)[0].lower()
+    segment = re.sub(r"\d+", "{n}", segment)
+    return f"{_host(url)}/{segment}"
+
+
+def pre_classify(url: str) -> str | None:
+    """Rule-based category for well-known domains; None when the LLM is needed."""
+    host = _host(url)
+    if not host:
+        return None
+    parsed = urlparse(url)
+    if f"{host}{parsed.path}".startswith("goo.gl/maps"):
+        return "Maps"
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        category = DOMAIN_CATEGORIES.get(".".join(labels[i:]))
+        if category:
+            return category
+    if GOV_RE.search(host):
+        return "Government"
+    if EDU_RE.search(host):
+        return "Education"
+    return None
+
+
+class CategoryCache:
+    """Persistent url-pattern -> category store shared across crawls."""
+
+    def __init__(self, path: str = CATEGORY_CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS categories (pattern TEXT PRIMARY KEY, category TEXT NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get_many(self, patterns: list[str]) -> dict[str, str]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(patterns), 500):
+                chunk = patterns[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT pattern, category FROM categories WHERE pattern IN ({marks})", chunk)
+                found.update(rows.fetchall())
+        return found
+
+    def put_many(self, items: dict[str, str]) -> None:
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO categories VALUES (?, ?)", items.items())
+            self._db.commit()
+
+
+class LocalFakeModel:
+    """Offline stand-in for the Gemini model: keyword rules, same response shape."""
+
+    KEYWORDS = [("blog", "Blog"), ("news", "News"), ("shop", "E-commerce"), ("store", "E-commerce"),
+                ("docs", "Documentation"), ("help", "Support"), ("support", "Support"),
+                ("forum", "Forum"), ("form", "Form Submission"), ("event", "Events")]
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def generate_content(self, prompt: str):
+        urls = re.findall(r"^\d+\. (\S+)$", prompt, re.M)
+        categories = [next((c for k, c in self.KEYWORDS if k in u.lower()), "Other") for u in urls]
+        return self._Response(json.dumps(categories))
+
+
+def _parse_categories(text: str, count: int) -> list[str]:
+    match = re.search(r"\[.*\]", text or "", re.S)
+    try:
+        values = json.loads(match.group(0)) if match else []
+    except json.JSONDecodeError:
+        values = []
+    if not isinstance(values, list):
+        values = []
+    values = [str(v).strip().splitlines()[0] if str(v).strip() else "Unknown" for v in values[:count]]
+    return values + ["Unknown"] * (count - len(values))
+
+
+class _RateLimiter:
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = loop.time() + self.interval
+
+
+def get_categorizer_model():
+    if os.getenv("LINK_CATEGORIZER", "").lower() == "fake":
+        return LocalFakeModel()
+    from src.crawler.gemini_outline import get_gemini_model
+    return get_gemini_model()
+
+
+async def categorize_links(urls, model=None, cache: CategoryCache | None = None,
+                           batch_size: int = BATCH_SIZE, max_concurrent: int = MAX_CONCURRENT_PROMPTS,
+                           requests_per_minute: float = REQUESTS_PER_MINUTE) -> dict[str, str]:
+    """
+    Categorize many external links at once.
+
+    Well-known domains are classified by rules, previously seen URL patterns
+    come from the cache, and the rest are grouped by domain and sent to the
+    model `batch_size` URLs per prompt, with at most `max_concurrent` prompts
+    in flight and `requests_per_minute` started per minute.
+    """
+    results: dict[str, str] = {}
+    pending: dict[str, list[str]] = defaultdict(list)
+    for url in dict.fromkeys(urls):
+        category = pre_classify(url)
+        if category:
+            results[url] = category
+        else:
+            pending[url_pattern(url)].append(url)
+
+    if cache is not None and pending:
+        for pattern, category in cache.get_many(list(pending)).items():
+            for url in pending.pop(pattern):
+                results[url] = category
+    if not pending:
+        return results
+
+    model = model or get_categorizer_model()
+    by_domain = defaultdict(list)
+    for pattern, members in pending.items():
+        by_domain[pattern.split("/", 1)[0]].append((pattern, members[0]))
+    # One representative URL per pattern; domains stay together so the model sees related links side by side.
+    representatives = [item for domain in sorted(by_domain) for item in by_domain[domain]]
+    batches = [representatives[i:i + batch_size] for i in range(0, len(representatives), batch_size)]
+
+    sem = asyncio.Semaphore(max(1, max_concurrent))
+    limiter = _RateLimiter(requests_per_minute)
+
+    async def run_batch(batch):
+        prompt = PROMPT.format(urls="\n".join(f"{i + 1}. {url}" for i, (_, url) in enumerate(batch)))
+        async with sem:
+            await limiter.wait()
+            try:
+                with span("llm", "categorize"):
+                    response = await asyncio.to_thread(model.generate_content, prompt)
+                categories = _parse_categories(response.text, len(batch))
+            except Exception as e:
+                print(f"Error categorizing batch of {len(batch)} URLs: {e}")
+                return {}
+        return {pattern: category for (pattern, _), category in zip(batch, categories)}
+
+    learned = {}
+    for found in await asyncio.gather(*(run_batch(b) for b in batches)):
+        learned.update(found)
+    if cache is not None:
+        cache.put_many({p: c for p, c in learned.items() if c != "Unknown"})
+
+    for pattern, members in pending.items():
+        category = learned.get(pattern, "Unknown")
+        for url in members:
+            results[url] = category
+    return results
+
+
+_shared_cache: CategoryCache | None = None
+
+
+def get_category_cache() -> CategoryCache:
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = CategoryCache()
+    return _shared_cache
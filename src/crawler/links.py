@@ -0,0 +1,97 @@
+import os
+from functools import lru_cache
+from urllib.parse import parse_qs, urlencode, urlparse, urlsplit, urlunparse
+
+LINK_MEMO_SIZE = int(os.getenv("LINK_MEMO_SIZE", "200000"))
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid")
+SESSION_PARAMS = {"jsessionid", "phpsessid", "aspsessionid", "sessionid", "session_id"}
+
+
+def clean_url(url: str) -> str:
+    if "?" not in url and "#" not in url and ";" not in url and url.startswith(("http://", "https://")):
+        return url  # nothing to strip; the parse round trip would return it unchanged
+    parsed = urlparse(url)
+    query = {k: v for k, v in parse_qs(parsed.query).items()
+             if not k.lower().startswith(TRACKING_PARAMS) and k.lower() not in SESSION_PARAMS}
+    params = "" if parsed.params.lower().startswith(tuple(SESSION_PARAMS)) else parsed.params  # ;jsessionid=...
+    parsed = parsed._replace(params=params, query=urlencode(query, doseq=True), fragment="")
+    return urlunparse(parsed)
+
+
+def site_key(netloc: str) -> str:
+    """'User@WWW.Example.com:8080' -> 'example.com:8080'."""
+    host = netloc.rpartition("@")[2].lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_same_site(netloc: str, main_key: str) -> bool:
+    """Same host or a subdomain of it; 'notexample.com' is not 'example.com'."""
+    key = site_key(netloc)
+    return key == main_key or key.endswith("." + main_key)
+
+
+def is_external(url: str, main_domain: str) -> bool:
+    try:
+        netloc = urlsplit(url).netloc
+    except ValueError:
+        return False
+    return bool(netloc) and not is_same_site(netloc, site_key(main_domain))
+
+
+def path_ancestors(url: str):
+    """'https://x.com/a/b?p=1' -> 'https://x.com/a/b', '.../a/', '.../a', 'https://x.com/', nearest first."""
+    parts = urlsplit(url)
+    origin = f"{parts.scheme}://{parts.netloc}"
+    path = parts.path.rstrip("/")
+    if parts.query and path:
+        yield origin + path
+    while path:
+        path = path[:path.rfind("/")]
+        yield origin + path + "/"
+        if path:
+            yield origin + path
+
+
+@lru_cache(maxsize=LINK_MEMO_SIZE)
+def normalize_link(link: str) -> tuple[str, str] | None:
+    """(cleaned url, netloc) for an http(s) link, None for anything else."""
+    try:
+        cleaned = clean_url(link)
+        parts = urlsplit(cleaned)
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return cleaned, parts.netloc
+
+
+class LinkClassifier:
+    """
+    Normalizes a page's links in one pass and splits them into internal
+    and external URLs relative to the crawl's main site.
+
+    Cleaned URLs are memoized process-wide (nav and footer links repeat on
+    every page) and same-site decisions per netloc, so a repeated link costs
+    two dict lookups.
+    """
+
+    def __init__(self, main_url: str):
+        self.main_key = site_key(urlsplit(main_url).netloc)
+        self._internal_hosts: dict[str, bool] = {}
+
+    def is_internal(self, netloc: str) -> bool:
+        internal = self._internal_hosts.get(netloc)
+        if internal is None:
+            internal = self._internal_hosts[netloc] = is_same_site(netloc, self.main_key)
+        return internal
+
+    def partition(self, links) -> tuple[list[str], list[str]]:
+        """Deduplicated (internal, external) cleaned http(s) URLs, in first-seen order."""
+        internal, external = {}, {}
+        for link in links:
+            normalized = normalize_link(link)
+            if normalized is None:
+                continue
+            cleaned, netloc = normalized
+            (internal if self.is_internal(netloc) else external)[cleaned] = None
+        return list(internal), list(external)
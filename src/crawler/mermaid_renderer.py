@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from html import escape
+
+from src.crawler.metrics import span
+
+DIAGRAM_CACHE_DIR = os.getenv("DIAGRAM_CACHE_DIR", os.path.join("tmp", "cache", "diagrams"))
+DIAGRAM_ENGINE = os.getenv("DIAGRAM_ENGINE", "auto")
+
+NODE_RE = re.compile(r'^(\w+)\["(.*)"\]$')
+EDGE_RE = re.compile(r"^(\w+)\s*-->\s*(\w+)$")
+
+FONT_SIZE = 14
+CHAR_WIDTH = 7.5
+NODE_HEIGHT = 36
+NODE_PAD_X = 16
+ROW_GAP = 14
+COL_GAP = 60
+MARGIN = 10
+
+
+def parse_tree_mermaid(code: str):
+    """
+    Parse the `graph LR` subset produced by `outline_to_mermaid`.
+
+    Returns (labels, children, roots), or None if the source uses anything
+    else and needs the real Mermaid renderer.
+    """
+    lines = [l.strip() for l in code.strip().splitlines() if l.strip()]
+    if not lines or lines[0] != "graph LR":
+        return None
+    labels, children, has_parent = {}, {}, set()
+    for line in lines[1:]:
+        if m := NODE_RE.match(line):
+            labels[m.group(1)] = m.group(2)
+            children.setdefault(m.group(1), [])
+        elif m := EDGE_RE.match(line):
+            parent, child = m.groups()
+            if child in has_parent:
+                return None
+            children.setdefault(parent, []).append(child)
+            children.setdefault(child, [])
+            has_parent.add(child)
+        else:
+            return None
+    roots = [n for n in children if n not in has_parent]
+    if not roots:
+        return None
+    return labels, children, roots
+
+
+def render_tree_svg(labels: dict, children: dict, roots: list) -> str:
+    """Left-to-right tidy tree: leaves take consecutive rows, parents centre on their children."""
+    depth, order = {}, []
+    stack = [(r, 0) for r in reversed(roots)]
+    while stack:
+        node, d = stack.pop()
+        depth[node] = d
+        order.append(node)
+        stack.extend((c, d + 1) for c in reversed(children[node]))
+
+    width = {n: max(60, len(labels.get(n, n)) * CHAR_WIDTH + 2 * NODE_PAD_X) for n in order}
+    col_width = {}
+    for n in order:
+        col_width[depth[n]] = max(col_width.get(depth[n], 0), width[n])
+    col_x, x = {}, MARGIN
+    for d in sorted(col_width):
+        col_x[d] = x
+        x += col_width[d] + COL_GAP
+
+    y = {}
+    next_row = 0
+    for n in reversed(order):  # children before parents
+        if children[n]:
+            y[n] = (y[children[n][0]] + y[children[n][-1]]) / 2
+        else:
+            y[n] = MARGIN + next_row * (NODE_HEIGHT + ROW_GAP)
+            next_row += 1
+    # Leaves were numbered bottom-up; flip so the first child is on top.
+    total_h = MARGIN * 2 + max(next_row, 1) * (NODE_HEIGHT + ROW_GAP) - ROW_GAP
+    y = {n: total_h - v - NODE_HEIGHT for n, v in y.items()}
+    total_w = x - COL_GAP + MARGIN
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{total_w:.0f}" height="{total_h:.0f}" '
+        f'viewBox="0 0 {total_w:.0f} {total_h:.0f}" font-family="trebuchet ms, verdana, arial, sans-serif" '
+        f'font-size="{FONT_SIZE}">',
+        '<g fill="none" stroke="#333333" stroke-width="1.5">',
+    ]
+    for n in order:
+        for c in children[n]:
+            x1, y1 = col_x[depth[n]] + width[n], y[n] + NODE_HEIGHT / 2
+            x2, y2 = col_x[depth[c]], y[c] + NODE_HEIGHT / 2
+            mx = (x1 + x2) / 2
+            parts.append(f'<path d="M{x1:.1f},{y1:.1f} C{mx:.1f},{y1:.1f} {mx:.1f},{y2:.1f} {x2:.1f},{y2:.1f}"/>')
+    parts.append("</g>")
+    for n in order:
+        nx, ny = col_x[depth[n]], y[n]
+        parts.append(
+            f'<g><rect x="{nx:.1f}" y="{ny:.1f}" width="{width[n]:.1f}" height="{NODE_HEIGHT}" rx="4" '
+            f'fill="#ECECFF" stroke="#9370DB"/>'
+            f'<text x="{nx + width[n] / 2:.1f}" y="{ny + NODE_HEIGHT / 2:.1f}" text-anchor="middle" '
+            f'dominant-baseline="central" fill="#333333">{escape(labels.get(n, n))}</text></g>'
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+class DiagramRenderer:
+    """
+    Renders all Mermaid diagrams of a crawl in one batch, off the event loop.
+
+    Outline trees are laid out in pure Python; anything else goes through a
+    single `mmdc` run over a markdown file holding every remaining diagram,
+    so Chromium starts once per batch instead of once per diagram. SVGs are
+    cached on disk by a hash of their Mermaid source.
+    """
+
+    def __init__(self, engine: str = DIAGRAM_ENGINE, cache_dir: str = DIAGRAM_CACHE_DIR):
+        self.engine = engine
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, code: str) -> str:
+        digest = hashlib.sha256(f"{self.engine}\n{code}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.svg")
+
+    async def render_many(self, diagrams: list[tuple[str, str]]) -> None:
+        """Render each (mermaid_code, svg_path) pair."""
+        pending = []
+        for code, svg_path in diagrams:
+            cached = self._cache_path(code)
+            if os.path.exists(cached):
+                shutil.copyfile(cached, svg_path)
+            else:
+                pending.append((code, svg_path, cached))
+        if not pending:
+            return
+
+        needs_mmdc = []
+        if self.engine != "mmdc":
+            with span("mermaid_render", "python"):
+                rendered = await asyncio.to_thread(self._render_python, pending)
+            needs_mmdc = [p for p in pending if p not in rendered]
+        else:
+            needs_mmdc = pending
+        if needs_mmdc:
+            if self.engine == "python":
+                raise RuntimeError(f"{len(needs_mmdc)} diagram(s) need mmdc but DIAGRAM_ENGINE=python")
+            with span("mermaid_render", "mmdc"):
+                await self._render_mmdc(needs_mmdc)
+
+    def _render_python(self, pending):
+        rendered = set()
+        for item in pending:
+            code, svg_path, cached = item
+            tree = parse_tree_mermaid(code)
+            if tree is None:
+                continue
+            svg = render_tree_svg(*tree)
+            with open(cached, "w", encoding="utf-8") as f:
+                f.write(svg)
+            shutil.copyfile(cached, svg_path)
+            rendered.add(item)
+        return rendered
+
+    async def _render_mmdc(self, pending) -> None:
+        mmdc_path = shutil.which("mmdc")
+        if not mmdc_path:
+            raise RuntimeError(
+                "Mermaid CLI (mmdc) not found. Please install it using:\n"
+                "npm install -g @mermaid-js/mermaid-cli"
+            )
+        with tempfile.TemporaryDirectory() as work:
+            src = os.path.join(work, "diagrams.md")
+            out = os.path.join(work, "out.md")
+            with open(src, "w", encoding="utf-8") as f:
+                for code, _, _ in pending:
+                    f.write(f"```mermaid\n{code}\n```\n\n")
+            proc = await asyncio.create_subprocess_exec(
+                mmdc_path, "-i", src, "-o", out,
+                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE,
+            )
+            _, stderr = await proc.communicate()
+            if proc.returncode != 0:
+                raise RuntimeError(f"Mermaid CLI rendering failed: {stderr.decode(errors='replace')}")
+            # mmdc writes one SVG per block: out-1.svg, out-2.svg, ...
+            for i, (_, svg_path, cached) in enumerate(pending, start=1):
+                shutil.copyfile(os.path.join(work, f"out-{i}.svg"), cached)
+                shutil.copyfile(cached, svg_path)
+
+
+_shared_renderer: DiagramRenderer | None = None
+
+
+def get_diagram_renderer() -> DiagramRenderer:
+    global _shared_renderer
+    if _shared_renderer is None:
+        _shared_renderer = DiagramRenderer()
+    return _shared_renderer
@@ -0,0 +1,127 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; spans range from sub-millisecond link normalization to minute-long navigations.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_job_timings: ContextVar[dict | None] = ContextVar("crawl_job_timings", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...], buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {series[-2]}')
+            lines.append(f"{self.name}_count{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            lines.append(f"{self.name}{{{base}}} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram("crawler_stage_seconds", "Time spent per crawl stage.", ("stage", "detail"))
+STAGE_ERRORS = Counter("crawler_stage_errors_total", "Crawl stage spans that raised.", ("stage", "detail"))
+PAGES = Counter("crawler_pages_total", "Pages crawled, by how their HTML was obtained.", ("source",))
+AUDIT_RULE_SECONDS = Histogram("crawler_audit_rule_seconds", "Time per accessibility rule per page audited.",
+                               ("rule",))
+
+
+@contextmanager
+def span(stage: str, detail: str = ""):
+    """
+    Time a block as one `stage` observation (e.g. span("navigate", "load")).
+
+    Recorded in the process-wide histogram and, inside `collect_timings()`,
+    in that job's breakdown. Spans may nest; each is timed independently.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage, detail)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage, detail)
+        timings = _job_timings.get()
+        if timings is not None:
+            key = f"{stage}:{detail}" if detail else stage
+            entry = timings.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+
+
+@contextmanager
+def collect_timings():
+    """Collect the spans of everything run in this context (tasks and threads included)."""
+    timings: dict[str, list] = {}
+    token = _job_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _job_timings.reset(token)
+
+
+def timing_breakdown(timings: dict[str, list]) -> dict:
+    return {
+        key: {"count": count, "total_s": round(total, 3), "mean_ms": round(total / count * 1000, 2)}
+        for key, (count, total) in sorted(timings.items(), key=lambda kv: -kv[1][1])
+    }
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in (STAGE_SECONDS, STAGE_ERRORS, PAGES, AUDIT_RULE_SECONDS):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+import hashlib
+import re
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+DEFAULT_TOKEN_BUDGET = 2000
+CHARS_PER_TOKEN = 4
+MAX_LABEL_CHARS = 60
+
+SKIP_TAGS = {"script", "style", "svg", "noscript", "template", "iframe", "canvas", "object", "video", "audio"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "param", "source", "track", "wbr"}
+NAV_TAGS = {"nav", "header"}
+NAV_ROLES = {"navigation", "menubar", "menu"}
+NAV_CLASS_RE = re.compile(r"(^|[\s_-])(nav|navbar|navigation|menu|megamenu|main-menu)([\s_-]|$)", re.I)
+TITLE_SPLIT_RE = re.compile(r"\s+[|\-–—:·]\s+")
+
+
+class NavItem(NamedTuple):
+    depth: int
+    label: str
+
+
+class NavSummary(NamedTuple):
+    site_name: str
+    items: tuple[NavItem, ...]
+
+    @property
+    def content_hash(self) -> str:
+        text = self.site_name + "\n" + "\n".join(f"{i.depth}:{i.label}" for i in self.items)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def to_prompt_text(self, token_budget: int = DEFAULT_TOKEN_BUDGET) -> str:
+        """Indented menu text, cut off once the rough token estimate hits `token_budget`."""
+        budget = token_budget * CHARS_PER_TOKEN
+        lines = [f"Site: {self.site_name}"]
+        used = len(lines[0])
+        for item in self.items:
+            line = "  " * item.depth + "- " + item.label
+            if used + len(line) + 1 > budget:
+                break
+            lines.append(line)
+            used += len(line) + 1
+        return "\n".join(lines)
+
+    def to_outline(self) -> str:
+        """Deterministic markdown outline in the same shape the LLM is asked for."""
+        lines = [f"- {self.site_name or 'Website'}"]
+        lines += ["  " * (item.depth + 1) + "- " + item.label for item in self.items]
+        return "\n".join(lines)
+
+
+def _is_nav_element(tag: str, attrs: dict) -> bool:
+    if tag in NAV_TAGS or (attrs.get("role") or "").lower() in NAV_ROLES:
+        return True
+    return bool(NAV_CLASS_RE.search(f"{attrs.get('id') or ''} {attrs.get('class') or ''}"))
+
+
+class _NavParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []            # open (tag, is_nav) pairs
+        self.skip_depth = 0        # >0 while inside script/style/svg/...
+        self.footer_depth = 0      # footer menus aren't the top navigation
+        self.nav_depth = 0         # number of open navigation containers
+        self.list_depth = 0        # open ul/ol inside navigation
+        self.items: list[list] = []  # [depth, text_parts, sealed]
+        self.current = None
+        self.title_parts = []
+        self.in_title = False
+        self.og_site_name = None
+        self.all_links: list[list] = []
+        self.current_link = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "meta" and (attrs.get("property") or "").lower() == "og:site_name":
+            self.og_site_name = (attrs.get("content") or "").strip() or None
+        if tag in VOID_TAGS:
+            return
+        if tag == "footer" or (attrs.get("role") or "").lower() == "contentinfo":
+            self.footer_depth += 1
+            self.stack.append((tag, "footer"))
+            return
+        nav = not self.footer_depth and _is_nav_element(tag, attrs)
+        self.stack.append((tag, nav))
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag == "title":
+            self.in_title = True
+        if tag == "a":
+            self.current_link = []
+            self.all_links.append(self.current_link)
+        if nav:
+            self.nav_depth += 1
+        if not self.nav_depth:
+            return
+        if tag in ("ul", "ol"):
+            if self.current is not None:
+                self.current[2] = True
+            self.list_depth += 1
+        elif tag == "li":
+            self._new_item(max(self.list_depth - 1, 0))
+        elif tag in ("a", "button") and (self.current is None or self.current[2]):
+            self._new_item(max(self.list_depth - 1, 0) if self.list_depth else 0)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or not any(t == tag for t, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, nav = self.stack.pop()
+            self._close(open_tag, nav)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag, nav):
+        if nav == "footer":
+            self.footer_depth -= 1
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth -= 1
+            return
+        if tag == "title":
+            self.in_title = False
+        if tag == "a":
+            self.current_link = None
+        if self.nav_depth:
+            if tag in ("ul", "ol"):
+                self.list_depth = max(self.list_depth - 1, 0)
+            if tag in ("li", "a", "button") and self.current is not None:
+                self.current[2] = True
+        if nav:
+            self.nav_depth -= 1
+            if not self.nav_depth:
+                self.list_depth = 0
+                self.current = None
+
+    def _new_item(self, depth):
+        self.current = [depth, [], False]
+        self.items.append(self.current)
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_title:
+            self.title_parts.append(data)
+        if self.current_link is not None:
+            self.current_link.append(data)
+        if self.nav_depth and self.current is not None and not self.current[2]:
+            self.current[1].append(data)
+
+
+def _label(parts) -> str:
+    text = " ".join(" ".join(parts).split())
+    return text[:MAX_LABEL_CHARS].rstrip()
+
+
+def reduce_homepage(html: str) -> NavSummary:
+    """Strip a homepage down to its site name and navigation menu labels."""
+    parser = _NavParser()
+    parser.feed(html or "")
+    parser.close()
+
+    if parser.og_site_name:
+        site_name = parser.og_site_name
+    else:
+        title = " ".join("".join(parser.title_parts).split())
+        site_name = TITLE_SPLIT_RE.split(title)[0] if title else ""
+
+    raw = [(depth, _label(parts)) for depth, parts, _ in parser.items]
+    if not any(label for _, label in raw):
+        # No recognisable nav: fall back to the page's link texts in order.
+        raw = [(0, _label(parts)) for parts in parser.all_links]
+
+    items, seen, parents = [], set(), {}
+    for depth, label in raw:
+        if not label:
+            continue
+        # Normalise jumps (e.g. 0 -> 2) so the outline nests one level at a time.
+        depth = min(depth, (items[-1].depth + 1) if items else 0)
+        parents[depth] = label
+        key = (parents.get(depth - 1) if depth else None, label.lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        items.append(NavItem(depth, label))
+    return NavSummary(site_name, tuple(items))
@@ -0,0 +1,156 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import NamedTuple
+
+from src.crawler.html_analysis import ImageInfo, PageAnalysis
+
+CACHE_PATH = os.getenv("PAGE_CACHE_PATH", os.path.join("tmp", "cache", "pages.sqlite"))
+CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_MB", "512")) * 1024 * 1024
+CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL_HOURS", "168")) * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    html BLOB NOT NULL,
+    analysis TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+class CachedPage(NamedTuple):
+    url: str
+    html: str
+    analysis: PageAnalysis
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+    @property
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def dump_analysis(analysis: PageAnalysis) -> str:
+    return json.dumps({
+        "links": list(analysis.links),
+        "attachments": analysis.attachments,
+        "images": [list(img) for img in analysis.images],
+        "accessible_images": analysis.accessible_images,
+        "fingerprint": analysis.fingerprint,
+    }, separators=(",", ":"))
+
+
+def load_analysis(data: str) -> PageAnalysis:
+    raw = json.loads(data)
+    return PageAnalysis(
+        links=tuple(raw["links"]),
+        attachments=raw["attachments"],
+        images=tuple(ImageInfo(*img) for img in raw["images"]),
+        accessible_images=raw["accessible_images"],
+        fingerprint=raw.get("fingerprint", 0),
+    )
+
+
+class PageCache:
+    """
+    On-disk SQLite cache of fetched pages keyed by cleaned URL.
+
+    Stores zlib-compressed HTML, the page analysis and HTTP validators.
+    Entries older than `ttl` seconds are dropped on read; once the stored
+    size exceeds `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES, ttl: float = CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def get(self, url: str) -> CachedPage | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT html, analysis, etag, last_modified, fetched_at, size FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            html, analysis, etag, last_modified, fetched_at, size = row
+            if now - fetched_at > self.ttl:
+                self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._db.commit()
+                self._total -= size
+                return None
+            self._db.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, url))
+            self._db.commit()
+        return CachedPage(url, zlib.decompress(html).decode("utf-8"), load_analysis(analysis),
+                          etag, last_modified, fetched_at)
+
+    def put(self, url: str, html: str, analysis: PageAnalysis,
+            etag: str | None = None, last_modified: str | None = None) -> None:
+        blob = zlib.compress(html.encode("utf-8"), 6)
+        data = dump_analysis(analysis)
+        size = len(blob) + len(data)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM pages WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, blob, data, size, now, now),
+            )
+            self._total += size - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark a 304-revalidated entry as fresh."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._db.commit()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute("SELECT url, size FROM pages ORDER BY accessed_at").fetchall()
+        doomed = []
+        for url, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((url,))
+            self._total -= size
+        self._db.executemany("DELETE FROM pages WHERE url = ?", doomed)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_shared_cache: PageCache | None = None
+
+
+def get_page_cache() -> PageCache:
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = PageCache()
+    return _shared_cache
@@ -0,0 +1,59 @@
+import os
+import re
+
+SETTLE_QUIET_MS = int(os.getenv("READINESS_QUIET_MS", "500"))
+SETTLE_MAX_MS = int(os.getenv("READINESS_MAX_WAIT_MS", "5000"))
+SETTLE_POLL_MS = 100
+
+# "settle": DOM stable after domcontentloaded. "networkidle": also wait (bounded)
+# for the network to go quiet, for sites that fetch their links late.
+STRATEGIES = ("settle", "networkidle")
+
+# Resolves once the anchor and element counts have not changed for `quiet` ms.
+_SETTLED_JS = """
+(quiet) => {
+    const state = window.__crawlerSettle || (window.__crawlerSettle = {sig: "", since: performance.now()});
+    const sig = document.links.length + ":" + document.getElementsByTagName("*").length;
+    if (sig !== state.sig) {
+        state.sig = sig;
+        state.since = performance.now();
+        return false;
+    }
+    return performance.now() - state.since >= quiet;
+}
+"""
+
+# Navigation errors no wait strategy can fix.
+HARD_NETWORK_ERROR_RE = re.compile(
+    r"net::ERR_(NAME_NOT_RESOLVED|NAME_RESOLUTION_FAILED|CONNECTION_REFUSED|CONNECTION_RESET|"
+    r"CONNECTION_CLOSED|CONNECTION_FAILED|ADDRESS_UNREACHABLE|INTERNET_DISCONNECTED|CERT_\w+|SSL_\w+|"
+    r"TOO_MANY_REDIRECTS|INVALID_URL|UNSAFE_PORT|BLOCKED_BY_CLIENT|ABORTED)"
+)
+
+
+def is_hard_network_error(exc: Exception) -> bool:
+    return bool(HARD_NETWORK_ERROR_RE.search(str(exc)))
+
+
+def is_timeout(exc: Exception) -> bool:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    return isinstance(exc, PlaywrightTimeoutError)
+
+
+async def wait_until_ready(page, strategy: str, quiet_ms: int = SETTLE_QUIET_MS,
+                           max_wait_ms: int = SETTLE_MAX_MS) -> bool:
+    """
+    Wait for a navigated page to be worth reading. Returns False if the
+    page was still changing after `max_wait_ms`; the caller reads it anyway.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    if strategy == "networkidle":
+        try:
+            await page.wait_for_load_state("networkidle", timeout=max_wait_ms)
+        except PlaywrightTimeoutError:
+            pass
+    try:
+        await page.wait_for_function(_SETTLED_JS, arg=quiet_ms, polling=SETTLE_POLL_MS, timeout=max_wait_ms)
+        return True
+    except PlaywrightTimeoutError:
+        return False
@@ -0,0 +1,133 @@
+import csv
+import io
+import os
+
+REPORT_BATCH_ROWS = int(os.getenv("REPORT_BATCH_ROWS", "500"))
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+COLUMNAR_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+class CsvReportWriter:
+    """
+    Appends rows to a CSV report through one open handle.
+
+    Rows are buffered and written `batch_rows` at a time; `flush()` writes
+    the buffer and returns the file size, which checkpoints record so a
+    resumed crawl can cut the report back to a consistent point.
+    """
+
+    def __init__(self, path: str, fieldnames: list[str], append: bool = True,
+                 batch_rows: int = REPORT_BATCH_ROWS):
+        self.path = path
+        self.batch_rows = max(1, batch_rows)
+        self._file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._buffer: list = []
+        if self._file.tell() == 0:
+            self._writer.writerow(fieldnames)
+
+    def writerow(self, row) -> None:
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_rows:
+            self._write_buffer()
+
+    def _write_buffer(self) -> None:
+        self._writer.writerows(self._buffer)
+        self._buffer.clear()
+
+    def flush(self) -> int:
+        self._write_buffer()
+        self._file.flush()
+        return self._file.tell()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+def iter_file_chunks(path: str, chunk_size: int = DOWNLOAD_CHUNK_BYTES):
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+def read_column(path: str, column: str):
+    """Stream one column of a CSV report."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        index = next(reader).index(column)
+        for row in reader:
+            if len(row) > index:
+                yield row[index]
+
+
+def load_mapping(path: str) -> dict[str, str]:
+    """Two-column CSV (key, value) -> dict, e.g. link categories."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return {row[0]: row[1] for row in reader if len(row) >= 2}
+
+
+def iter_csv_with_column(path: str, key_column: str, name: str, values: dict[str, str],
+                         default: str = "Unknown", batch_rows: int = REPORT_BATCH_ROWS):
+    """
+    Stream a CSV report with an extra column looked up from `values` by
+    `key_column`, as encoded chunks, without rewriting the file on disk.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        index = header.index(key_column)
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(header + [name])
+        for i, row in enumerate(reader, start=1):
+            writer.writerow(row + [values.get(row[index] if len(row) > index else "", default)])
+            if i % batch_rows == 0:
+                yield out.getvalue().encode("utf-8")
+                out.seek(0)
+                out.truncate()
+        yield out.getvalue().encode("utf-8")
+
+
+def export_columnar(csv_path: str, out_path: str, fmt: str = "parquet",
+                    extra_column: tuple[str, str, dict] | None = None) -> str:
+    """
+    Convert a CSV report to Parquet or an Arrow IPC stream batch by batch,
+    so memory stays bounded by the reader's block size. `extra_column` is
+    (key_column, name, values) as in `iter_csv_with_column`.
+    """
+    try:  # optional, and slow to import: loaded on the first columnar download
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Columnar export needs pyarrow: pip install pyarrow") from None
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    reader = pa_csv.open_csv(
+        csv_path,
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in header},
+                                              strings_can_be_null=False),
+    )
+    schema = reader.schema
+    if extra_column:
+        schema = schema.append(pa.field(extra_column[1], pa.string()))
+
+    tmp_path = out_path + ".tmp"
+    writer = pq.ParquetWriter(tmp_path, schema) if fmt == "parquet" else pa.ipc.new_stream(tmp_path, schema)
+    try:
+        for batch in reader:
+            if extra_column:
+                key_column, name, values = extra_column
+                keys = batch.column(batch.schema.get_field_index(key_column)).to_pylist()
+                batch = pa.RecordBatch.from_arrays(
+                    batch.columns + [pa.array([values.get(k, "Unknown") for k in keys], pa.string())],
+                    schema=schema)
+            writer.write_table(pa.Table.from_batches([batch], schema=schema))
+    finally:
+        writer.close()
+    os.replace(tmp_path, out_path)
+    return out_path
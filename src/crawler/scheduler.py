@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from src.crawler.url_store import ROOT, UrlStore
+
+
+class CrawlScheduler:
+    """
+    Worker-pool crawl scheduler.
+
+    A fixed number of worker tasks pull `(depth, url)` items from a priority
+    queue (shallowest first) and hand them to an async handler, which may
+    `add()` newly discovered links while the crawl is running. `run()` returns
+    once the queue has drained and every worker is idle.
+
+    The frontier dedup set and parent links live in `store` (a UrlStore or
+    DiskUrlStore); the queue itself only holds integer URL ids. `admit`, if
+    given, is asked once per newly discovered URL (robots.txt, budgets).
+    A rejected URL stays interned, so it is not asked about again: every
+    rejection (robots rules, prefix caps, learned URL traps) only becomes
+    more likely as the crawl goes on, never less.
+    A handler exception fails only that page; `handled` and `failed` count
+    pages taken off the queue and pages whose handler raised.
+    """
+
+    def __init__(self, workers: int, max_depth: int | None = None,
+                 max_per_host: int | None = None, host_delay: float = 0.0,
+                 store=None, admit=None):
+        self.workers = max(1, workers or 1)
+        self.max_depth = max_depth
+        self.max_per_host = max_per_host
+        self.host_delay = host_delay
+        self.store = store if store is not None else UrlStore()
+        self.admit = admit
+        self.stopped = False
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+        self._host_next_start = defaultdict(float)
+        self.in_flight = 0
+        self.handled = 0
+        self.failed = 0
+
+    def add(self, url: str, depth: int, parent: str | None = None) -> bool:
+        """Enqueue `url` unless it was already seen or is too deep. Returns True if queued."""
+        if self.stopped or (self.max_depth is not None and depth > self.max_depth):
+            return False
+        uid, created = self.store.add(url, ROOT, depth)
+        if not created or (self.admit is not None and not self.admit(url)):
+            return False
+        parent_id = self.store.get_id(parent) if parent is not None else None
+        if parent_id is not None:
+            self.store.parents[uid] = parent_id
+        self._queue.put_nowait((depth, next(self._seq), uid))
+        return True
+
+    def restore(self, url: str, depth: int, parent: str | None, done: bool) -> None:
+        """Re-register a checkpointed URL; unfinished ones go back on the queue."""
+        parent_id = self.store.get_id(parent) if parent is not None else None
+        uid, _ = self.store.add(url, ROOT if parent_id is None else parent_id, depth)
+        if done:
+            self.store.mark_visited(uid)
+        else:
+            self._queue.put_nowait((depth, next(self._seq), uid))
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.store
+
+    def stop(self) -> None:
+        """Drop everything still queued; `run()` returns once in-flight pages finish."""
+        self.stopped = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            self._queue.task_done()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def run(self, handler) -> None:
+        workers = [asyncio.create_task(self._worker(handler)) for _ in range(self.workers)]
+        try:
+            await self._queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self, handler) -> None:
+        while True:
+            depth, _, uid = await self._queue.get()
+            url = self.store.url(uid)
+            self.in_flight += 1
+            self.handled += 1
+            try:
+                async with self._polite(url):
+                    await handler(url, depth)
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠️ Worker failed on {url}: {e}")
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    @asynccontextmanager
+    async def _polite(self, url: str):
+        host = urlparse(url).netloc
+        if self.max_per_host:
+            await self._host_slots[host].acquire()
+        try:
+            if self.host_delay:
+                loop = asyncio.get_running_loop()
+                now = loop.time()
+                start = max(now, self._host_next_start[host])
+                self._host_next_start[host] = start + self.host_delay
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+        finally:
+            if self.max_per_host:
+                self._host_slots[host].release()
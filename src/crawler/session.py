@@ -0,0 +1,161 @@
+import os
+import re
+import shutil
+import uuid
+from urllib.parse import urlparse
+
+from src.crawler.report_writer import CsvReportWriter, load_mapping, read_column
+
+OUTPUT_DIR = "tmp"
+SESSIONS_DIR = os.path.join(OUTPUT_DIR, "jobs")
+MAX_SESSIONS = int(os.getenv("MAX_CRAWL_SESSIONS", "50"))
+SESSION_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+EXTERNAL_LINK_FIELDS = ["Main website URL", "URL where external link was found", "External Link"]
+LINK_CATEGORY_FIELDS = ["External Link", "Category"]
+AUDIT_FINDING_FIELDS = ["Page URL", "Rule", "Severity", "Issue", "Element"]
+
+
+class CrawlSession:
+    """
+    All mutable state of one crawl: its output directory and the external
+    links/domains it has seen. Nothing is shared between sessions, so
+    concurrent crawls can't clobber each other's files.
+    """
+
+    def __init__(self, session_id: str | None = None, root: str = SESSIONS_DIR):
+        self.id = session_id or uuid.uuid4().hex
+        self.output_dir = os.path.join(root, self.id)
+        self.seen_external_links: set[str] = set()
+        self.seen_external_domains: set[str] = set()
+        self._external_writer: CsvReportWriter | None = None
+        self._audit_writer: CsvReportWriter | None = None
+        os.makedirs(self.diagram_dir, exist_ok=True)
+
+    @classmethod
+    def open(cls, session_id: str, root: str = SESSIONS_DIR) -> "CrawlSession | None":
+        """Look up an existing session's output directory (state is not restored)."""
+        if not SESSION_ID_RE.match(session_id or "") or not os.path.isdir(os.path.join(root, session_id)):
+            return None
+        return cls(session_id, root)
+
+    @property
+    def sitemap_path(self) -> str:
+        return os.path.join(self.output_dir, "sitemap.csv")
+
+    @property
+    def site_tree_path(self) -> str:
+        return os.path.join(self.output_dir, "site_tree.csv")
+
+    @property
+    def external_links_path(self) -> str:
+        return os.path.join(self.output_dir, "external_links.csv")
+
+    @property
+    def homepage_path(self) -> str:
+        return os.path.join(self.output_dir, "homepage.html")
+
+    @property
+    def diagram_dir(self) -> str:
+        return os.path.join(self.output_dir, "diagrams")
+
+    @property
+    def link_categories_path(self) -> str:
+        return os.path.join(self.output_dir, "external_link_categories.csv")
+
+    @property
+    def accessibility_path(self) -> str:
+        return os.path.join(self.output_dir, "accessibility_issues.csv")
+
+    @property
+    def checkpoint_path(self) -> str:
+        return os.path.join(self.output_dir, "checkpoint.sqlite")
+
+    def report_path(self, name: str, ext: str) -> str:
+        return os.path.join(self.output_dir, f"{name}{ext}")
+
+    def external_links_size(self) -> int:
+        if self._external_writer is not None:
+            return self._external_writer.flush()
+        return os.path.getsize(self.external_links_path) if os.path.exists(self.external_links_path) else 0
+
+    def accessibility_size(self) -> int:
+        if self._audit_writer is not None:
+            return self._audit_writer.flush()
+        return os.path.getsize(self.accessibility_path) if os.path.exists(self.accessibility_path) else 0
+
+    def restore_accessibility(self, size: int) -> None:
+        """Cut the accessibility report back to a checkpointed size."""
+        if os.path.exists(self.accessibility_path):
+            os.truncate(self.accessibility_path, size)
+
+    def write_findings(self, page_url: str, findings) -> None:
+        if not findings:
+            return
+        if self._audit_writer is None:
+            self._audit_writer = CsvReportWriter(self.accessibility_path, AUDIT_FINDING_FIELDS)
+        for f in findings:
+            self._audit_writer.writerow((page_url, f.rule, f.severity, f.message, f.element))
+
+    def restore_external_links(self, size: int) -> None:
+        """Cut the external links file back to a checkpointed size and reload the dedup sets."""
+        if not os.path.exists(self.external_links_path):
+            return
+        os.truncate(self.external_links_path, size)
+        for link in read_column(self.external_links_path, "External Link"):
+            self.seen_external_links.add(link)
+            self.seen_external_domains.add(urlparse(link).netloc)
+
+    def write_external_link(self, main_url: str, src_url: str, ext_url: str) -> None:
+        if ext_url in self.seen_external_links:
+            return
+        self.seen_external_links.add(ext_url)
+        self.seen_external_domains.add(urlparse(ext_url).netloc)
+
+        if self._external_writer is None:
+            self._external_writer = CsvReportWriter(self.external_links_path, EXTERNAL_LINK_FIELDS)
+        self._external_writer.writerow((main_url, src_url, ext_url))
+
+    def external_sites(self) -> list[str]:
+        """Origin URL of every external domain in the links report, in first-seen order."""
+        if not os.path.exists(self.external_links_path):
+            return []
+        sites = {}
+        for link in read_column(self.external_links_path, "External Link"):
+            parsed = urlparse(link)
+            if parsed.netloc:
+                sites.setdefault(parsed.netloc, f"{parsed.scheme}://{parsed.netloc}/")
+        return list(sites.values())
+
+    def write_link_categories(self, categories: dict[str, str]) -> None:
+        writer = CsvReportWriter(self.link_categories_path, LINK_CATEGORY_FIELDS, append=False)
+        for link, category in categories.items():
+            writer.writerow((link, category))
+        writer.close()
+
+    def link_categories(self) -> dict[str, str] | None:
+        """Categories of the external links, or None if they were never categorized."""
+        if not os.path.exists(self.link_categories_path):
+            return None
+        return load_mapping(self.link_categories_path)
+
+    def close_reports(self) -> None:
+        if self._external_writer is not None:
+            self._external_writer.close()
+            self._external_writer = None
+        if self._audit_writer is not None:
+            self._audit_writer.close()
+            self._audit_writer = None
+
+    def remove(self) -> None:
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
+def prune_sessions(root: str = SESSIONS_DIR, keep: int = MAX_SESSIONS) -> None:
+    """Delete the oldest session directories beyond `keep`."""
+    if not os.path.isdir(root):
+        return
+    dirs = [os.path.join(root, d) for d in os.listdir(root) if SESSION_ID_RE.match(d)]
+    dirs.sort(key=os.path.getmtime, reverse=True)
+    for path in dirs[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
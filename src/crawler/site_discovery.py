@@ -0,0 +1,111 @@
+import os
+import zlib
+from collections import deque
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import XMLPullParser
+
+from src.crawler.http_fetcher import HttpFetcher
+
+ROBOTS_USER_AGENT = "WebsiteAnalyzer"
+SITEMAP_MAX_FILES = int(os.getenv("SITEMAP_MAX_FILES", "50"))
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", "50000"))
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class RobotsPolicy:
+    """
+    robots.txt rules for the main site's host. Other hosts (subdomains,
+    external links) are always allowed, since only the main site is crawled
+    deeply. A missing robots.txt allows everything; 401/403 disallows
+    everything, as urllib.robotparser does.
+    """
+
+    def __init__(self, host: str, parser: RobotFileParser | None = None, user_agent: str = ROBOTS_USER_AGENT):
+        self.host = host
+        self.user_agent = user_agent
+        self._parser = parser
+
+    @classmethod
+    async def fetch(cls, http: HttpFetcher, main_url: str, timeout: int) -> "RobotsPolicy":
+        robots_url = f"{_origin(main_url)}/robots.txt"
+        page = await http.fetch_text(robots_url, timeout)
+        parser = RobotFileParser(robots_url)
+        if page.status in (401, 403):
+            parser.disallow_all = True
+        elif page.html is None:
+            parser = None
+        else:
+            parser.parse(page.html.splitlines())
+        return cls(urlsplit(main_url).netloc, parser)
+
+    def allowed(self, url: str) -> bool:
+        if self._parser is None or urlsplit(url).netloc != self.host:
+            return True
+        return self._parser.can_fetch(self.user_agent, url)
+
+    @property
+    def crawl_delay(self) -> float | None:
+        if self._parser is None:
+            return None
+        delay = self._parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    @property
+    def sitemaps(self) -> list[str]:
+        return (self._parser.site_maps() or []) if self._parser is not None else []
+
+
+async def iter_sitemap_urls(http: HttpFetcher, sitemap_urls: list[str], timeout: int,
+                            max_urls: int = SITEMAP_MAX_URLS, max_files: int = SITEMAP_MAX_FILES):
+    """
+    Yield page URLs from sitemaps and sitemap indexes (optionally gzipped).
+
+    Each file is streamed through an incremental XML parser, so a 50 MB
+    sitemap is never held in memory; index files queue their children.
+    """
+    pending, seen_files, yielded = deque(sitemap_urls), set(), 0
+    while pending and len(seen_files) < max_files and yielded < max_urls:
+        sitemap_url = pending.popleft()
+        if sitemap_url in seen_files:
+            continue
+        seen_files.add(sitemap_url)
+        parser = XMLPullParser(events=("start", "end"))
+        inflate, loc, root = None, None, None
+        try:
+            async for chunk in http.iter_bytes(sitemap_url, timeout):
+                if inflate is None:
+                    # .xml.gz files; bodies sent with Content-Encoding arrive already decoded.
+                    gzipped = chunk[:2] == b"\x1f\x8b"
+                    inflate = zlib.decompressobj(zlib.MAX_WBITS | 16) if gzipped else False
+                parser.feed(inflate.decompress(chunk) if inflate else chunk)
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                        continue
+                    tag = elem.tag.rpartition("}")[2]
+                    if tag == "loc":
+                        loc = (elem.text or "").strip()
+                    elif tag in ("url", "sitemap"):
+                        if loc and tag == "sitemap":
+                            pending.append(loc)
+                        elif loc:
+                            yield loc
+                            yielded += 1
+                            if yielded >= max_urls:
+                                return
+                        loc = None
+                        # Drop finished entries from the tree, or the whole sitemap stays attached to the root.
+                        del root[:]
+        except Exception as e:  # ParseError, zlib.error, transport errors
+            print(f"⚠️ Skipping sitemap {sitemap_url}: {e}")
+
+
+def default_sitemaps(main_url: str, robots: RobotsPolicy | None) -> list[str]:
+    listed = robots.sitemaps if robots is not None else []
+    return listed or [f"{_origin(main_url)}/sitemap.xml"]
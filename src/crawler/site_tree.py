@@ -0,0 +1,243 @@
+import csv
+import json
+import os
+from array import array
+from collections import OrderedDict
+
+from src.crawler.report_writer import DOWNLOAD_CHUNK_BYTES, CsvReportWriter
+from src.crawler.url_store import ROOT, UrlStore
+
+TREE_FIELDS = ["URL", "Parent URL", "Depth", "Crawled", "Children", "Pages"]
+TREE_SECTIONS = int(os.getenv("TREE_SECTIONS", "20"))
+# Ancestor URLs kept for sitemap paths, so the disk store is not queried once per level per page.
+TREE_PATH_CACHE = int(os.getenv("TREE_PATH_CACHE", "4096"))
+
+_LINKED, _CRAWLED = 1, 2
+
+
+class SiteTree:
+    """
+    The crawled site as a tree of pages, each under the page that linked
+    to it first. Grown one page at a time as pages finish.
+
+    Nodes are the URL store's ids: URLs, parents and depths are read from
+    the store, and the tree only adds first child, next sibling, subtree
+    page count and a flags byte per id (13 bytes). Subtree counts are kept
+    current on insert by walking the page's ancestors, which is at most
+    `max_depth` integer steps.
+
+    A page's parent need not be crawled (a sitemap page falls back to the
+    homepage even if that failed to load, and a resumed crawl replays pages
+    in checkpoint order). Missing ancestors are then linked in as uncrawled
+    placeholders that a later `add()` fills in.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.pages = array("I")  # crawled pages in the subtree, the node included
+        self.flags = bytearray()
+        self.roots: list[int] = []
+        self._urls: OrderedDict[int, str] = OrderedDict()
+
+    def __contains__(self, url: str) -> bool:
+        node = self.store.get_id(url)
+        return node is not None and self.is_crawled(node)
+
+    @property
+    def page_count(self) -> int:
+        return sum(self.pages[r] for r in self.roots)
+
+    def is_crawled(self, node: int) -> bool:
+        return node < len(self.flags) and bool(self.flags[node] & _CRAWLED)
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self.flags)
+        if extra > 0:
+            self.first_child.extend(array("i", [ROOT]) * extra)
+            self.next_sibling.extend(array("i", [ROOT]) * extra)
+            self.pages.extend(array("I", [0]) * extra)
+            self.flags.extend(bytes(extra))
+
+    def add(self, node: int) -> int:
+        """Record store id `node` as crawled under its store parent; returns `node`."""
+        self._grow(node + 1)
+        if self.flags[node] & _CRAWLED:
+            return node
+        self.flags[node] |= _CRAWLED
+        # Link the page and any ancestors not in the tree yet. Siblings are
+        # prepended, so a child list runs newest first.
+        child = node
+        while not self.flags[child] & _LINKED:
+            self.flags[child] |= _LINKED
+            parent = self.store.parents[child]
+            if parent == ROOT:
+                self.roots.append(child)
+                break
+            self.next_sibling[child] = self.first_child[parent]
+            self.first_child[parent] = child
+            child = parent
+        ancestor = node
+        while ancestor != ROOT:
+            self.pages[ancestor] += 1
+            ancestor = self.store.parents[ancestor]
+        return node
+
+    def _url(self, node: int) -> str:
+        url = self._urls.get(node)
+        if url is None:
+            url = self._urls[node] = self.store.url(node)
+            if len(self._urls) > TREE_PATH_CACHE:
+                self._urls.popitem(last=False)
+        else:
+            self._urls.move_to_end(node)
+        return url
+
+    def path(self, node: int) -> list[str]:
+        """URLs from the root page down to `node`."""
+        nodes = []
+        while node != ROOT:
+            nodes.append(node)
+            node = self.store.parents[node]
+        return [self._url(n) for n in reversed(nodes)]
+
+    def iter_children(self, node: int):
+        """Children of `node` in crawl order."""
+        children = []
+        child = self.first_child[node]
+        while child != ROOT:
+            children.append(child)
+            child = self.next_sibling[child]
+        return reversed(children)
+
+    def child_count(self, node: int) -> int:
+        count, child = 0, self.first_child[node]
+        while child != ROOT:
+            count += 1
+            child = self.next_sibling[child]
+        return count
+
+    def iter_nodes(self):
+        """Node ids in pre-order (every parent before its children), in crawl order among siblings."""
+        stack = self.roots[::-1]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(list(self.iter_children(node))))
+
+    def iter_crawled(self):
+        return (n for n in range(len(self.flags)) if self.flags[n] & _CRAWLED)
+
+    def sections(self, depth: int = 1, limit: int | None = TREE_SECTIONS) -> list[dict]:
+        """The largest subtrees rooted at `depth`, with their page counts."""
+        depths = self.store.depths
+        nodes = sorted((n for n in range(len(self.flags)) if depths[n] == depth and self.pages[n]),
+                       key=lambda n: -self.pages[n])
+        return [{"url": self.store.url(n), "pages": self.pages[n], "children": self.child_count(n)}
+                for n in nodes[:limit]]
+
+    def depth_stats(self) -> dict[str, dict]:
+        """Per depth: crawled pages, pages with children of their own and the widest fan-out."""
+        stats = {}
+        for node in self.iter_crawled():
+            children = self.child_count(node)
+            level = stats.setdefault(str(self.store.depths[node]), {"pages": 0, "sections": 0, "max_children": 0})
+            level["pages"] += 1
+            level["sections"] += children > 0
+            level["max_children"] = max(level["max_children"], children)
+        return stats
+
+    def summary(self) -> dict:
+        return {"pages": self.page_count, "depths": self.depth_stats(), "sections": self.sections()}
+
+    def write_csv(self, path: str) -> None:
+        writer = CsvReportWriter(path, TREE_FIELDS, append=False)
+        for node in self.iter_nodes():
+            parent = self.store.parents[node]
+            writer.writerow((self.store.url(node), self.store.url(parent) if parent != ROOT else "",
+                             self.store.depths[node], int(self.is_crawled(node)), self.child_count(node),
+                             self.pages[node]))
+        writer.close()
+
+    @classmethod
+    def load(cls, path: str) -> "SiteTree":
+        """Rebuild a tree, over a fresh in-memory URL store, from `write_csv()` output."""
+        store = UrlStore()
+        tree = cls(store)
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            # Rows are in pre-order, so a parent is always interned before its children.
+            for url, parent, depth, crawled, _, _ in reader:
+                parent_id = store.get_id(parent) if parent else None
+                node, _ = store.add(url, ROOT if parent_id is None else parent_id, int(depth))
+                if crawled == "1":
+                    store.mark_visited(node)
+                    tree.add(node)
+        return tree
+
+    def iter_json(self, chunk_size: int = DOWNLOAD_CHUNK_BYTES):
+        """Stream the tree as nested JSON objects, `chunk_size` characters at a time."""
+        parts, size = ["["], 1
+        # Entries are nodes to open, or (node,) markers to close once their children are out.
+        stack: list = self.roots[::-1]
+        first = True
+        while stack:
+            item = stack.pop()
+            if isinstance(item, tuple):
+                part = "]}"
+                first = False
+            else:
+                head = json.dumps({"url": self.store.url(item), "depth": self.store.depths[item],
+                                   "crawled": self.is_crawled(item), "pages": self.pages[item]})
+                part = ("" if first else ",") + head[:-1] + ',"children":['
+                stack.append((item,))
+                stack.extend(reversed(list(self.iter_children(item))))
+                first = True
+            parts.append(part)
+            size += len(part)
+            if size >= chunk_size:
+                yield "".join(parts)
+                parts, size = [], 0
+        parts.append("]")
+        yield "".join(parts)
+
+
+def diff_trees(old: SiteTree, new: SiteTree, limit: int | None = None) -> dict:
+    """
+    Sections added and removed between two crawls of one site.
+
+    A section is reported at its top: the highest page missing from the
+    other crawl, with the number of missing pages beneath it, so a removed
+    /blog/ with 300 posts is one entry rather than 301.
+    """
+    def parent_url(tree: SiteTree, node: int) -> str | None:
+        parent = tree.store.parents[node]
+        return tree.store.url(parent) if parent != ROOT else None
+
+    def changed_sections(tree: SiteTree, other: SiteTree) -> tuple[list[dict], int]:
+        tops: dict[int, int] = {}
+        for node in tree.iter_crawled():
+            if tree.store.url(node) in other:
+                continue
+            top = node
+            parent = tree.store.parents[top]
+            while parent != ROOT and tree.store.url(parent) not in other:
+                top, parent = parent, tree.store.parents[parent]
+            tops[top] = tops.get(top, 0) + 1
+        ordered = sorted(tops.items(), key=lambda item: -item[1])
+        return [{"url": tree.store.url(n), "parent": parent_url(tree, n), "pages": pages}
+                for n, pages in ordered[:limit]], sum(tops.values())
+
+    added, added_pages = changed_sections(new, old)
+    removed, removed_pages = changed_sections(old, new)
+    common = moved = 0
+    for node in new.iter_crawled():
+        old_node = old.store.get_id(new.store.url(node))
+        if old_node is None or not old.is_crawled(old_node):
+            continue
+        common += 1
+        moved += parent_url(old, old_node) != parent_url(new, node)
+    return {"added_sections": added, "removed_sections": removed, "added_pages": added_pages,
+            "removed_pages": removed_pages, "common_pages": common, "moved_pages": moved}
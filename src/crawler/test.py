@@ -1,247 +1,597 @@
-import csv
 import os
-from collections import defaultdict, Counter, deque
-from urllib.parse import urljoin, urlparse, urlunparse, parse_qs, urlencode
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from collections import defaultdict, Counter
+from urllib.parse import urlparse
 import asyncio
-
-OUTPUT_DIR = "tmp"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-BAD_ALT_WORDS = {"image", "photo", "picture", "pic", "logo", "icon", "graphic"}
-seen_external_links = set()
-seen_external_domains = set()
-
-WAIT_STRATEGIES = ["load", "domcontentloaded", "networkidle"]
-
-def clean_url(url: str) -> str:
-    parsed = urlparse(url)
-    query = {k: v for k, v in parse_qs(parsed.query).items() if not k.lower().startswith(("utm_", "gclid", "fbclid"))}
-    parsed = parsed._replace(query=urlencode(query, doseq=True), fragment="")
-    return urlunparse(parsed)
-
-def is_external(url: str, main_domain: str) -> bool:
-    try:
-        return urlparse(url).netloc and main_domain not in urlparse(url).netloc
-    except Exception:
-        return False
-
-def extract_links(html: str, base_url: str) -> set[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    return {urljoin(base_url, a["href"]) for a in soup.find_all("a", href=True)}
-
-def write_external_link(main_url: str, src_url: str, ext_url: str,
-                        filename: str = os.path.join(OUTPUT_DIR, "external_links.csv")) -> None:
-    if ext_url in seen_external_links:
-        return
-    seen_external_links.add(ext_url)
-    seen_external_domains.add(urlparse(ext_url).netloc)
-
-    first = not os.path.exists(filename)
-    with open(filename, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["Main website URL", "URL where external link was found", "External Link"])
-        if first:
-            writer.writeheader()
-        writer.writerow({
-            "Main website URL": main_url,
-            "URL where external link was found": src_url,
-            "External Link": ext_url,
-        })
-
-def write_sitemap_row(writer: csv.DictWriter, url: str, parent_map: dict, max_depth: int) -> None:
-    path = []
-    while url:
-        path.append(url)
-        url = parent_map.get(url)
-    path.reverse()
-    writer.writerow({f"depth {i}": path[i] if i < len(path) else "" for i in range(max_depth + 1)})
-
-def is_descriptive_alt(alt: str | None) -> bool:
-    if not alt or not alt.strip():
-        return False
-    text = alt.strip().lower()
-    if text in BAD_ALT_WORDS:
-        return False
-    if len(text.split()) <= 1 and any(w in text for w in BAD_ALT_WORDS):
-        return False
-    return True
-
-def is_valid_decorative(img) -> bool:
-    return img.get("alt", "").strip() == "" and (
-        img.get("role") == "presentation" or img.get("aria-hidden") == "true"
-    )
-
-def is_linked_image(img) -> bool:
-    return img.find_parent(["a", "button"]) is not None
-
-def is_wcag_compliant(img, seen_alts: Counter) -> bool:
-    alt = img.get("alt")
-    if alt is None:
-        return False
-    if is_valid_decorative(img):
-        return True
-    if is_linked_image(img):
-        return is_descriptive_alt(alt)
-    if not is_descriptive_alt(alt):
-        return False
-    if seen_alts[alt.strip().lower()] > 1:
-        return False
-    return True
-
-# ✅ Sync version wrapped for async use
-def fetch_single_page_sync(url, depth, timeout):
-    for wait_until in WAIT_STRATEGIES:
+from typing import NamedTuple
+
+from src.crawler.browser_pool import BrowserPool
+from src.crawler.scheduler import CrawlScheduler
+from src.crawler.http_fetcher import HttpFetcher, needs_rendering
+from src.crawler.html_analysis import analyze_html_async
+from src.crawler.page_cache import PageCache, get_page_cache
+from src.crawler.session import CrawlSession
+from src.crawler.checkpoint import CrawlCheckpoint
+from src.crawler.report_writer import CsvReportWriter
+from src.crawler.url_store import UrlStore, DiskUrlStore
+from src.crawler.distributed import RemoteLoader
+from src.crawler.metrics import PAGES, span
+from src.crawler.readiness import STRATEGIES, is_hard_network_error, is_timeout, wait_until_ready
+from src.crawler.links import LinkClassifier, clean_url, normalize_link, path_ancestors
+from src.crawler.site_discovery import RobotsPolicy, default_sitemaps, iter_sitemap_urls
+from src.crawler.budget import CrawlBudget, SharedFetchBudget
+from src.crawler.dedup import NearDuplicateIndex, UrlTrapDetector
+from src.crawler.audit import AuditSummary
+from src.crawler.audit_store import PageAuditor
+from src.crawler.site_tree import SiteTree
+
+EXTERNAL_CONCURRENCY = int(os.getenv("EXTERNAL_CONCURRENCY", "8"))
+EXTERNAL_SITE_CONCURRENCY = int(os.getenv("EXTERNAL_SITE_CONCURRENCY", "2"))
+
+def write_sitemap_row(writer: CsvReportWriter, path: list[str], max_depth: int) -> None:
+    writer.writerow([path[i] if i < len(path) else "" for i in range(max_depth + 1)])
+
+class FetchedPage(NamedTuple):
+    url: str
+    depth: int
+    html: str
+    js_links: tuple[str, ...]  # in document order
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+
+async def _read_page(page) -> tuple[str, list[str]]:
+    with span("dom_extract"):
+        html = await page.content()
+        js_links = await page.eval_on_selector_all("a[href]", "els => els.map(e => e.href)")
+    return html, js_links
+
+async def render_single_page(url, depth, timeout, pool: BrowserPool) -> FetchedPage:
+    """
+    Navigate to `domcontentloaded`, then wait for the DOM to settle.
+
+    If the settled page still looks empty, keep waiting on the same page
+    with the next, slower strategy. The strategy that produced links (or a
+    page that needs none) is remembered per domain in `pool.wait_strategies`;
+    a page that stays empty after every strategy is not remembered. Navigation
+    timeouts and hard network errors are not retried; other failures (e.g.
+    a crashed context) get one more attempt.
+    """
+    domain = urlparse(url).netloc
+    start = STRATEGIES.index(pool.wait_strategies.get(domain, STRATEGIES[0]))
+    for attempt in range(2):
         try:
-            with sync_playwright() as pw:
-                browser = pw.chromium.launch(headless=True)
-                context = browser.new_context()
-                context.route("**/*", lambda route, request: route.abort() if request.resource_type in {"image", "stylesheet", "font", "media"} else route.continue_())
-                page = context.new_page()
-                page.goto(url, timeout=timeout, wait_until=wait_until)
-                page.wait_for_timeout(1000)
-                html = page.content()
-                js_links = page.eval_on_selector_all("a[href]", "els => els.map(e => e.href)")
-                page.close()
-                context.close()
-                browser.close()
-                return url, depth, html, set(js_links)
+            async with pool.page() as page:
+                with span("navigate", "domcontentloaded"):
+                    await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+                for strategy in STRATEGIES[start:]:
+                    with span("settle", strategy):
+                        await wait_until_ready(page, strategy)
+                    html, js_links = await _read_page(page)
+                    if js_links or not needs_rendering(html):
+                        pool.wait_strategies[domain] = strategy
+                        break
+                PAGES.inc("browser")
+                return FetchedPage(url, depth, html, tuple(js_links))
         except Exception as e:
-            print(f"⚠️ Failed with wait_until='{wait_until}' for {url}: {e}")
-    return url, depth, "", set()
-
-# ✅ Async wrapper using asyncio.to_thread
-async def fetch_single_page(url, depth, timeout):
-    return await asyncio.to_thread(fetch_single_page_sync, url, depth, timeout)
+            if attempt or is_timeout(e) or is_hard_network_error(e):
+                print(f"⚠️ Failed to render {url}: {e}")
+                break
+            print(f"⚠️ Render attempt failed for {url}, retrying once: {e}")
+    return FetchedPage(url, depth, "", ())
+
+async def fetch_single_page(url, depth, timeout, pool: BrowserPool,
+                            render_mode: str = "auto", http: HttpFetcher | None = None,
+                            validators: dict | None = None) -> FetchedPage:
+    """
+    Fetch a page over plain HTTP when possible and fall back to the browser.
+
+    render_mode: "browser" always renders, "http" never renders, and "auto"
+    renders only when `needs_rendering` flags the response or the server
+    answers with a bot-wall status (401/403/429); the outcome is remembered
+    per domain in `http.render_decisions`. Other errors (404, 5xx, network
+    failures) are not retried in the browser. With `validators` the
+    HTTP request is conditional and a 304 comes back as `not_modified`.
+
+    Only pages served over plain HTTP carry validators. A 304 for an app
+    shell says nothing about the links its scripts load, so rendered pages
+    are always fetched afresh.
+    """
+    if http is not None and (render_mode != "browser" or validators):
+        domain = urlparse(url).netloc
+        decision = "browser" if render_mode == "browser" else http.render_decisions.get(domain)
+        if render_mode == "http" or decision != "browser" or validators:
+            page = await http.fetch_html(url, timeout, validators)
+            if page.not_modified:
+                return FetchedPage(url, depth, "", (), page.etag, page.last_modified, True)
+            if render_mode == "http":
+                if page.html:
+                    PAGES.inc("http")
+                return FetchedPage(url, depth, page.html or "", (), page.etag, page.last_modified)
+            if not page.html and not page.bot_wall:
+                return FetchedPage(url, depth, "", ())
+            if page.html is not None:
+                if decision != "browser" and not needs_rendering(page.html):
+                    http.render_decisions.setdefault(domain, "http")
+                    PAGES.inc("http")
+                    return FetchedPage(url, depth, page.html, (), page.etag, page.last_modified)
+                if render_mode == "auto":
+                    http.render_decisions[domain] = "browser"
+                return await render_single_page(url, depth, timeout, pool)
+    return await render_single_page(url, depth, timeout, pool)
+
+async def _attach_audit(analysis, html: str, auditor: PageAuditor | None):
+    if auditor is None:
+        return analysis
+    with span("audit"):
+        return analysis._replace(audit=await auditor.audit(html))
+
+async def load_page(url, depth, timeout, pool: BrowserPool, render_mode: str = "auto",
+                    http: HttpFetcher | None = None, cache: PageCache | None = None,
+                    cache_mode: str = "off", auditor: PageAuditor | None = None):
+    """
+    Fetch and analyze a page, reusing the cached analysis when the server
+    answers the conditional request with 304 (pages served over plain HTTP
+    only; see `fetch_single_page`). With an `auditor`, the
+    analysis also carries the page's accessibility audit.
+
+    Returns (html, analysis, from_cache); html is "" if nothing was fetched.
+    """
+    cached = cache.get(url) if cache is not None and cache_mode == "revalidate" else None
+    page = await fetch_single_page(url, depth, timeout, pool, render_mode, http,
+                                   validators=(cached.validators or None) if cached else None)
+    if page.not_modified and cached is not None:
+        PAGES.inc("cache")
+        cache.touch(url)
+        return cached.html, await _attach_audit(cached.analysis, cached.html, auditor), True
+    if not page.html:
+        return "", None, False
+
+    with span("parse"):
+        if auditor is not None:
+            analysis = await auditor.analyze(page.html, url)
+        else:
+            analysis = await analyze_html_async(page.html, url)
+    if page.js_links:
+        analysis = analysis._replace(links=tuple(dict.fromkeys(analysis.links + tuple(page.js_links))))
+    if cache is not None and cache_mode != "off":
+        cache.put(url, page.html, analysis, page.etag, page.last_modified)
+    return page.html, analysis, False
 
 async def crawl_main_site(main_url: str, generate_links: bool = True,
                           max_depth: int = 3, use_proxy: bool = True,
-                          concurrency: int = os.cpu_count(), timeout: int = 60000):
+                          concurrency: int = os.cpu_count(), timeout: int = 60000,
+                          pool: BrowserPool | None = None,
+                          max_per_host: int | None = None, host_delay: float = 0.0,
+                          render_mode: str = "auto", cache_mode: str = "off",
+                          cache: PageCache | None = None, on_progress=None,
+                          session: CrawlSession | None = None,
+                          checkpoint: CrawlCheckpoint | None = None,
+                          url_store: str = "memory", workers: int = 0,
+                          respect_robots: bool = True, use_sitemaps: bool = True,
+                          budget: CrawlBudget | None = None, detect_duplicates: bool = True,
+                          auditor: PageAuditor | None = None):
+
+    if cache_mode != "off" and cache is None:
+        cache = get_page_cache()
+
+    session = session or CrawlSession()
+
+    # Owned pools start lazily, so pure-HTTP crawls never launch Chromium.
+    owns_pool = pool is None
+    if owns_pool:
+        pool = BrowserPool.for_concurrency(concurrency)
+    http = HttpFetcher(max_connections=max(concurrency, 10))
+
+    # With workers, fetching and parsing move to worker processes sharded by
+    # URL hash; everything below stays in this (coordinator) process.
+    if workers:
+        remote = RemoteLoader(workers, concurrency, timeout, render_mode, cache_mode,
+                              audit_rules=auditor.rule_names if auditor else None)
+        loader = remote
+        concurrency *= workers
+    else:
+        remote = None
+        loader = lambda url, depth: load_page(url, depth, timeout, pool, render_mode, http, cache, cache_mode,
+                                              auditor)
 
     start_url = clean_url(main_url)
-    visited = set()
-    queue = deque([(start_url, 0)])
+    links = LinkClassifier(main_url)
     page_counts = defaultdict(int)
-    stats = {"attachments": 0, "images": 0, "accessible_images": 0}
-    parent_map = {start_url: None}
+    stats = {"attachments": 0, "images": 0, "accessible_images": 0, "cached_pages": 0,
+             "robots_blocked": 0, "sitemap_seeds": 0,
+             "duplicates_skipped": 0, "trap_urls_skipped": 0, "fetches_saved": 0}
     homepage_html = ""
 
-    sitemap_path = os.path.join(OUTPUT_DIR, "sitemap.csv")
-    sitemap_file = open(sitemap_path, "w", newline="", encoding="utf-8") if generate_links else None
-    sitemap_writer = csv.DictWriter(sitemap_file, fieldnames=[f"depth {i}" for i in range(max_depth + 1)]) if sitemap_file else None
-    if sitemap_writer:
-        sitemap_writer.writeheader()
-
-    sem = asyncio.Semaphore(concurrency)
+    resumed = checkpoint.load() if checkpoint else None
+    if resumed and clean_url(resumed.meta.get("main_url", main_url)) != clean_url(main_url):
+        await http.close()
+        raise ValueError(f"The checkpoint is a crawl of {resumed.meta['main_url']}, not {main_url}")
+    if resumed and resumed.meta.get("complete"):
+        print("✅ Crawl already completed at its last checkpoint, nothing to resume")
+        await http.close()
+        return (defaultdict(int, resumed.meta["page_counts"]), resumed.meta["stats"],
+                resumed.meta["homepage_html"])
+
+    robots = await RobotsPolicy.fetch(http, main_url, timeout) if respect_robots else None
+    if robots is not None and robots.crawl_delay and robots.crawl_delay > host_delay:
+        print(f"🤖 robots.txt asks for a {robots.crawl_delay}s crawl delay")
+        host_delay = robots.crawl_delay
+
+    # Near-duplicate pages are crawled but not expanded; trap URLs are never queued.
+    near_duplicates = NearDuplicateIndex() if detect_duplicates else None
+    traps = UrlTrapDetector() if detect_duplicates else None
+
+    def admit(url):
+        if robots is not None and not robots.allowed(url):
+            stats["robots_blocked"] += 1
+            return False
+        if traps is not None and traps.check(url):
+            stats["trap_urls_skipped"] += 1
+            stats["fetches_saved"] += 1
+            return False
+        return budget is None or budget.admit(url)
+
+    # Frontier, visited set and parent links all live in one compact store;
+    # "disk" spills URL text to SQLite for million-page crawls.
+    store = DiskUrlStore(os.path.join(session.output_dir, "urls.sqlite")) if url_store == "disk" else UrlStore()
+    # Crawled pages under the page that found them; sitemap rows and section counts come from here.
+    tree = SiteTree(store)
+    scheduler = CrawlScheduler(concurrency, max_depth=max_depth, max_per_host=max_per_host,
+                               host_delay=host_delay, store=store, admit=admit)
+
+    if resumed:
+        # Continue from the last checkpoint: restore counters, re-queue unfinished
+        # pages and cut the report files back to what that checkpoint covered.
+        page_counts.update(resumed.meta["page_counts"])
+        stats.update(resumed.meta["stats"])
+        homepage_html = resumed.meta["homepage_html"]
+        if generate_links and os.path.exists(session.sitemap_path):
+            os.truncate(session.sitemap_path, resumed.meta["sitemap_size"])
+        session.restore_external_links(resumed.meta["external_links_size"])
+        session.restore_accessibility(resumed.meta.get("accessibility_size", 0))
+        for url, depth, parent, done in resumed.rows:
+            scheduler.restore(url, depth, parent, done)
+            if done:
+                tree.add(store.get_id(url))
+            if budget is not None:
+                budget.note(url, done)
+        print(f"♻️ Resuming crawl: {store.visited_count} pages done, {scheduler.queue_depth} queued")
+    else:
+        scheduler.add(start_url, 0)
+        if checkpoint:
+            checkpoint.enqueued(start_url, 0, None)
+
+    def sitemap_parent(url: str) -> str:
+        for candidate in path_ancestors(url):
+            uid = store.get_id(candidate)
+            if uid is not None and store.is_visited(uid):
+                return candidate
+        return start_url
+
+    async def fill_from_sitemaps() -> int:
+        """
+        Queue the sitemap pages link discovery did not reach, each under its
+        nearest crawled path ancestor (the homepage if none) at that page's
+        depth + 1, so depths, sections and max_depth mean the same as for
+        linked pages. The sitemaps are streamed, not kept in memory.
+        """
+        added = 0
+        async for loc in iter_sitemap_urls(http, default_sitemaps(main_url, robots), timeout):
+            normalized = normalize_link(loc)
+            if normalized is None or not links.is_internal(normalized[1]) or normalized[0] in scheduler:
+                continue
+            parent = sitemap_parent(normalized[0])
+            depth = store.depths[store.get_id(parent)] + 1
+            if scheduler.add(normalized[0], depth, parent=parent):
+                added += 1
+                if checkpoint:
+                    checkpoint.enqueued(normalized[0], depth, parent)
+        if added:
+            stats["sitemap_seeds"] += added
+            print(f"🗺️ Queued {added} pages from sitemaps that no link led to")
+        return added
+
+    # Lives in stats so checkpoints carry it; a resumed crawl keeps adding to it.
+    audit_summary = AuditSummary(stats.setdefault("audit", {})) if auditor is not None else None
+
+    sitemap_writer = CsvReportWriter(session.sitemap_path, [f"depth {i}" for i in range(max_depth + 1)],
+                                     append=bool(resumed)) if generate_links else None
+
+    def snapshot():
+        return {
+            "main_url": main_url,
+            "page_counts": dict(page_counts),
+            "stats": stats,
+            "homepage_html": homepage_html,
+            "sitemap_size": sitemap_writer.flush() if sitemap_writer else 0,
+            "external_links_size": session.external_links_size(),
+            "accessibility_size": session.accessibility_size(),
+        }
 
     async def crawl_page(url, depth):
-        async with sem:
-            return await fetch_single_page(url, depth, timeout)
-
-    while queue:
-        batch = []
-        while queue and len(batch) < concurrency:
-            url, depth = queue.popleft()
-            if url not in visited and depth <= max_depth:
-                batch.append((url, depth))
-
-        tasks = [crawl_page(url, depth) for url, depth in batch]
-        results = await asyncio.gather(*tasks)
+        nonlocal homepage_html
+        if traps is not None and traps.is_trapped(url):
+            stats["trap_urls_skipped"] += 1
+            stats["fetches_saved"] += 1
+            if checkpoint:
+                checkpoint.done(url)
+            return
+        html, analysis, from_cache = await loader(url, depth)
+        if analysis is None:
+            return
+        if budget is not None and not budget.page_done():
+            return  # finished after max_pages was reached
+        url_id = store.get_id(url)
+        store.mark_visited(url_id)
+        node = tree.add(url_id)
+        stats["cached_pages"] += from_cache
+
+        print(f"[{store.visited_count}] Crawled (depth {depth}, queued {scheduler.queue_depth}): {url}")
+        if on_progress:
+            on_progress(pages_done=store.visited_count, queue_depth=scheduler.queue_depth,
+                        in_flight=scheduler.in_flight - 1, url=url)
+        if depth == 0:
+            homepage_html = html
+        page_counts[str(depth)] += 1
 
-        for url, depth, html, js_links in results:
-            if not html or url in visited:
-                continue
-            visited.add(url)
-
-            print(f"[{len(visited)}] Crawled (depth {depth}): {url}")
-            if depth == 0:
-                homepage_html = html
-            page_counts[str(depth)] += 1
-
-            soup = BeautifulSoup(html, "html.parser")
-            stats["attachments"] += sum(
-                1 for a in soup.find_all("a", href=True)
-                if a["href"].lower().endswith((".pdf", ".docx", ".pptx", ".xlsx", ".zip"))
-            )
-            imgs = soup.find_all("img")
-            stats["images"] += len(imgs)
-            seen_alts = Counter(img.get("alt", "").strip().lower() for img in imgs if img.has_attr("alt"))
-            stats["accessible_images"] += sum(is_wcag_compliant(img, seen_alts) for img in imgs)
-
-            domain = urlparse(main_url).netloc
-            links = extract_links(html, url) | js_links
-
-            if sitemap_writer and generate_links:
-                write_sitemap_row(sitemap_writer, url, parent_map, max_depth)
-
-            for link in links:
-                cleaned = clean_url(link)
-                if urlparse(cleaned).scheme not in ("http", "https"):
-                    continue
-                if is_external(cleaned, domain):
-                    write_external_link(main_url, url, cleaned)
-                elif cleaned not in visited and cleaned not in parent_map:
-                    parent_map[cleaned] = url
-                    queue.append((cleaned, depth + 1))
-
-    if sitemap_file:
-        sitemap_file.close()
-
-    print(f"\n✅ Crawl completed. Pages visited: {len(visited)}")
+        stats["attachments"] += analysis.attachments
+        stats["images"] += len(analysis.images)
+        stats["accessible_images"] += analysis.accessible_images
+        if audit_summary is not None and analysis.audit is not None:
+            audit_summary.add(analysis.audit)
+
+        duplicate_of = None
+        if near_duplicates is not None:
+            duplicate_of = near_duplicates.add(url_id, analysis.fingerprint)
+            traps.record(url, duplicate_of is not None)
+
+        with span("link_normalize"):
+            internal, external = links.partition(analysis.links)
+            if duplicate_of is not None:
+                # Its links were expanded from the page it duplicates (or will
+                # be from a non-duplicate page); count the fetches this saves.
+                # A link not queued yet counts once per duplicate page it is on,
+                # so this is an upper bound.
+                stats["duplicates_skipped"] += 1
+                if depth < max_depth:
+                    stats["fetches_saved"] += sum(cleaned not in scheduler for cleaned in internal)
+            else:
+                for cleaned in internal:
+                    if scheduler.add(cleaned, depth + 1, parent=url) and checkpoint:
+                        checkpoint.enqueued(cleaned, depth + 1, url)
+
+        with span("csv_write"):
+            if sitemap_writer:
+                write_sitemap_row(sitemap_writer, tree.path(node), max_depth)
+            for cleaned in external:
+                session.write_external_link(main_url, url, cleaned)
+            if analysis.audit is not None:
+                session.write_findings(url, analysis.audit.findings)
+
+        if checkpoint:
+            checkpoint.done(url)
+            checkpoint.maybe_flush(snapshot)
+
+        if budget is not None:
+            if remote:
+                budget.bytes = remote.bytes_received
+            elif not from_cache:
+                budget.add_bytes(len(html))
+            stats["budget_rejected"] = budget.rejected
+            reason = budget.exhausted()
+            if reason and not scheduler.stopped:
+                # A budget stop is a finished crawl, not an interrupted one.
+                print(f"⏹️ Crawl budget {reason} reached, stopping with {scheduler.queue_depth} pages queued")
+                stats["stopped_by"] = reason
+                scheduler.stop()
+
+    completed = False
+    try:
+        if remote:
+            await remote.start(on_failure=lambda error: scheduler.stop())
+        await scheduler.run(crawl_page)
+        if use_sitemaps and not scheduler.stopped and await fill_from_sitemaps():
+            await scheduler.run(crawl_page)
+        # Only a crawl that ran to the end is marked complete; anything else stays resumable.
+        if remote and remote.failure:
+            raise remote.failure
+        if scheduler.handled and not store.visited_count:
+            raise RuntimeError(f"No page of {main_url} could be crawled "
+                               f"({scheduler.failed} of {scheduler.handled} failed with errors)")
+        completed = True
+    finally:
+        stats["tree"] = tree.summary()
+        if checkpoint:
+            checkpoint.flush({**snapshot(), "complete": completed})
+        if sitemap_writer:
+            sitemap_writer.close()
+        tree.write_csv(session.site_tree_path)
+        session.close_reports()
+        await http.close()
+        if owns_pool:
+            await pool.close()
+        if remote:
+            await remote.close()
+            print(f"🛰️ Pages per worker: {remote.pages_per_shard}")
+        if url_store == "disk":
+            store.close()
+
+    print(f"\n✅ Crawl completed. Pages visited: {store.visited_count}")
     print(f"📦 Attachments: {stats['attachments']}, 🖼️ Images: {stats['images']}, ♿ Accessible Images: {stats['accessible_images']}")
+    if cache is not None:
+        print(f"🗄️ Pages unchanged since last crawl (304): {stats['cached_pages']}")
+    if audit_summary is not None:
+        state = audit_summary.state
+        print(f"♿ Accessibility audit: {state['pages_with_findings']} of {state['pages']} pages with findings "
+              f"({state['cached_pages']} reused unchanged)")
+    if detect_duplicates:
+        print(f"♊ Near-duplicates not expanded: {stats['duplicates_skipped']}, trap URLs skipped: "
+              f"{stats['trap_urls_skipped']}, fetches saved: {stats['fetches_saved']}")
     return page_counts, stats, homepage_html
 
-async def crawl_selected_external(ext_url: str, max_depth: int = 2, timeout: int = 60000):
+async def crawl_selected_external(ext_url: str, max_depth: int = 2, timeout: int = 60000,
+                                  pool: BrowserPool | None = None, render_mode: str = "auto",
+                                  cache_mode: str = "off", cache: PageCache | None = None,
+                                  concurrency: int = EXTERNAL_SITE_CONCURRENCY, max_pages: int | None = None,
+                                  http: HttpFetcher | None = None, shared: SharedFetchBudget | None = None,
+                                  on_progress=None, auditor: PageAuditor | None = None):
+    """
+    Crawl one external site, `concurrency` pages at a time. When several
+    sites are crawled together they pass one `http` client and a `shared`
+    fetch budget; each fetch then waits for a slot from it.
+    """
+    if cache_mode != "off" and cache is None:
+        cache = get_page_cache()
+    owns_pool = pool is None
+    if owns_pool:
+        pool = BrowserPool(browsers=1, contexts_per_browser=1)
+    owns_http = http is None
+    if owns_http:
+        http = HttpFetcher(max_connections=10)
+
     start_url = clean_url(ext_url)
-    visited = set()
-    queue = deque([(start_url, 0)])
+    site = urlparse(start_url).netloc
+    links = LinkClassifier(start_url)
+    budget = CrawlBudget(max_pages=max_pages) if max_pages else None
+    scheduler = CrawlScheduler(concurrency, max_depth=max_depth, admit=budget.admit if budget else None)
+    store = scheduler.store
     page_counts = defaultdict(int)
     stats = {"attachments": 0, "images": 0, "accessible_images": 0}
+    audit_summary = AuditSummary() if auditor is not None else None
 
-    while queue:
-        url, depth = queue.popleft()
-        if depth > max_depth or url in visited:
-            continue
-        visited.add(url)
-
-        print(f"[Depth {depth}] Crawled: {url}")
-        _, _, html, js_links = await fetch_single_page(url, depth, timeout)
+    async def crawl_page(url, depth):
+        if shared is not None and not await shared.acquire(site):
+            scheduler.stop()
+            return
+        try:
+            print(f"[Depth {depth}] Crawled: {url}")
+            store.mark_visited(store.get_id(url))
+            html, analysis, _ = await load_page(url, depth, timeout, pool, render_mode, http, cache, cache_mode,
+                                                auditor)
+        finally:
+            if shared is not None:
+                shared.release()
+        if on_progress:
+            on_progress(pages_done=store.visited_count, queue_depth=scheduler.queue_depth,
+                        in_flight=scheduler.in_flight - 1, url=url)
         if not html:
-            continue
+            return
+        if budget is not None and not budget.page_done():
+            return
+        if budget is not None and budget.exhausted():
+            scheduler.stop()
 
-        soup = BeautifulSoup(html, "html.parser")
         page_counts[str(depth)] += 1
 
-        stats["attachments"] += sum(
-            1 for a in soup.find_all("a", href=True)
-            if a["href"].lower().endswith((".pdf", ".docx", ".pptx", ".xlsx", ".zip"))
-        )
-
-        imgs = soup.find_all("img")
-        stats["images"] += len(imgs)
-        seen_alts = Counter(img.get("alt", "").strip().lower() for img in imgs if img.has_attr("alt"))
-        stats["accessible_images"] += sum(is_wcag_compliant(img, seen_alts) for img in imgs)
-
-        domain = urlparse(start_url).netloc
-        links = extract_links(html, url) | js_links
-        for link in links:
-            cleaned = clean_url(link)
-            if urlparse(cleaned).scheme not in ("http", "https"):
-                continue
-            if domain in urlparse(cleaned).netloc and cleaned not in visited:
-                queue.append((cleaned, depth + 1))
+        stats["attachments"] += analysis.attachments
+        stats["images"] += len(analysis.images)
+        stats["accessible_images"] += analysis.accessible_images
+        if audit_summary is not None and analysis.audit is not None:
+            audit_summary.add(analysis.audit)
+
+        internal, _ = links.partition(analysis.links)
+        for cleaned in internal:
+            scheduler.add(cleaned, depth + 1)
 
-    return {
+    scheduler.add(start_url, 0)
+    try:
+        await scheduler.run(crawl_page)
+    finally:
+        if owns_http:
+            await http.close()
+        if owns_pool:
+            await pool.close()
+
+    result = {
         "page_counts": dict(page_counts),
         "site_stats": stats,
-        "summary": f"Crawled {len(visited)} pages from {ext_url}"
+        "summary": f"Crawled {store.visited_count} pages from {ext_url}"
     }
+    if audit_summary is not None:
+        result["accessibility"] = audit_summary.report()
+    return result
+
+async def crawl_external_sites(ext_urls: list[str], max_depth: int = 1, timeout: int = 60000,
+                               pool: BrowserPool | None = None, render_mode: str = "auto",
+                               cache_mode: str = "off", concurrency: int = EXTERNAL_CONCURRENCY,
+                               per_site_concurrency: int = EXTERNAL_SITE_CONCURRENCY,
+                               max_pages_per_site: int | None = None, max_total_pages: int | None = None,
+                               on_progress=None, auditor: PageAuditor | None = None):
+    """
+    Audit many external sites at once. All sites share one HTTP client, the
+    browser pool and a fetch budget of `concurrency` parallel fetches and
+    `max_total_pages` pages, handed out fairly across sites.
+
+    Returns per-site results (or errors) keyed by domain, plus totals.
+    """
+    sites = {}
+    for url in ext_urls:
+        cleaned = clean_url(url if "://" in url else f"https://{url}")
+        sites.setdefault(urlparse(cleaned).netloc, cleaned)
+    sites.pop("", None)
+
+    owns_pool = pool is None
+    if owns_pool:
+        pool = BrowserPool()
+    cache = get_page_cache() if cache_mode != "off" else None
+    http = HttpFetcher(max_connections=concurrency)
+    shared = SharedFetchBudget(concurrency, max_total_pages)
+    progress = {}
+
+    def site_progress(domain):
+        def report(pages_done, queue_depth, in_flight=0, url=None):
+            progress[domain] = (pages_done, queue_depth, in_flight)
+            if on_progress:
+                done, queued, active = (sum(p) for p in zip(*progress.values()))
+                on_progress(pages_done=done, queue_depth=queued, in_flight=active, url=url)
+        return report
+
+    try:
+        results = await asyncio.gather(*(
+            crawl_selected_external(url, max_depth, timeout, pool, render_mode, cache_mode, cache,
+                                    concurrency=per_site_concurrency, max_pages=max_pages_per_site,
+                                    http=http, shared=shared, on_progress=site_progress(domain), auditor=auditor)
+            for domain, url in sites.items()
+        ), return_exceptions=True)
+    finally:
+        await http.close()
+        if owns_pool:
+            await pool.close()
+
+    per_site, totals, failed = {}, Counter(), 0
+    for domain, result in zip(sites, results):
+        if isinstance(result, Exception):
+            failed += 1
+            per_site[domain] = {"error": str(result) or type(result).__name__}
+            continue
+        per_site[domain] = result
+        totals.update(result["site_stats"])
+        totals["pages"] += sum(result["page_counts"].values())
+
+    summary = f"Crawled {totals['pages']} pages from {len(sites) - failed} of {len(sites)} sites"
+    if shared.exhausted:
+        summary += f" (stopped at the {max_total_pages} page budget)"
+    return {"sites": per_site, "totals": dict(totals), "summary": summary}
 
 async def run_full_crawl(url: str, max_depth: int = 3, use_proxy: bool = True,
                          generate_links: bool = True, concurrency: int = os.cpu_count(),
-                         timeout: int = 60000):
+                         timeout: int = 60000, pool: BrowserPool | None = None,
+                         max_per_host: int | None = None, host_delay: float = 0.0,
+                         render_mode: str = "auto", cache_mode: str = "off",
+                         on_progress=None, session: CrawlSession | None = None,
+                         checkpoint: CrawlCheckpoint | None = None,
+                         url_store: str = "memory", workers: int = 0,
+                         respect_robots: bool = True, use_sitemaps: bool = True,
+                         budget: CrawlBudget | None = None, detect_duplicates: bool = True,
+                         auditor: PageAuditor | None = None):
     return await crawl_main_site(
         url, generate_links=generate_links,
         max_depth=max_depth, use_proxy=use_proxy,
-        concurrency=concurrency, timeout=timeout
+        concurrency=concurrency, timeout=timeout, pool=pool,
+        max_per_host=max_per_host, host_delay=host_delay,
+        render_mode=render_mode, cache_mode=cache_mode,
+        on_progress=on_progress, session=session, checkpoint=checkpoint,
+        url_store=url_store, workers=workers,
+        respect_robots=respect_robots, use_sitemaps=use_sitemaps, budget=budget,
+        detect_duplicates=detect_duplicates, auditor=auditor
     )
@@ -0,0 +1,201 @@
+import hashlib
+import math
+import os
+import sqlite3
+from array import array
+
+ROOT = -1
+
+
+def _split_url(url: str) -> tuple[str, str]:
+    """('https://host', '/path?query') - the origin is stored once per host."""
+    start = url.find("://")
+    if start < 0:
+        return "", url
+    end = url.find("/", start + 3)
+    return (url, "") if end < 0 else (url[:end], url[end:])
+
+
+class _Links:
+    """Array-backed parent/depth/visited columns indexed by URL id."""
+
+    def _init_links(self):
+        self.parents = array("i")
+        self.depths = array("B")
+        self._visited = bytearray()
+        self.visited_count = 0
+
+    def _append_links(self, parent: int, depth: int) -> None:
+        self.parents.append(parent)
+        self.depths.append(min(depth, 255))
+        if len(self.parents) > len(self._visited) * 8:
+            self._visited.append(0)
+
+    def mark_visited(self, url_id: int) -> None:
+        byte, bit = divmod(url_id, 8)
+        if not self._visited[byte] & (1 << bit):
+            self._visited[byte] |= 1 << bit
+            self.visited_count += 1
+
+    def is_visited(self, url_id: int) -> bool:
+        byte, bit = divmod(url_id, 8)
+        return bool(self._visited[byte] & (1 << bit))
+
+    def path(self, url_id: int) -> list[str]:
+        """URLs from the root page down to `url_id`."""
+        ids = []
+        while url_id != ROOT:
+            ids.append(url_id)
+            url_id = self.parents[url_id]
+        return [self.url(i) for i in reversed(ids)]
+
+
+class UrlStore(_Links):
+    """
+    Interns URLs to dense integer ids in compact in-memory columns.
+
+    URL text lives in one bytearray (origins stored once per host) and is
+    indexed by an open-addressing hash table of ids, so each URL costs
+    roughly its path length plus ~25 bytes instead of a str object and
+    several dict/set entries.
+    """
+
+    def __init__(self, capacity: int = 1 << 12):
+        size = 1 << max(4, math.ceil(math.log2(max(capacity, 8) * 2)))
+        self._blob = bytearray()
+        self._offsets = array("Q", [0])
+        self._origins: list[str] = []
+        self._origin_ids: dict[str, int] = {}
+        self._url_origin = array("I")
+        self._table = array("i", bytes(4 * size))  # url id + 1, 0 = empty
+        self._mask = size - 1
+        self._init_links()
+
+    def __len__(self) -> int:
+        return len(self._url_origin)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get_id(url) is not None
+
+    def url(self, url_id: int) -> str:
+        rest = self._blob[self._offsets[url_id]:self._offsets[url_id + 1]].decode("utf-8")
+        return self._origins[self._url_origin[url_id]] + rest
+
+    def _find(self, url: str):
+        origin, rest = _split_url(url)
+        origin_id = self._origin_ids.get(origin)
+        encoded = rest.encode("utf-8")
+        i = hash(url) & self._mask
+        while True:
+            slot = self._table[i]
+            if not slot:
+                return None, i, origin, encoded
+            uid = slot - 1
+            if (self._url_origin[uid] == origin_id
+                    and self._blob[self._offsets[uid]:self._offsets[uid + 1]] == encoded):
+                return uid, i, origin, encoded
+            i = (i + 1) & self._mask
+
+    def get_id(self, url: str) -> int | None:
+        return self._find(url)[0]
+
+    def add(self, url: str, parent: int = ROOT, depth: int = 0) -> tuple[int, bool]:
+        """Intern `url`; returns (id, created)."""
+        uid, slot, origin, encoded = self._find(url)
+        if uid is not None:
+            return uid, False
+        uid = len(self)
+        origin_id = self._origin_ids.get(origin)
+        if origin_id is None:
+            origin_id = self._origin_ids[origin] = len(self._origins)
+            self._origins.append(origin)
+        self._blob += encoded
+        self._offsets.append(len(self._blob))
+        self._url_origin.append(origin_id)
+        self._table[slot] = uid + 1
+        self._append_links(parent, depth)
+        if len(self) * 2 > len(self._table):
+            self._grow()
+        return uid, True
+
+    def _grow(self) -> None:
+        size = len(self._table) * 2
+        self._table = array("i", bytes(4 * size))
+        self._mask = size - 1
+        for uid in range(len(self)):
+            i = hash(self.url(uid)) & self._mask
+            while self._table[i]:
+                i = (i + 1) & self._mask
+            self._table[i] = uid + 1
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.size = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self._bits = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for p in self._positions(key):
+            self._bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class DiskUrlStore(_Links):
+    """
+    Same interface as UrlStore, but URL text spills to SQLite and a Bloom
+    filter answers most "never seen" checks without touching disk. Only
+    the parent/depth/visited columns (~6 bytes per URL) stay in memory.
+    """
+
+    def __init__(self, path: str, expected_urls: int = 1_000_000, error_rate: float = 0.01):
+        self.db_path = path
+        if os.path.exists(path):
+            os.remove(path)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE)")
+        self._bloom = BloomFilter(expected_urls, error_rate)
+        self._count = 0
+        self._init_links()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, url: str) -> bool:
+        return self.get_id(url) is not None
+
+    def url(self, url_id: int) -> str:
+        return self._db.execute("SELECT url FROM urls WHERE id = ?", (url_id,)).fetchone()[0]
+
+    def get_id(self, url: str) -> int | None:
+        if url not in self._bloom:
+            return None
+        row = self._db.execute("SELECT id FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, url: str, parent: int = ROOT, depth: int = 0) -> tuple[int, bool]:
+        uid = self.get_id(url)
+        if uid is not None:
+            return uid, False
+        uid = self._count
+        self._db.execute("INSERT INTO urls VALUES (?, ?)", (uid, url))
+        self._bloom.add(url)
+        self._count += 1
+        self._append_links(parent, depth)
+        return uid, True
+
+    def close(self) -> None:
+        self._db.close()
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
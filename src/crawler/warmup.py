@@ -0,0 +1,60 @@
+import asyncio
+import os
+import time
+
+from src.crawler.browser_pool import get_browser_pool
+from src.crawler.html_analysis import warm_parse_executor
+
+PREWARM_BROWSER_POOL = os.getenv("PREWARM_BROWSER_POOL", "1") != "0"
+PREWARM_PARSE_POOL = os.getenv("PREWARM_PARSE_POOL", "1") != "0"
+
+# component -> "pending" | "ready" | "skipped" | "failed: <reason>"
+_components: dict[str, str] = {}
+_task: asyncio.Task | None = None
+_started_at: float | None = None
+
+
+async def _warm(name: str, enabled: bool, start) -> None:
+    if not enabled:
+        _components[name] = "skipped"
+        return
+    _components[name] = "pending"
+    began = time.perf_counter()
+    try:
+        await start()
+    except Exception as e:
+        _components[name] = f"failed: {type(e).__name__}: {e}"
+        print(f"⚠️ Warm-up of {name} failed: {e}")
+        return
+    _components[name] = "ready"
+    print(f"🔥 {name} warm in {time.perf_counter() - began:.2f}s")
+
+
+async def _warm_up() -> None:
+    await asyncio.gather(
+        _warm("parse_pool", PREWARM_PARSE_POOL, lambda: asyncio.to_thread(warm_parse_executor)),
+        _warm("browser_pool", PREWARM_BROWSER_POOL, lambda: get_browser_pool().start()),
+    )
+
+
+def start_warm_up() -> None:
+    """Start the parse and browser pools in the background; the API serves meanwhile."""
+    global _task, _started_at
+    if _task is None:
+        _started_at = time.time()
+        _components.update(parse_pool="pending", browser_pool="pending")
+        _task = asyncio.create_task(_warm_up())
+
+
+async def stop_warm_up() -> None:
+    global _task
+    if _task is not None and not _task.done():
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+
+
+def readiness() -> tuple[bool, dict]:
+    """(ready, details): ready once every enabled component is warm."""
+    ready = _task is not None and all(state in ("ready", "skipped") for state in _components.values())
+    return ready, {"components": dict(_components), "warming_since": _started_at}
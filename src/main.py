@@ -16,6 +16,8 @@ if sys.platform.startswith("win"):
 
 # absolute‑within‑package import ✔
 from src.routes.fastapi_app import router as crawl_router
+from src.routes.metrics import router as metrics_router
+from src.routes.health import router as health_router
 
 # optional file logging
 os.makedirs("logs", exist_ok=True)
@@ -35,5 +37,7 @@ app.add_middleware(
 )
 
 app.include_router(crawl_router, prefix="/crawl")
+app.include_router(metrics_router)
+app.include_router(health_router)
 
 logging.info("🚀 API started")
@@ -1,28 +1,46 @@
 import os
 import sys
+import json
+import asyncio
 import shutil
-import subprocess
 import traceback
-import webbrowser
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field
-from typing import Optional
-
-from src.crawler.test import run_full_crawl, crawl_selected_external
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+
+from src.crawler.test import run_full_crawl, crawl_selected_external, crawl_external_sites
+from src.crawler.browser_pool import get_browser_pool, close_browser_pool
+from src.crawler.html_analysis import shutdown_parse_executor
+from src.crawler.jobs import CrawlJob, JobManager
+from src.crawler.session import CrawlSession, prune_sessions
+from src.crawler.checkpoint import CrawlCheckpoint
+from src.crawler.links import clean_url
+from src.crawler.budget import CrawlBudget
+from src.crawler.audit import RULES, AuditSummary
+from src.crawler.audit_store import PageAuditor, get_audit_store
+from src.crawler.site_tree import SiteTree, diff_trees
 from src.crawler.diagram_generator import outline_to_mermaid, extract_level1_outlines
-from src.crawler.gemini_outline import generate_sitemap_outline_from_homepage, categorize_external_link
+from src.crawler.mermaid_renderer import get_diagram_renderer
+from src.crawler.gemini_outline import generate_sitemap_outline_from_homepage
+from src.crawler.link_categorizer import categorize_links, get_category_cache
+from src.crawler.metrics import collect_timings, timing_breakdown
+from src.crawler.report_writer import (COLUMNAR_FORMATS, export_columnar, iter_csv_with_column,
+                                       iter_file_chunks, read_column)
 
 if sys.platform.startswith("win"):
-    import asyncio
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 router = APIRouter()
+jobs = JobManager()
+
 
-OUTPUT_DIR = "tmp"
-DIAGRAM_DIR = os.path.join(OUTPUT_DIR, "diagrams")
-os.makedirs(DIAGRAM_DIR, exist_ok=True)
+def _known_rules(rules: list[str] | None) -> list[str] | None:
+    unknown = [r for r in rules or () if r not in RULES]
+    if unknown:
+        raise ValueError(f"Unknown audit rules {unknown}; available: {sorted(RULES)}")
+    return rules
 
 
 class CrawlRequest(BaseModel):
@@ -32,55 +50,115 @@ class CrawlRequest(BaseModel):
     generate_links: bool = True
     concurrency: Optional[int] = None
     timeout: Optional[int] = None
+    max_per_host: Optional[int] = Field(None, ge=1)
+    host_delay: float = Field(0.0, ge=0)
+    render_mode: Literal["auto", "http", "browser"] = "auto"
+    cache_mode: Literal["off", "revalidate", "refresh"] = "off"
+    outline_mode: Literal["llm", "rules"] = "llm"
+    resume_job_id: Optional[str] = None
+    checkpoint_every_pages: int = Field(50, ge=1)
+    checkpoint_every_seconds: float = Field(30.0, gt=0)
+    url_store: Literal["memory", "disk"] = "memory"
+    workers: int = Field(0, ge=0, le=64)
+    respect_robots: bool = True
+    use_sitemaps: bool = True
+    max_pages: Optional[int] = Field(None, ge=1)
+    max_seconds: Optional[float] = Field(None, gt=0)
+    max_bytes: Optional[int] = Field(None, ge=1)
+    prefix_caps: dict[str, int] = Field(default_factory=dict)
+    detect_duplicates: bool = True
+    audit: bool = False
+    audit_rules: Optional[list[str]] = None  # default: every registered rule
+
+    @field_validator("audit_rules")
+    @classmethod
+    def _known_audit_rules(cls, rules):
+        return _known_rules(rules)
+
+    def budget(self) -> CrawlBudget | None:
+        if self.max_pages is None and self.max_seconds is None and self.max_bytes is None and not self.prefix_caps:
+            return None
+        return CrawlBudget(self.max_pages, self.max_seconds, self.max_bytes, self.prefix_caps)
+
+    def auditor(self) -> PageAuditor | None:
+        return PageAuditor(self.audit_rules, get_audit_store()) if self.audit else None
+
+
+ReportFormat = Literal["csv", "parquet", "arrow"]
 
 
 class ExternalCrawlRequest(BaseModel):
     external_url: str
-
-
-def render_mermaid_to_svg(mmd_code: str, svg_path: str):
-    import shutil
-    mmd_path = svg_path.replace(".svg", ".mmd")
-    with open(mmd_path, "w", encoding="utf-8") as f:
-        f.write(mmd_code)
-
-    mmdc_path = shutil.which("mmdc")
-    if not mmdc_path:
-        raise RuntimeError(
-            "Mermaid CLI (mmdc) not found. Please install it using:\n"
-            "npm install -g @mermaid-js/mermaid-cli"
-        )
-
-    try:
-        subprocess.run([mmdc_path, "-i", mmd_path, "-o", svg_path], check=True)
-    except subprocess.CalledProcessError as e:
-        raise RuntimeError(f"Mermaid CLI rendering failed: {e}")
-    finally:
-        if os.path.exists(mmd_path):
-            os.remove(mmd_path)
-
-
-@router.on_event("startup")
-def open_docs():
-    webbrowser.open_new_tab("http://127.0.0.1:8000/docs")
-
-
-@router.post("/")
-async def crawl_website(req: CrawlRequest):
+    audit: bool = False
+
+
+class ExternalBulkCrawlRequest(BaseModel):
+    external_urls: list[str] = Field(default_factory=list)
+    # Audit every external domain a finished crawl linked to.
+    job_id: Optional[str] = None
+    max_depth: int = Field(1, ge=0, le=3)
+    concurrency: int = Field(8, ge=1, le=64)
+    per_site_concurrency: int = Field(2, ge=1, le=8)
+    max_pages_per_site: Optional[int] = Field(25, ge=1)
+    max_total_pages: Optional[int] = Field(None, ge=1)
+    timeout: Optional[int] = None
+    render_mode: Literal["auto", "http", "browser"] = "auto"
+    cache_mode: Literal["off", "revalidate", "refresh"] = "off"
+    audit: bool = False
+    audit_rules: Optional[list[str]] = None
+
+    @field_validator("audit_rules")
+    @classmethod
+    def _known_audit_rules(cls, rules):
+        return _known_rules(rules)
+
+
+@router.on_event("shutdown")
+async def shutdown_crawler_resources():
+    await jobs.shutdown()
+    await close_browser_pool()
+    shutdown_parse_executor()
+
+
+async def categorize_external_links(session: CrawlSession) -> None:
+    # Categories go to a small side file keyed by link; downloads join them in
+    # on the fly, so the (possibly huge) links report is never rewritten.
+    if session.link_categories() is not None:
+        return
+    links = list(dict.fromkeys(read_column(session.external_links_path, "External Link")))
+    categories = await categorize_links(links, cache=get_category_cache())
+    session.write_link_categories(categories)
+
+
+async def run_crawl_pipeline(req: CrawlRequest, job: CrawlJob | None = None) -> dict:
+    """Crawl, outline, render diagrams and categorize links; reports progress to `job`."""
+    with collect_timings() as timings:
+        result = await _run_pipeline_stages(req, job)
+    result["timings"] = timing_breakdown(timings)
+    return result
+
+
+async def _run_pipeline_stages(req: CrawlRequest, job: CrawlJob | None) -> dict:
+    def stage(name):
+        if job:
+            job.set_stage(name)
+
+    # Each crawl writes into its own session directory, named after the job;
+    # a resumed crawl reuses the directory holding its checkpoint.
+    if req.resume_job_id:
+        session = CrawlSession.open(req.resume_job_id)
+        if session is None:
+            raise ValueError(f"No crawl to resume for job {req.resume_job_id}")
+    else:
+        session = CrawlSession(job.id if job else None)
+        prune_sessions()
+    diagram_dir = session.diagram_dir
+    checkpoint = CrawlCheckpoint(session.checkpoint_path, req.checkpoint_every_pages,
+                                 req.checkpoint_every_seconds)
+
+    # Run crawler
+    stage("crawling")
     try:
-        sitemap_file = os.path.join(OUTPUT_DIR, "sitemap.csv")
-        homepage_file = os.path.join(OUTPUT_DIR, "homepage.html")
-        external_file = os.path.join(OUTPUT_DIR, "external_links.csv")
-
-        # Clear previous outputs
-        for p in (sitemap_file, homepage_file, external_file):
-            if os.path.exists(p):
-                os.remove(p)
-        if os.path.exists(DIAGRAM_DIR):
-            shutil.rmtree(DIAGRAM_DIR)
-        os.makedirs(DIAGRAM_DIR, exist_ok=True)
-
-        # Run crawler
         page_counts, site_stats, homepage_html = await run_full_crawl(
             url=req.url,
             max_depth=req.max_depth,
@@ -88,61 +166,132 @@ async def crawl_website(req: CrawlRequest):
             generate_links=req.generate_links,
             concurrency=req.concurrency or os.cpu_count(),
             timeout=req.timeout or 90000,
+            pool=get_browser_pool(),
+            max_per_host=req.max_per_host,
+            host_delay=req.host_delay,
+            render_mode=req.render_mode,
+            cache_mode=req.cache_mode,
+            url_store=req.url_store,
+            workers=req.workers,
+            respect_robots=req.respect_robots,
+            use_sitemaps=req.use_sitemaps,
+            budget=req.budget(),
+            detect_duplicates=req.detect_duplicates,
+            auditor=req.auditor(),
+            on_progress=job.report_page if job else None,
+            session=session,
+            checkpoint=checkpoint,
         )
+    finally:
+        checkpoint.close()
+
+    # Save homepage
+    with open(session.homepage_path, "w", encoding="utf-8") as f:
+        f.write(homepage_html)
+
+    # Generate Mermaid diagram
+    stage("outline")
+    outline_text = await asyncio.to_thread(generate_sitemap_outline_from_homepage, homepage_html,
+                                         req.outline_mode)
+    stage("diagrams")
+    homepage_svg = os.path.join(diagram_dir, "homepage.svg")
+    diagrams = [(outline_to_mermaid(outline_text), homepage_svg)]
+
+    # Generate section-wise diagrams
+    level_sections = extract_level1_outlines(outline_text)
+    for section, lines in level_sections.items():
+        code = outline_to_mermaid("\n".join(lines))
+        fpath = os.path.join(diagram_dir, f"{section.replace(' ', '_').lower()}.svg")
+        diagrams.append((code, fpath))
+    await get_diagram_renderer().render_many(diagrams)
+
+    # Categorize external links
+    if os.path.exists(session.external_links_path):
+        stage("categorizing")
+        await categorize_external_links(session)
+
+    return {
+        "job_id": session.id,
+        "main_url": req.url,
+        "page_counts": dict(page_counts),
+        "site_stats": site_stats,
+        "accessibility": AuditSummary(site_stats.pop("audit")).report() if "audit" in site_stats else None,
+        "site_tree": site_stats.pop("tree", None),
+        "homepage_outline": outline_text,
+        "homepage_mermaid_diagram": homepage_svg,
+        "level_diagrams": [os.path.join(diagram_dir, f) for f in os.listdir(diagram_dir)],
+        "sitemap_download": f"/crawl/download/{session.id}/sitemap",
+        "site_tree_download": f"/crawl/download/{session.id}/tree",
+        "external_links_download": f"/crawl/download/{session.id}/external",
+        "accessibility_download": f"/crawl/download/{session.id}/accessibility" if req.audit else None,
+        "diagram_download": f"/crawl/download/{session.id}/diagrams"
+    }
 
-        # Save homepage
-        with open(homepage_file, "w", encoding="utf-8") as f:
-            f.write(homepage_html)
-
-        # Generate Mermaid diagram
-        outline_text = generate_sitemap_outline_from_homepage(homepage_html)
-        mermaid = outline_to_mermaid(outline_text)
-        homepage_svg = os.path.join(DIAGRAM_DIR, "homepage.svg")
-        render_mermaid_to_svg(mermaid, homepage_svg)
-
-        # Generate section-wise diagrams
-        level_sections = extract_level1_outlines(outline_text)
-        for section, lines in level_sections.items():
-            code = outline_to_mermaid("\n".join(lines))
-            fpath = os.path.join(DIAGRAM_DIR, f"{section.replace(' ', '_').lower()}.svg")
-            render_mermaid_to_svg(code, fpath)
-
-        # Categorize external links
-        if os.path.exists(external_file):
-            lines = open(external_file, encoding="utf-8").read().splitlines()
-            header, *rows = lines
-            categorized = [header + ",Category"]
-            for row in rows:
-                ext = row.split(",")[-1]
-                cat = categorize_external_link(ext)
-                categorized.append(row + "," + cat)
-            open(external_file, "w", encoding="utf-8").write("\n".join(categorized))
-
-        return {
-            "main_url": req.url,
-            "page_counts": dict(page_counts),
-            "site_stats": site_stats,
-            "homepage_outline": outline_text,
-            "homepage_mermaid_diagram": homepage_svg,
-            "level_diagrams": [os.path.join(DIAGRAM_DIR, f) for f in os.listdir(DIAGRAM_DIR)],
-            "sitemap_download": "/crawl/download/sitemap",
-            "external_links_download": "/crawl/download/external",
-            "diagram_download": "/crawl/download/diagrams"
-        }
 
+@router.post("/")
+async def crawl_website(req: CrawlRequest):
+    _check_resumable(req)
+    try:
+        return await run_crawl_pipeline(req)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/jobs", status_code=202)
+async def create_crawl_job(req: CrawlRequest):
+    _check_resumable(req)
+    job = jobs.submit(lambda j: run_crawl_pipeline(req, j), params=req.model_dump())
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/crawl/jobs/{job.id}",
+        "events_url": f"/crawl/jobs/{job.id}/events",
+    }
+
+
+@router.get("/jobs")
+async def list_crawl_jobs():
+    return [
+        {"job_id": j.id, "status": j.status, "stage": j.stage, "url": j.params.get("url")}
+        for j in jobs.list()
+    ]
+
+
+@router.get("/jobs/{job_id}")
+async def get_crawl_job(job_id: str):
+    return _job_or_404(job_id).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_crawl_job(job_id: str):
+    job = _job_or_404(job_id)
+
+    async def sse():
+        async for event in job.events():
+            yield f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(sse(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_crawl_job(job_id: str):
+    _job_or_404(job_id)
+    job = jobs.cancel(job_id)
+    return {"job_id": job.id, "status": job.status if job.finished else "cancelling"}
+
+
 @router.post("/external")
 async def crawl_external(req: ExternalCrawlRequest):
     try:
-        res = await crawl_selected_external(req.external_url)
+        res = await crawl_selected_external(req.external_url, pool=get_browser_pool(),
+                                            auditor=PageAuditor(store=get_audit_store()) if req.audit else None)
         return {
             "external_url": req.external_url,
             "page_counts": res.get("page_counts", {}),
             "site_stats": res.get("site_stats", {}),
+            "accessibility": res.get("accessibility"),
             "summary": res.get("summary", "")
         }
     except Exception as e:
@@ -150,30 +299,150 @@ async def crawl_external(req: ExternalCrawlRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/crawl/download/sitemap")
-def dl_sitemap():
-    return _serve(os.path.join(OUTPUT_DIR, "sitemap.csv"), "sitemap.csv")
+@router.post("/external/bulk", status_code=202)
+async def crawl_external_bulk(req: ExternalBulkCrawlRequest):
+    urls = list(req.external_urls)
+    if req.job_id:
+        urls += _session_or_404(req.job_id).external_sites()
+    if not urls:
+        raise HTTPException(status_code=400, detail="No external sites to crawl: pass external_urls or a job_id")
+
+    async def run(job: CrawlJob):
+        job.set_stage("crawling")
+        return await crawl_external_sites(
+            urls,
+            max_depth=req.max_depth,
+            timeout=req.timeout or 60000,
+            pool=get_browser_pool(),
+            render_mode=req.render_mode,
+            cache_mode=req.cache_mode,
+            concurrency=req.concurrency,
+            per_site_concurrency=req.per_site_concurrency,
+            max_pages_per_site=req.max_pages_per_site,
+            max_total_pages=req.max_total_pages,
+            on_progress=job.report_page,
+            auditor=PageAuditor(req.audit_rules, get_audit_store()) if req.audit else None,
+        )
+
+    job = jobs.submit(run, params={**req.model_dump(), "sites": len(urls)})
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "sites": len(urls),
+        "status_url": f"/crawl/jobs/{job.id}",
+        "events_url": f"/crawl/jobs/{job.id}/events",
+    }
+
+
+@router.get("/download/{job_id}/sitemap")
+async def dl_sitemap(job_id: str, format: ReportFormat = "csv"):
+    session = _session_or_404(job_id)
+    return await _serve_report(session, session.sitemap_path, "sitemap", format)
+
+
+@router.get("/download/{job_id}/tree")
+async def dl_site_tree(job_id: str, format: Literal["csv", "json", "parquet", "arrow"] = "csv"):
+    session = _session_or_404(job_id)
+    if format != "json":
+        return await _serve_report(session, session.site_tree_path, "site_tree", format)
+    tree = await asyncio.to_thread(_load_tree, session)
+    return StreamingResponse(tree.iter_json(), media_type="application/json",
+                             headers={"Content-Disposition": 'attachment; filename="site_tree.json"'})
+
+
+@router.get("/diff/{base_job_id}/{job_id}")
+async def diff_crawls(base_job_id: str, job_id: str, limit: Optional[int] = Query(None, ge=1)):
+    """Sections added and removed between an earlier crawl (`base_job_id`) and a later one of the same site."""
+    base, head = _session_or_404(base_job_id), _session_or_404(job_id)
+
+    def diff():
+        return diff_trees(_load_tree(base), _load_tree(head), limit)
+
+    return {"base_job_id": base_job_id, "job_id": job_id, **await asyncio.to_thread(diff)}
+
+
+@router.get("/download/{job_id}/external")
+async def dl_external(job_id: str, format: ReportFormat = "csv"):
+    session = _session_or_404(job_id)
+    categories = session.link_categories()
+    extra = ("External Link", "Category", categories) if categories is not None else None
+    return await _serve_report(session, session.external_links_path, "external_links", format, extra,
+                               session.link_categories_path)
 
 
-@router.get("/crawl/download/external")
-def dl_external():
-    return _serve(os.path.join(OUTPUT_DIR, "external_links.csv"), "external_links.csv")
+@router.get("/download/{job_id}/accessibility")
+async def dl_accessibility(job_id: str, format: ReportFormat = "csv"):
+    session = _session_or_404(job_id)
+    return await _serve_report(session, session.accessibility_path, "accessibility_issues", format)
 
 
-@router.get("/crawl/download/diagrams")
-def dl_diagrams():
-    zip_path = os.path.join(OUTPUT_DIR, "diagrams.zip")
+@router.get("/download/{job_id}/diagrams")
+def dl_diagrams(job_id: str):
+    session = _session_or_404(job_id)
+    zip_path = os.path.join(session.output_dir, "diagrams.zip")
 
-    if not os.path.exists(DIAGRAM_DIR):
+    if not os.path.exists(session.diagram_dir):
         raise HTTPException(status_code=404, detail="Diagrams folder not found")
     if os.path.exists(zip_path):
         os.remove(zip_path)
 
-    shutil.make_archive(zip_path.replace(".zip", ""), 'zip', DIAGRAM_DIR)
+    shutil.make_archive(zip_path.replace(".zip", ""), 'zip', session.diagram_dir)
     return FileResponse(zip_path, media_type='application/zip', filename="diagrams.zip")
 
 
-def _serve(path, name):
-    if os.path.exists(path):
-        return FileResponse(path, filename=name)
-    raise HTTPException(status_code=404, detail=f"{name} not found")
+def _check_resumable(req: CrawlRequest) -> None:
+    if not req.resume_job_id:
+        return
+    session = CrawlSession.open(req.resume_job_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No crawl to resume for job {req.resume_job_id}")
+    if os.path.exists(session.checkpoint_path):
+        checkpoint = CrawlCheckpoint(session.checkpoint_path)
+        try:
+            main_url = checkpoint.main_url()
+        finally:
+            checkpoint.close()
+        if main_url is not None and clean_url(main_url) != clean_url(req.url):
+            raise HTTPException(status_code=409,
+                                detail=f"Job {req.resume_job_id} crawled {main_url}, not {req.url}")
+
+
+def _session_or_404(job_id: str) -> CrawlSession:
+    session = CrawlSession.open(job_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"No outputs for job {job_id}")
+    return session
+
+
+def _load_tree(session: CrawlSession) -> SiteTree:
+    if not os.path.exists(session.site_tree_path):
+        raise HTTPException(status_code=404, detail=f"No site tree for job {session.id}")
+    return SiteTree.load(session.site_tree_path)
+
+
+def _job_or_404(job_id: str) -> CrawlJob:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+async def _serve_report(session: CrawlSession, path: str, name: str, fmt: str,
+                        extra_column=None, extra_source: str | None = None):
+    """Stream a CSV report in chunks, or export it once to Parquet/Arrow and serve that."""
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"{name}.csv not found")
+    if fmt == "csv":
+        chunks = iter_csv_with_column(path, *extra_column) if extra_column else iter_file_chunks(path)
+        return StreamingResponse(chunks, media_type="text/csv",
+                                 headers={"Content-Disposition": f'attachment; filename="{name}.csv"'})
+
+    out_path = session.report_path(name, COLUMNAR_FORMATS[fmt])
+    sources = [path] + ([extra_source] if extra_column and extra_source else [])
+    if not os.path.exists(out_path) or os.path.getmtime(out_path) < max(map(os.path.getmtime, sources)):
+        try:
+            await asyncio.to_thread(export_columnar, path, out_path, fmt, extra_column)
+        except RuntimeError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+    media_type = "application/vnd.apache.parquet" if fmt == "parquet" else "application/vnd.apache.arrow.stream"
+    return FileResponse(out_path, media_type=media_type, filename=f"{name}{COLUMNAR_FORMATS[fmt]}")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from src.crawler.warmup import readiness, start_warm_up, stop_warm_up
+
+router = APIRouter()
+
+
+@router.on_event("startup")
+async def warm_up_crawler():
+    start_warm_up()
+
+
+@router.on_event("shutdown")
+async def stop_crawler_warm_up():
+    await stop_warm_up()
+
+
+@router.get("/health/live")
+def live():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+def ready():
+    """200 once the parse and browser pools are warm (503 until then), for load-balancer readiness probes."""
+    is_ready, details = readiness()
+    return JSONResponse({"status": "ready" if is_ready else "warming", **details},
+                        status_code=200 if is_ready else 503)
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from src.crawler import html_analysis
+from src.crawler.audit import RULES, analyze_and_audit, audit_html, contrast_ratio, parse_color
+from src.crawler.audit_store import AuditStore, PageAuditor
+from src.crawler.html_analysis import analyze_html
+
+
+def page(body: str, head: str = "<title>T</title>", lang: str = ' lang="en"') -> str:
+    return f"<html{lang}><head>{head}</head><body><h1>Heading</h1>{body}</body></html>"
+
+
+def messages(html: str, rule: str) -> list[tuple[str, str]]:
+    audit = audit_html(page(html) if not html.startswith("<html") else html, [rule])
+    return [(f.severity, f.message) for f in audit.findings]
+
+
+def test_every_rule_is_tested():
+    assert set(RULES) == {"image-alt", "linked-image-alt", "decorative-image", "heading-order", "link-text",
+                          "color-contrast", "document"}
+
+
+def test_image_alt():
+    found = messages('<img src="a"><img src="b" alt="image"><img src="c" alt="A cat"><img src="d" alt="a cat">'
+                     '<img src="e" alt="Map of the campus"><img src="f" alt="">'
+                     '<img src="g" alt="" role="presentation"><a href="/x"><img src="h"></a>', "image-alt")
+
+    assert found == [("error", "Image has no alt attribute"), ("error", "Alt text is generic"),
+                     ("warning", "Alt text repeats another image on the page"),
+                     ("warning", "Alt text repeats another image on the page")]
+    # Linked (h) and decorative (g) images are other rules' business.
+    assert audit_html(page('<img src="g" alt="" role="presentation"><a href="/x"><img src="h"></a>'),
+                      ["image-alt"]).checked == {"image-alt": 0}
+
+
+def test_linked_image_alt():
+    found = messages('<a href="/1"><img src="a" alt="Go to the shop"></a><a href="/2"><img src="b" alt="logo"></a>'
+                     '<a href="/3"><img src="c"></a><button><img src="d" alt=""></button>'
+                     '<a href="/4"><img src="e" alt="Go to the shop"></a>', "linked-image-alt")
+
+    # A repeated alt is fine on links: two links to the same place may share a label.
+    assert found == [("error", "Linked image has no descriptive alt text")] * 3
+
+
+def test_decorative_image():
+    found = messages('<img src="a" alt="" role="presentation"><img src="b" alt="Chart" aria-hidden="true">'
+                     '<img src="c" alt=""><a href="/x"><img src="d" alt=""></a>', "decorative-image")
+
+    assert found == [("warning", "Image is marked decorative but has alt text"),
+                     ("warning", 'Empty alt without role="presentation" or aria-hidden')]
+
+
+def test_heading_order():
+    assert messages("<html><body><h2>Sub</h2></body></html>", "heading-order") == [("error", "Page has no h1")]
+    found = messages("<h1>Again</h1><h3>Deep</h3><h2></h2><h2><img alt='Logo of ACME'></h2>", "heading-order")
+
+    assert found == [("warning", "Page has 2 h1 headings"), ("warning", "Heading level skips from h1 to h3"),
+                     ("error", "Empty h2")]
+
+
+def test_link_text():
+    found = messages('<a href="/a">Pricing plans</a><a href="/b">Read more</a><a href="/c"></a>'
+                     '<a href="/d" aria-label="Download the report"></a><a href="/e"><img alt="Home"></a>'
+                     '<a name="anchor"></a>', "link-text")
+
+    assert found == [("warning", 'Link text "read more" is not descriptive'), ("error", "Link has no accessible text")]
+    assert audit_html(page('<a href="/a">x</a><a name="n"></a>'), ["link-text"]).checked == {"link-text": 1}
+
+
+def test_color_contrast():
+    assert parse_color("#fff") == parse_color("white") == parse_color("rgb(255, 255, 255)") == (255, 255, 255)
+    assert contrast_ratio((0, 0, 0), (255, 255, 255)) == pytest.approx(21)
+    found = messages('<div style="background-color: #ffffff"><p style="color: #777">Too light</p>'
+                     '<p style="color: black">Fine</p><span style="color: #aaa">Light <b>bold</b> text</span></div>'
+                     '<p style="color: #eee">No background known</p>', "color-contrast")
+
+    # One finding per styled element; text with no known background is skipped.
+    assert [message for _, message in found] == ["Text contrast 4.48:1 is below 4.5:1",
+                                                 "Text contrast 2.32:1 is below 4.5:1"]
+
+
+def test_document():
+    assert messages(page(""), "document") == []
+    assert messages(page("", head="<title> </title>", lang=""), "document") == [
+        ("error", "<html> has no lang attribute"), ("error", "Page has no title")]
+
+
+def test_accessible_images_agree_with_the_alt_rules():
+    html = page('<img src="a"><img src="b" alt="photo"><img src="c" alt="Team photo"><img src="d" alt="Team photo">'
+                '<img src="e" alt="Chart of revenue"><img src="f" alt=""><img src="g" alt="" role="presentation">'
+                '<a href="/x"><img src="h" alt="icon"></a><a href="/y"><img src="i" alt="Contact us"></a>')
+
+    analysis = analyze_and_audit(html, "https://a.example/")
+    flagged = {f.element for f in analysis.audit.findings
+               if f.rule in ("image-alt", "linked-image-alt")
+               or f.message.startswith("Empty alt without")}
+
+    assert analysis._replace(audit=None) == analyze_html(html, "https://a.example/")
+    assert analysis.accessible_images == len(analysis.images) - len(flagged) == 3
+
+
+def test_auditor_reuses_stored_findings(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_analysis, "PARSE_WORKERS", 0)
+    store = AuditStore(str(tmp_path / "audits.sqlite"))
+    auditor = PageAuditor(["image-alt", "document"], store)
+    html = page('<img src="a">')
+
+    first = asyncio.run(auditor.analyze(html, "https://a.example/"))
+    again = asyncio.run(auditor.analyze(html, "https://a.example/"))
+
+    assert first.audit.findings == again.audit.findings == (
+        ("image-alt", "error", "Image has no alt attribute", '<img src="a">'),)
+    assert not first.audit.cached and again.audit.cached
+    assert again._replace(audit=None) == first._replace(audit=None)
+    store.close()
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+import src.crawler.test as crawler
+from src.crawler.checkpoint import CrawlCheckpoint
+from src.crawler.session import CrawlSession
+
+SITE_URL = "https://site.example/"
+PAGES = 60
+
+
+def render(page_id: int) -> str:
+    links = "".join(f'<a href="/p{(page_id * 3 + k) % PAGES}">Page {k}</a>' for k in range(1, 4))
+    return (f"<html><body><h1>Page {page_id}</h1>{links}"
+            f"<a href='https://out{page_id % 4}.example/'>out</a><img alt='Photo {page_id}'></body></html>")
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """Serves SITE_URL from memory; set `interrupt_after` to hang the crawl after that many fetches."""
+    state = {"fetches": 0, "interrupt_after": None, "interrupted": None}
+
+    async def fetch(url, depth, timeout, pool, render_mode="auto", http=None, validators=None):
+        state["fetches"] += 1
+        if state["interrupt_after"] is not None and state["fetches"] > state["interrupt_after"]:
+            state["interrupted"].set()
+            await asyncio.sleep(3600)
+        path = url[len(SITE_URL) - 1:]
+        page_id = 0 if path == "/" else int(path[2:])
+        return crawler.FetchedPage(url, depth, render(page_id), ())
+
+    monkeypatch.setattr(crawler, "fetch_single_page", fetch)
+    return state
+
+
+def run_crawl(session, checkpoint):
+    return crawler.crawl_main_site(SITE_URL, max_depth=5, concurrency=1, pool=object(), session=session,
+                                   checkpoint=checkpoint, respect_robots=False, use_sitemaps=False)
+
+
+def outputs(session, result):
+    page_counts, stats, _ = result
+    with open(session.sitemap_path) as f:
+        sitemap = sorted(f.read().splitlines())
+    with open(session.site_tree_path) as f:
+        tree = sorted(f.read().splitlines())
+    with open(session.external_links_path) as f:
+        external = sorted(f.read().splitlines())
+    return (dict(page_counts), {k: v for k, v in stats.items() if k != "tree"}, stats["tree"],
+            sitemap, tree, external)
+
+
+def test_flush_and_load_round_trip(tmp_path):
+    checkpoint = CrawlCheckpoint(str(tmp_path / "c.sqlite"), every_pages=2, every_seconds=3600)
+    assert checkpoint.load() is None
+
+    checkpoint.enqueued("https://a/", 0, None)
+    checkpoint.enqueued("https://a/x", 1, "https://a/")
+    checkpoint.done("https://a/")
+    assert not checkpoint.maybe_flush(lambda: {"main_url": "https://a/"})
+    checkpoint.enqueued("https://a/y", 1, "https://a/")
+    checkpoint.done("https://a/x")
+    assert checkpoint.maybe_flush(lambda: {"main_url": "https://a/", "pages": 2})
+    checkpoint.close()
+
+    reopened = CrawlCheckpoint(str(tmp_path / "c.sqlite"))
+    state = reopened.load()
+    assert state.rows == [("https://a/", 0, None, True), ("https://a/x", 1, "https://a/", True),
+                          ("https://a/y", 1, "https://a/", False)]
+    assert state.meta == {"main_url": "https://a/", "pages": 2}
+    assert state.done_count == 2
+    assert reopened.main_url() == "https://a/"
+    reopened.close()
+
+
+def test_interrupted_crawl_resumes_to_the_same_result(tmp_path, site):
+    straight = CrawlSession(root=str(tmp_path / "straight"))
+    expected = outputs(straight, asyncio.run(run_crawl(straight, None)))
+
+    session = CrawlSession(root=str(tmp_path / "resumed"))
+    checkpoint = CrawlCheckpoint(session.checkpoint_path, every_pages=7, every_seconds=3600)
+    site["fetches"], site["interrupt_after"] = 0, 25
+
+    async def interrupt():
+        site["interrupted"] = asyncio.Event()
+        task = asyncio.create_task(run_crawl(session, checkpoint))
+        await site["interrupted"].wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(interrupt())
+    checkpoint.close()
+    state = CrawlCheckpoint(session.checkpoint_path).load()
+    assert not state.meta["complete"]
+    assert 0 < state.done_count < sum(expected[0].values())
+
+    site["interrupt_after"] = None
+    checkpoint = CrawlCheckpoint(session.checkpoint_path, every_pages=7, every_seconds=3600)
+    resumed = outputs(session, asyncio.run(run_crawl(session, checkpoint)))
+    assert CrawlCheckpoint(session.checkpoint_path).load().meta["complete"]
+    checkpoint.close()
+
+    assert resumed == expected
@@ -0,0 +1,82 @@
+import asyncio
+
+from src.crawler.link_categorizer import CategoryCache, LocalFakeModel, categorize_links
+
+
+class RecordingModel(LocalFakeModel):
+    """LocalFakeModel that records its prompts and can fail prompts mentioning `fail_on`."""
+
+    def __init__(self, fail_on: str | None = None):
+        self.prompts = []
+        self.fail_on = fail_on
+
+    def generate_content(self, prompt: str):
+        self.prompts.append(prompt)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("quota exceeded")
+        return super().generate_content(prompt)
+
+
+def categorize(urls, model, **kwargs):
+    kwargs.setdefault("requests_per_minute", 0)
+    return asyncio.run(categorize_links(urls, model=model, **kwargs))
+
+
+def test_batches_one_representative_per_pattern():
+    model = RecordingModel()
+    urls = ["https://a.example/blog/1", "https://a.example/blog/2", "https://b.example/shop",
+            "https://c.example/docs", "https://d.example/forum", "https://e.example/about"]
+
+    result = categorize(urls, model, batch_size=2)
+
+    assert result == {
+        "https://a.example/blog/1": "Blog",
+        "https://a.example/blog/2": "Blog",
+        "https://b.example/shop": "E-commerce",
+        "https://c.example/docs": "Documentation",
+        "https://d.example/forum": "Forum",
+        "https://e.example/about": "Other",
+    }
+    # blog/1 and blog/2 share a pattern: 5 representatives in batches of 2.
+    assert len(model.prompts) == 3
+    assert sum(p.count("https://") for p in model.prompts) == 5
+
+
+def test_known_domains_skip_the_model():
+    model = RecordingModel()
+    result = categorize(["https://www.facebook.com/acme", "https://github.com/acme/repo"], model)
+
+    assert result == {"https://www.facebook.com/acme": "Social Media",
+                      "https://github.com/acme/repo": "Code Hosting"}
+    assert model.prompts == []
+
+
+def test_failed_batch_falls_back_to_unknown_and_is_not_cached(tmp_path):
+    cache = CategoryCache(str(tmp_path / "categories.sqlite"))
+    urls = ["https://a.example/blog", "https://b.example/news"]
+
+    result = categorize(urls, RecordingModel(fail_on="b.example"), cache=cache, batch_size=1)
+
+    assert result == {"https://a.example/blog": "Blog", "https://b.example/news": "Unknown"}
+    assert cache.get_many(["a.example/blog", "b.example/news"]) == {"a.example/blog": "Blog"}
+
+
+def test_cached_patterns_are_not_asked_again(tmp_path):
+    cache = CategoryCache(str(tmp_path / "categories.sqlite"))
+    categorize(["https://a.example/blog/1"], RecordingModel(), cache=cache)
+
+    model = RecordingModel()
+    result = categorize(["https://a.example/blog/2"], model, cache=cache)
+
+    assert result == {"https://a.example/blog/2": "Blog"}
+    assert model.prompts == []
+
+
+def test_short_or_malformed_responses_pad_with_unknown():
+    class ShortModel(LocalFakeModel):
+        def generate_content(self, prompt):
+            return self._Response('Sure! ["Blog"]')
+
+    result = categorize(["https://a.example/x", "https://b.example/y"], ShortModel())
+
+    assert result == {"https://a.example/x": "Blog", "https://b.example/y": "Unknown"}
@@ -0,0 +1,127 @@
+import asyncio
+
+from src.crawler.scheduler import CrawlScheduler
+from src.crawler.url_store import ROOT
+
+SITE = {
+    "https://s.example/": ["https://s.example/b", "https://s.example/a", "https://s.example/b"],
+    "https://s.example/a": ["https://s.example/a/1", "https://s.example/", "https://s.example/b"],
+    "https://s.example/b": ["https://s.example/b/1", "https://s.example/a/1"],
+    "https://s.example/a/1": ["https://s.example/a/1/x"],
+    "https://s.example/b/1": [],
+}
+
+
+def crawl(scheduler, site=SITE, fail=()):
+    order = []
+
+    async def handler(url, depth):
+        order.append((url, depth))
+        if url in fail:
+            raise RuntimeError("boom")
+        for link in site.get(url, ()):
+            scheduler.add(link, depth + 1, parent=url)
+
+    async def main():
+        scheduler.add("https://s.example/", 0)
+        await scheduler.run(handler)
+
+    asyncio.run(main())
+    return order
+
+
+def test_shallowest_first_and_each_url_once():
+    scheduler = CrawlScheduler(1)
+
+    order = crawl(scheduler)
+
+    assert order == [
+        ("https://s.example/", 0),
+        ("https://s.example/b", 1),
+        ("https://s.example/a", 1),
+        ("https://s.example/b/1", 2),
+        ("https://s.example/a/1", 2),
+        ("https://s.example/a/1/x", 3),
+    ]
+    assert scheduler.handled == 6 and scheduler.failed == 0
+    assert "https://s.example/a/1" in scheduler
+
+
+def test_parent_is_the_first_page_that_linked():
+    scheduler = CrawlScheduler(1)
+    crawl(scheduler)
+    store = scheduler.store
+
+    assert store.url(store.parents[store.get_id("https://s.example/a/1")]) == "https://s.example/b"
+    assert store.parents[store.get_id("https://s.example/")] == ROOT
+
+
+def test_max_depth_is_not_recorded_as_seen():
+    scheduler = CrawlScheduler(1, max_depth=1)
+
+    assert not scheduler.add("https://s.example/deep", 2)
+    assert "https://s.example/deep" not in scheduler
+    assert scheduler.add("https://s.example/deep", 1)
+
+
+def test_rejected_urls_are_asked_once():
+    asked = []
+
+    def admit(url):
+        asked.append(url)
+        return not url.endswith("/b")
+
+    scheduler = CrawlScheduler(2, admit=admit)
+    order = crawl(scheduler)
+
+    assert asked.count("https://s.example/b") == 1
+    assert "https://s.example/b" not in [url for url, _ in order]
+    assert "https://s.example/b/1" not in [url for url, _ in order]
+    assert not scheduler.add("https://s.example/b", 1)
+
+
+def test_handler_failure_fails_only_that_page():
+    scheduler = CrawlScheduler(2)
+
+    order = crawl(scheduler, fail={"https://s.example/a"})
+
+    assert scheduler.failed == 1
+    assert scheduler.handled == len(order)
+    # a/1 is still reached through b.
+    assert ("https://s.example/a/1", 2) in order
+
+
+def test_stop_drops_the_queue():
+    scheduler = CrawlScheduler(1)
+
+    async def handler(url, depth):
+        for link in SITE.get(url, ()):
+            scheduler.add(link, depth + 1, parent=url)
+        scheduler.stop()
+
+    async def main():
+        scheduler.add("https://s.example/", 0)
+        await scheduler.run(handler)
+
+    asyncio.run(main())
+
+    assert scheduler.handled == 1
+    assert scheduler.queue_depth == 0
+    assert not scheduler.add("https://s.example/new", 1)
+
+
+def test_restore_requeues_only_unfinished_pages():
+    scheduler = CrawlScheduler(1)
+    scheduler.restore("https://s.example/", 0, None, True)
+    scheduler.restore("https://s.example/a", 1, "https://s.example/", False)
+    seen = []
+
+    async def handler(url, depth):
+        seen.append(url)
+
+    asyncio.run(scheduler.run(handler))
+
+    assert seen == ["https://s.example/a"]
+    store = scheduler.store
+    assert store.is_visited(store.get_id("https://s.example/"))
+    assert store.parents[store.get_id("https://s.example/a")] == store.get_id("https://s.example/")
@@ -0,0 +1,118 @@
+import json
+
+from src.crawler.site_tree import SiteTree, diff_trees
+from src.crawler.url_store import ROOT, UrlStore
+
+SITE = "https://t.example"
+
+
+def build(pages, crawled=None):
+    """A tree over `pages` ((path, parent path or None), parents first); all crawled unless listed in `crawled`."""
+    store = UrlStore()
+    tree = SiteTree(store)
+    for path, parent in pages:
+        parent_id = store.get_id(SITE + parent) if parent is not None else ROOT
+        depth = store.depths[parent_id] + 1 if parent is not None else 0
+        store.add(SITE + path, parent_id, depth)
+    for path, _ in pages:
+        if crawled is None or path in crawled:
+            tree.add(store.get_id(SITE + path))
+    return tree
+
+
+PAGES = [("/", None), ("/blog/", "/"), ("/about", "/"), ("/blog/a", "/blog/"), ("/blog/b", "/blog/"),
+         ("/blog/a/x", "/blog/a"), ("/shop/", "/")]
+
+
+def urls(tree, nodes):
+    return [tree.store.url(n)[len(SITE):] for n in nodes]
+
+
+def test_add_links_children_in_crawl_order():
+    tree = build(PAGES)
+    store = tree.store
+    blog = store.get_id(SITE + "/blog/")
+
+    assert tree.page_count == 7
+    assert urls(tree, tree.iter_children(store.get_id(SITE + "/"))) == ["/blog/", "/about", "/shop/"]
+    assert urls(tree, tree.iter_nodes()) == ["/", "/blog/", "/blog/a", "/blog/a/x", "/blog/b", "/about", "/shop/"]
+    assert tree.path(store.get_id(SITE + "/blog/a/x")) == [SITE + "/", SITE + "/blog/", SITE + "/blog/a",
+                                                            SITE + "/blog/a/x"]
+    assert tree.pages[blog] == 4 and tree.child_count(blog) == 2
+    assert SITE + "/blog/b" in tree and SITE + "/nowhere" not in tree
+    assert tree.add(blog) == blog and tree.page_count == 7
+
+
+def test_child_before_parent_links_placeholders():
+    tree = build(PAGES, crawled={"/", "/blog/a/x"})
+    store = tree.store
+
+    assert urls(tree, tree.iter_nodes()) == ["/", "/blog/", "/blog/a", "/blog/a/x"]
+    assert not tree.is_crawled(store.get_id(SITE + "/blog/a"))
+    assert tree.page_count == 2 and tree.pages[store.get_id(SITE + "/blog/")] == 1
+
+    tree.add(store.get_id(SITE + "/blog/a"))
+
+    assert tree.is_crawled(store.get_id(SITE + "/blog/a"))
+    assert tree.pages[store.get_id(SITE + "/blog/")] == 2
+    assert urls(tree, tree.iter_nodes()) == ["/", "/blog/", "/blog/a", "/blog/a/x"]
+
+
+def test_sections_and_depth_stats():
+    tree = build(PAGES)
+
+    assert tree.sections() == [{"url": SITE + "/blog/", "pages": 4, "children": 2},
+                               {"url": SITE + "/about", "pages": 1, "children": 0},
+                               {"url": SITE + "/shop/", "pages": 1, "children": 0}]
+    assert tree.sections(depth=2, limit=1) == [{"url": SITE + "/blog/a", "pages": 2, "children": 1}]
+    assert tree.depth_stats() == {"0": {"pages": 1, "sections": 1, "max_children": 3},
+                                  "1": {"pages": 3, "sections": 1, "max_children": 2},
+                                  "2": {"pages": 2, "sections": 1, "max_children": 1},
+                                  "3": {"pages": 1, "sections": 0, "max_children": 0}}
+
+
+def test_csv_round_trip(tmp_path):
+    tree = build(PAGES, crawled={"/", "/about", "/blog/a", "/blog/a/x", "/shop/"})
+    path = str(tmp_path / "tree.csv")
+    tree.write_csv(path)
+
+    loaded = SiteTree.load(path)
+    loaded.write_csv(str(tmp_path / "again.csv"))
+
+    with open(path) as f, open(tmp_path / "again.csv") as g:
+        assert f.read() == g.read()
+    assert urls(loaded, loaded.iter_nodes()) == urls(tree, tree.iter_nodes())
+    assert loaded.summary() == tree.summary()
+    assert not loaded.is_crawled(loaded.store.get_id(SITE + "/blog/"))
+
+
+def test_iter_json_nests_children():
+    tree = build(PAGES)
+
+    chunks = list(tree.iter_json(chunk_size=16))
+    [root] = json.loads("".join(chunks))
+
+    assert len(chunks) > 1
+    assert [c["url"] for c in root["children"]] == [SITE + "/blog/", SITE + "/about", SITE + "/shop/"]
+    assert root["children"][0]["children"][0] == {
+        "url": SITE + "/blog/a", "depth": 2, "crawled": True, "pages": 2,
+        "children": [{"url": SITE + "/blog/a/x", "depth": 3, "crawled": True, "pages": 1, "children": []}]}
+
+
+def test_diff_reports_sections_and_moves():
+    old = build(PAGES)
+    new = build([("/", None), ("/blog/", "/"), ("/about", "/"), ("/blog/a", "/blog/"), ("/blog/b", "/about"),
+                 ("/docs/", "/"), ("/docs/1", "/docs/"), ("/docs/2", "/docs/"), ("/about/team", "/about")])
+
+    diff = diff_trees(old, new)
+
+    assert diff["added_sections"] == [{"url": SITE + "/docs/", "parent": SITE + "/", "pages": 3},
+                                      {"url": SITE + "/about/team", "parent": SITE + "/about", "pages": 1}]
+    # /blog/a/x and /shop/ are separate tops: /blog/a is still there.
+    assert sorted(diff["removed_sections"], key=lambda s: s["url"]) == [
+        {"url": SITE + "/blog/a/x", "parent": SITE + "/blog/a", "pages": 1},
+        {"url": SITE + "/shop/", "parent": SITE + "/", "pages": 1}]
+    assert (diff["added_pages"], diff["removed_pages"]) == (4, 2)
+    assert (diff["common_pages"], diff["moved_pages"]) == (5, 1)
+    assert diff_trees(old, new, limit=1)["added_sections"] == diff["added_sections"][:1]
+    assert diff_trees(old, old)["added_pages"] == diff_trees(old, old)["moved_pages"] == 0